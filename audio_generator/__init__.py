@@ -0,0 +1 @@
+# audio_generator package
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Chaîne audio de la voix (normalisation, fusion, boost, pauses, mixage).
+
+Format des fichiers intermédiaires : AUDIO_INTERMEDIATE_FORMAT
+- "mp3"  (défaut) : comportement historique, chaque étape ré-encode en MP3
+- "wav"           : intermédiaires sans perte en WAV flottant 32 bits (44.1 kHz) ;
+  le seul encodage avec perte est l'AAC final de mix_audio_with_background_delayed.
+  "flac" est un alias de "wav" : FLAC ne stocke que des entiers et écrêterait
+  les crêtes au-dessus de 0 dBFS créées par le boost de +10 dB
+
+Avec AUDIO_FUSED_GRAPH=1, normalisation des parties, fusion et boost sont
+faits par un seul filter_complex (render_fused_voice).
+
+Avec LOUDNORM_TWO_PASS=1, loudnorm mesure d'abord chaque fichier puis applique
+une normalisation linéaire ; les mesures sont en cache par hash du fichier.
+"""
+import os
+import json
+import hashlib
+import subprocess
+
+AUDIO_INTERMEDIATE_FORMAT = os.getenv("AUDIO_INTERMEDIATE_FORMAT", "mp3").lower()
+
+# Fréquence d'échantillonnage des intermédiaires sans perte
+# (loudnorm sur-échantillonne à 192 kHz si on ne la fixe pas)
+INTERMEDIATE_SAMPLE_RATE = 44100
+
+# Flottant : après le boost de +10 dB la voix dépasse 0 dBFS, un format entier
+# (pcm_s16le, FLAC) écrêterait ces crêtes avant que le mixage ne les atténue
+LOSSLESS_CODECS = {
+    ".wav": ["-c:a", "pcm_f32le"],
+}
+
+# Formats sans perte demandés mais remplacés par le WAV flottant
+LOSSLESS_ALIASES = {"flac": "wav"}
+
+# Encodage MP3 historique des étapes de fusion / découpage
+MP3_CODEC_ARGS = ["-c:a", "libmp3lame", "-q:a", "2"]
+
+def intermediate_ext(audio_format=None):
+    """Extension des fichiers audio intermédiaires (".mp3" ou ".wav")."""
+    audio_format = (audio_format or AUDIO_INTERMEDIATE_FORMAT).lower().lstrip(".")
+    audio_format = LOSSLESS_ALIASES.get(audio_format, audio_format)
+    if f".{audio_format}" not in LOSSLESS_CODECS:
+        return ".mp3"
+    return f".{audio_format}"
+
+def intermediate_codec_args(output_path, default_args=()):
+    """
+    Arguments d'encodage FFmpeg pour un fichier intermédiaire, d'après son extension :
+    PCM flottant sans perte à 44.1 kHz, sinon default_args (encodage historique).
+    """
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext in LOSSLESS_CODECS:
+        return LOSSLESS_CODECS[ext] + ["-ar", str(INTERMEDIATE_SAMPLE_RATE)]
+    return list(default_args)
+
+# Normalisation de chaque partie de voix (normalize_audio_file de tts_engine)
+LOUDNORM_FILTER = "loudnorm=I=-23:TP=-2:LRA=11"
+
+# Graphe FFmpeg unique fusion + loudnorm + boost (AUDIO_FUSED_GRAPH=1)
+AUDIO_FUSED_GRAPH = os.getenv("AUDIO_FUSED_GRAPH", "0") == "1"
+
+# Format commun des segments avant concat (le filtre concat l'exige) ; la
+# disposition des canaux est celle de la première partie, comme le démuxeur
+# concat de merge_audio_files
+VOICE_SEGMENT_FORMAT = "aformat=sample_fmts=fltp:sample_rates={sample_rate}:channel_layouts={channel_layout}"
+
+def probe_channel_layout(audio_path, default="mono"):
+    """Disposition des canaux du premier flux audio (mono pour un flux mono sans disposition)."""
+    try:
+        result = subprocess.run([
+            "ffprobe", "-v", "error", "-select_streams", "a:0",
+            "-show_entries", "stream=channels,channel_layout", "-of", "json", audio_path
+        ], check=True, capture_output=True, text=True)
+        stream = json.loads(result.stdout)["streams"][0]
+    except (OSError, ValueError, KeyError, IndexError, subprocess.CalledProcessError):
+        return default
+    if stream.get("channel_layout"):
+        return stream["channel_layout"]
+    return {1: "mono", 2: "stereo"}.get(stream.get("channels"), default)
+
+def build_fused_voice_graph(part_count, gap_seconds=0.0, loudnorm_filter=LOUDNORM_FILTER, boost_db=10,
+                            channel_layout="mono"):
+    """
+    Construit le filter_complex : loudnorm par partie, silences anullsrc de
+    gap_seconds entre les parties, concat puis volume=+boost_db dB.
+    loudnorm_filter est un filtre commun ou une liste (un filtre par partie).
+    La sortie du graphe est [voice], en channel_layout.
+    """
+    if isinstance(loudnorm_filter, str):
+        loudnorm_filter = [loudnorm_filter] * part_count
+    segment_format = VOICE_SEGMENT_FORMAT.format(sample_rate=INTERMEDIATE_SAMPLE_RATE,
+                                                 channel_layout=channel_layout)
+    filters = []
+    labels = []
+    for i in range(part_count):
+        filters.append(f"[{i}:a]{loudnorm_filter[i]},{segment_format}[p{i}]")
+        if labels and gap_seconds > 0:
+            filters.append(f"anullsrc=r={INTERMEDIATE_SAMPLE_RATE}:cl={channel_layout}:d={gap_seconds},"
+                           f"{segment_format}[g{i}]")
+            labels.append(f"[g{i}]")
+        labels.append(f"[p{i}]")
+    filters.append(f"{''.join(labels)}concat=n={len(labels)}:v=0:a=1,volume={boost_db}dB[voice]")
+    return ";".join(filters)
+
+def render_fused_voice(audio_parts, output_file, gap_seconds=0.0, loudnorm_filter=None, boost_db=10):
+    """
+    Produit l'audio de voix boosté (équivalent de normalize_audio_file par partie +
+    merge_audio_files + boost_audio) en un seul processus FFmpeg et un seul encodage.
+    audio_parts sont les parties brutes (non normalisées) dans l'ordre ; la
+    sortie garde leur disposition de canaux (mono pour ElevenLabs).
+    """
+    if loudnorm_filter is None:
+        loudnorm_filter = [voice_loudnorm_filter(part) for part in audio_parts]
+    channel_layout = probe_channel_layout(audio_parts[0])
+    cmd = ["ffmpeg", "-y"]
+    for part in audio_parts:
+        cmd += ["-i", part]
+    cmd += [
+        "-filter_complex", build_fused_voice_graph(len(audio_parts), gap_seconds, loudnorm_filter, boost_db,
+                                                   channel_layout),
+        "-map", "[voice]",
+        *intermediate_codec_args(output_file),
+        output_file
+    ]
+    subprocess.run(cmd, check=True)
+    print(f"✅ Voix fusionnée, normalisée et boostée de +{boost_db} dB en une passe : {output_file}")
+
+##############################
+# LOUDNORM EN DEUX PASSES (mesures en cache)
+##############################
+
+# Deux passes : mesure (print_format=json) puis normalisation linéaire (LOUDNORM_TWO_PASS=1)
+LOUDNORM_TWO_PASS = os.getenv("LOUDNORM_TWO_PASS", "0") == "1"
+
+# Mesures loudnorm en cache, par hash du fichier et cibles
+LOUDNORM_CACHE_DIR = os.getenv("LOUDNORM_CACHE_DIR", os.path.join(os.getcwd(), "cache", "loudnorm"))
+
+# Niveau des musiques de fond avant atténuation (volume=0.2) dans le mixage
+BACKGROUND_LOUDNESS_I = float(os.getenv("BACKGROUND_LOUDNESS_I", "-14"))
+
+def hash_file(path, block_size=1024 * 1024):
+    """Empreinte SHA-256 du contenu d'un fichier (lecture par blocs)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def measure_loudness(input_file, target_i=-23, target_tp=-2, target_lra=11, use_cache=True,
+                     content_hash=None):
+    """
+    Première passe loudnorm : mesure du fichier (I, TP, LRA, seuil, offset).
+    Les mesures sont mises en cache par hash du contenu : une musique de fond
+    n'est analysée qu'une fois, toutes exécutions confondues. content_hash
+    (hash_file déjà calculé par l'appelant) évite de relire le fichier.
+
+    Returns:
+        dict: Mesures loudnorm (clés input_i, input_tp, input_lra, input_thresh, target_offset)
+    """
+    cache_path = None
+    if use_cache:
+        material = f"{content_hash or hash_file(input_file)}:{target_i}:{target_tp}:{target_lra}"
+        cache_key = hashlib.sha256(material.encode("utf-8")).hexdigest()
+        cache_path = os.path.join(LOUDNORM_CACHE_DIR, f"{cache_key}.json")
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+
+    cmd = [
+        "ffmpeg", "-hide_banner", "-nostats",
+        "-i", input_file,
+        "-af", f"loudnorm=I={target_i}:TP={target_tp}:LRA={target_lra}:print_format=json",
+        "-f", "null", "-"
+    ]
+    result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    stderr = result.stderr
+    measured = json.loads(stderr[stderr.rindex("{"):stderr.rindex("}") + 1])
+    print(f"📏 Loudness mesurée : {os.path.basename(input_file)} = {measured['input_i']} LUFS")
+
+    if cache_path:
+        os.makedirs(LOUDNORM_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(measured, f)
+        os.replace(tmp_path, cache_path)
+    return measured
+
+def two_pass_loudnorm_filter(input_file, target_i=-23, target_tp=-2, target_lra=11):
+    """Filtre loudnorm linéaire (deuxième passe) à partir des mesures de input_file."""
+    m = measure_loudness(input_file, target_i, target_tp, target_lra)
+    return (f"loudnorm=I={target_i}:TP={target_tp}:LRA={target_lra}"
+            f":measured_I={m['input_i']}:measured_TP={m['input_tp']}"
+            f":measured_LRA={m['input_lra']}:measured_thresh={m['input_thresh']}"
+            f":offset={m['target_offset']}:linear=true")
+
+def voice_loudnorm_filter(input_file, target_i=-23):
+    """Filtre de normalisation d'une partie de voix : deux passes si LOUDNORM_TWO_PASS."""
+    if LOUDNORM_TWO_PASS:
+        return two_pass_loudnorm_filter(input_file, target_i)
+    return f"loudnorm=I={target_i}:TP=-2:LRA=11"
+
+def background_loudnorm_prefix(bg_music):
+    """
+    Préfixe de filtre pour la musique de fond dans le mixage : avec
+    LOUDNORM_TWO_PASS, la musique est ramenée à BACKGROUND_LOUDNESS_I (mesure
+    en cache) avant l'atténuation, pour un niveau constant d'une musique à l'autre.
+    """
+    if not LOUDNORM_TWO_PASS:
+        return ""
+    return two_pass_loudnorm_filter(bg_music, BACKGROUND_LOUDNESS_I, -1) + ","
+
+##############################
+# INSERTION DES PAUSES EN UNE PASSE
+##############################
+
+def build_silence_insertion_graph(pause_points_ms, pause_duration=3.0):
+    """
+    filter_complex d'insertion de pauses : asegment coupe la voix aux points
+    de pause (coupe exacte à l'échantillon, un seul décodage), apad ajoute le
+    silence à la fin de chaque segment, concat recolle. La sortie est [out].
+    Plusieurs pauses au même point s'additionnent.
+    """
+    pause_counts = {}
+    for pause_ms in sorted(pause_points_ms):
+        pause_counts[pause_ms] = pause_counts.get(pause_ms, 0) + 1
+    points = sorted(pause_counts)
+
+    timestamps = "|".join(f"{p / 1000.0:.3f}" for p in points)
+    outputs = "".join(f"[s{i}]" for i in range(len(points) + 1))
+    filters = [f"[0:a]asegment=timestamps={timestamps}{outputs}"]
+    for i, point in enumerate(points):
+        pad = pause_counts[point] * pause_duration
+        filters.append(f"[s{i}]asetpts=PTS-STARTPTS,apad=pad_dur={pad}[p{i}]")
+    last = len(points)
+    filters.append(f"[s{last}]asetpts=PTS-STARTPTS[p{last}]")
+    filters.append(f"{''.join(f'[p{i}]' for i in range(last + 1))}concat=n={last + 1}:v=0:a=1[out]")
+    return ";".join(filters)
+
+def insert_silences_single_pass(audio_path, output_path, pause_points_ms, pause_duration=3.0):
+    """
+    Insère pause_duration secondes de silence après chaque point de pause (ms),
+    en un seul processus FFmpeg : un décodage et un encodage quel que soit le
+    nombre de pauses.
+    """
+    cmd = [
+        "ffmpeg", "-y",
+        "-i", audio_path,
+        "-filter_complex", build_silence_insertion_graph(pause_points_ms, pause_duration),
+        "-map", "[out]",
+        *intermediate_codec_args(output_path, MP3_CODEC_ARGS),
+        output_path
+    ]
+    subprocess.run(cmd, check=True, capture_output=True)
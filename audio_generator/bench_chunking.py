@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la stabilité des chunks TTS face aux modifications du script.
+
+Sur des scripts synthétiques, insère une phrase près du début puis compte la
+part des chunks du script modifié dont le texte existait déjà avant la
+modification (chunks relus du cache TTS), pour le découpage d'origine
+(split_text_smart) et pour split_text_content_defined. Vérifie aussi que
+les deux découpages respectent la limite de l'API et ne perdent aucun mot.
+
+Lancement :
+    python -m audio_generator.bench_chunking [--scripts 30] [--sentences 400]
+"""
+import random
+import argparse
+
+from audio_generator.chunking import TTS_MAX_CHUNK_CHARS, split_text_content_defined
+
+WORDS = [
+    "Seigneur", "berger", "paix", "cœur", "grâce", "lumière", "chemin", "prière",
+    "amour", "vérité", "force", "famille", "espérance", "parole", "miséricorde",
+    "esprit", "joie", "foi", "pardon", "promesse", "éternel", "fidèle", "saint",
+]
+
+def reference_split_text_smart(text, max_length=4900):
+    """Découpage d'origine des pipelines (split_text_smart), conservé pour la comparaison."""
+    chunks = []
+    while len(text) > max_length:
+        split_index = text.rfind(".", 0, max_length)
+        if split_index == -1:
+            split_index = max_length
+        chunks.append(text[:split_index+1].strip())
+        text = text[split_index+1:].strip()
+    chunks.append(text.strip())
+    return chunks
+
+def build_sentence(rng):
+    """Phrase synthétique de 6 à 30 mots."""
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 30))]
+    return " ".join(words).capitalize() + rng.choice([".", ".", ".", "!", "?"])
+
+def build_edit_pair(rng, sentence_count):
+    """Script synthétique et sa version avec une phrase insérée dans le premier dixième."""
+    sentences = [build_sentence(rng) for _ in range(sentence_count)]
+    edited = list(sentences)
+    edited.insert(rng.randint(0, max(1, sentence_count // 10)), build_sentence(rng))
+    return " ".join(sentences), " ".join(edited)
+
+def check_chunks(text, chunks, max_length=TTS_MAX_CHUNK_CHARS):
+    """Aucun chunk au-delà de la limite, aucun mot perdu ni ajouté."""
+    if any(len(chunk) > max_length for chunk in chunks):
+        raise AssertionError("Un chunk dépasse la limite de l'API")
+    if " ".join(chunks).split() != text.split():
+        raise AssertionError("Le découpage a modifié le texte")
+
+def reuse_ratio(split_func, original, edited):
+    """Part des chunks du script modifié déjà présents avant la modification."""
+    before = set(split_func(original))
+    after = split_func(edited)
+    check_chunks(edited, after)
+    return sum(chunk in before for chunk in after) / len(after)
+
+def run_benchmark(script_count=30, sentence_count=400, seed=42):
+    """
+    Compare la réutilisation des chunks des deux découpages.
+
+    Returns:
+        tuple: (réutilisation split_text_smart, réutilisation content-defined)
+    """
+    rng = random.Random(seed)
+    fixed, content = [], []
+    for _ in range(script_count):
+        original, edited = build_edit_pair(rng, sentence_count)
+        fixed.append(reuse_ratio(reference_split_text_smart, original, edited))
+        content.append(reuse_ratio(split_text_content_defined, original, edited))
+    fixed_ratio = sum(fixed) / len(fixed)
+    content_ratio = sum(content) / len(content)
+
+    print(f"📊 {script_count} scripts synthétiques de {sentence_count} phrases, une phrase insérée au début")
+    print(f"   Chunks réutilisés (split_text_smart)           : {fixed_ratio:.0%}")
+    print(f"   Chunks réutilisés (split_text_content_defined) : {content_ratio:.0%}")
+    return fixed_ratio, content_ratio
+
+def main():
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Benchmark de la stabilité des chunks TTS")
+    parser.add_argument("--scripts", type=int, default=30)
+    parser.add_argument("--sentences", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run_benchmark(args.scripts, args.sentences, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Équivalence et benchmark du moteur NumPy (AUDIO_ENGINE=numpy) face à la
+chaîne FFmpeg de mix_audio_with_background_delayed.
+
+Sur une voix mono et une musique stéréo synthétiques (plus courte que la voix,
+donc bouclée), compare :
+- FFmpeg : insert_silences_single_pass puis graphe adelay + volume + amix
+- NumPy  : render_voice_mix (pauses, délai et mixage par blocs)
+Les deux sorties sont écrites en WAV flottant (sans perte) et comparées
+échantillon par échantillon ; le pic de mémoire Python du moteur NumPy est
+mesuré (tracemalloc) pour vérifier qu'il ne dépend pas de la durée.
+
+Lancement :
+    python -m audio_generator.bench_numpy_mix [--seconds 120] [--pauses 4]
+"""
+import os
+import io
+import time
+import argparse
+import tempfile
+import contextlib
+import subprocess
+import tracemalloc
+
+import numpy as np
+
+from audio_generator.audio_chain import INTERMEDIATE_SAMPLE_RATE, insert_silences_single_pass
+from audio_generator.numpy_engine import MIX_CHANNELS, render_voice_mix
+
+# Écarts maximaux tolérés (amplitude, pleine échelle = 1) : les mixages sont
+# identiques tant que la voix est active ; ensuite amix remonte le gain de la
+# musique par trame (taille dépendant des entrées), le moteur NumPy par échantillon
+PARITY_TOLERANCE = 1e-4
+TRANSITION_TOLERANCE = 2e-2
+
+FLOAT_WAV_ARGS = ["-c:a", "pcm_f32le"]
+
+def synthesize(path, source, seconds, layout):
+    """Écrit seconds secondes d'une source lavfi en WAV flottant."""
+    subprocess.run([
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "lavfi", "-i", f"{source}:d={seconds}",
+        "-af", f"aformat=channel_layouts={layout}",
+        "-ar", str(INTERMEDIATE_SAMPLE_RATE), *FLOAT_WAV_ARGS, path
+    ], check=True)
+
+def decode(path):
+    """Décode un fichier en tableau float32 (échantillons, canaux)."""
+    result = subprocess.run(["ffmpeg", "-v", "error", "-i", path, "-f", "f32le", "-"],
+                            check=True, capture_output=True)
+    return np.frombuffer(result.stdout, dtype=np.float32).reshape(-1, MIX_CHANNELS)
+
+def reference_mix(voice, bg_music, output, total_duration, pause_points_ms, work_dir, voice_delay_seconds=2):
+    """Chaîne FFmpeg des pipelines (pauses insérées dans un fichier, puis amix)."""
+    if pause_points_ms:
+        paused = os.path.join(work_dir, "voice_with_pauses.wav")
+        insert_silences_single_pass(voice, paused, pause_points_ms, pause_duration=3.0)
+        voice = paused
+    delay_ms = voice_delay_seconds * 1000
+    subprocess.run([
+        "ffmpeg", "-y", "-v", "error",
+        "-i", voice,
+        "-stream_loop", "-1", "-i", bg_music,
+        "-filter_complex", f"[0:a]aformat=channel_layouts=stereo,adelay={delay_ms}|{delay_ms}[a0];"
+                           "[1:a]volume=0.2[a1];[a0][a1]amix=inputs=2:duration=longest:dropout_transition=3",
+        "-t", str(total_duration),
+        *FLOAT_WAV_ARGS, output
+    ], check=True)
+
+def run_parity(seconds=120, pause_count=4):
+    """
+    Produit les deux mixages et vérifie leur équivalence.
+
+    Returns:
+        dict: Temps des deux moteurs, écarts maximaux, pic mémoire NumPy (Mo)
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        voice = os.path.join(work_dir, "voice.wav")
+        bg_music = os.path.join(work_dir, "bg.wav")
+        # Voix : porteuse modulée (mono) ; musique : deux sinus différents à gauche et à droite
+        synthesize(voice, "aevalsrc=0.6*sin(2*PI*220*t)*(0.5+0.5*sin(2*PI*0.7*t))", seconds, "mono")
+        synthesize(bg_music, "aevalsrc=0.5*sin(2*PI*330*t)|0.5*sin(2*PI*495*t)", max(1.0, seconds / 3), "stereo")
+        pause_points_ms = [int(seconds * 1000 * (i + 1) / (pause_count + 1)) for i in range(pause_count)]
+        total_duration = seconds + 3.0 * pause_count + 4
+
+        reference_output = os.path.join(work_dir, "ffmpeg.wav")
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            reference_mix(voice, bg_music, reference_output, total_duration, pause_points_ms, work_dir)
+        ffmpeg_time = time.perf_counter() - start
+
+        numpy_output = os.path.join(work_dir, "numpy.wav")
+        tracemalloc.start()
+        start = time.perf_counter()
+        render_voice_mix(voice, bg_music, numpy_output, pause_points_ms=pause_points_ms,
+                         codec_args=FLOAT_WAV_ARGS)
+        numpy_time = time.perf_counter() - start
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+        reference, mixed = decode(reference_output), decode(numpy_output)
+
+    if abs(len(reference) - len(mixed)) > 1:
+        raise AssertionError(f"Durées différentes : {len(reference)} vs {len(mixed)} échantillons")
+    frames = min(len(reference), len(mixed))
+    voice_end = int(round((2 + seconds + 3.0 * pause_count) * INTERMEDIATE_SAMPLE_RATE))
+    diff = np.abs(reference[:frames] - mixed[:frames])
+    max_diff = float(diff[:voice_end].max())
+    transition_diff = float(diff[voice_end:].max())
+    if max_diff > PARITY_TOLERANCE:
+        raise AssertionError(f"Les mixages diffèrent pendant la voix (écart maximal {max_diff:.2e})")
+    if transition_diff > TRANSITION_TOLERANCE:
+        raise AssertionError(f"Les mixages diffèrent après la voix (écart maximal {transition_diff:.2e})")
+    # La musique stéréo doit le rester (pas de downmix mono)
+    if np.allclose(mixed[:, 0], mixed[:, 1]):
+        raise AssertionError("Le mixage NumPy est mono")
+
+    return {"ffmpeg_time": ffmpeg_time, "numpy_time": numpy_time, "max_diff": max_diff,
+            "transition_diff": transition_diff, "peak_mb": peak_mb, "frames": frames}
+
+def main():
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Équivalence et benchmark du moteur audio NumPy")
+    parser.add_argument("--seconds", type=float, default=120, help="Durée de la voix synthétique")
+    parser.add_argument("--pauses", type=int, default=4, help="Nombre de pauses de prière insérées")
+    args = parser.parse_args()
+
+    result = run_parity(args.seconds, args.pauses)
+    print(f"📊 Voix synthétique : {args.seconds:.0f}s, {args.pauses} pause(s), "
+          f"{result['frames'] / INTERMEDIATE_SAMPLE_RATE:.1f}s mixées en stéréo")
+    print(f"   Écart maximal FFmpeg / NumPy : {result['max_diff']:.2e} pendant la voix, "
+          f"{result['transition_diff']:.2e} pendant la remontée de la musique")
+    print(f"   Chaîne FFmpeg (pauses + amix) : {result['ffmpeg_time']:.2f} s")
+    print(f"   Moteur NumPy par blocs        : {result['numpy_time']:.2f} s")
+    print(f"   💾 Pic mémoire NumPy          : {result['peak_mb']:.1f} Mo")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Équivalence et benchmark de l'insertion des pauses de prière.
+
+Compare l'implémentation d'origine de insert_silence_in_audio (un FFmpeg par
+segment, un fichier de silence puis une concaténation) à
+insert_silences_single_pass (un seul FFmpeg, asegment + apad + concat) sur
+une voix synthétique, et vérifie que les deux sorties sont identiques
+échantillon par échantillon (intermédiaires WAV flottants, sans perte).
+
+Lancement :
+    python -m audio_generator.bench_silences [--seconds 600] [--pauses 8]
+"""
+import os
+import time
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+
+from audio_generator.audio_chain import INTERMEDIATE_SAMPLE_RATE, intermediate_codec_args, insert_silences_single_pass
+
+# Écart maximal toléré entre les deux sorties (amplitude, pleine échelle = 1)
+PARITY_TOLERANCE = 1e-6
+
+# Décalage toléré (en échantillons) : le -ss/-t d'origine arrondit aux échantillons
+LENGTH_TOLERANCE_FRAMES = 2
+
+def reference_insert_silences(audio_path, output_path, pause_points_ms, pause_duration, work_dir):
+    """Implémentation d'origine (découpe par -ss/-t, fichier de silence, concat), conservée pour la comparaison."""
+    ext = os.path.splitext(output_path)[1]
+    silence_file = os.path.join(work_dir, f"silence_temp{ext}")
+    subprocess.run([
+        "ffmpeg", "-y", "-f", "lavfi", "-i", "anullsrc=r=44100:cl=stereo",
+        "-t", str(pause_duration), *intermediate_codec_args(silence_file), silence_file
+    ], check=True, capture_output=True)
+
+    segments = []
+    prev_time = 0
+    for i, pause_time_ms in enumerate(sorted(pause_points_ms)):
+        pause_time_s = pause_time_ms / 1000.0
+        segment_file = os.path.join(work_dir, f"segment_{i}{ext}")
+        subprocess.run([
+            "ffmpeg", "-y", "-i", audio_path, "-ss", str(prev_time), "-t", str(pause_time_s - prev_time),
+            *intermediate_codec_args(segment_file), segment_file
+        ], check=True, capture_output=True)
+        segments += [segment_file, silence_file]
+        prev_time = pause_time_s
+
+    last_segment_file = os.path.join(work_dir, f"segment_last{ext}")
+    subprocess.run([
+        "ffmpeg", "-y", "-i", audio_path, "-ss", str(prev_time),
+        *intermediate_codec_args(last_segment_file), last_segment_file
+    ], check=True, capture_output=True)
+    segments.append(last_segment_file)
+
+    concat_list_file = os.path.join(work_dir, "concat_audio_list.txt")
+    with open(concat_list_file, "w", encoding="utf-8") as f:
+        for segment in segments:
+            f.write(f"file '{os.path.abspath(segment)}'\n")
+    subprocess.run([
+        "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", concat_list_file,
+        *intermediate_codec_args(output_path), output_path
+    ], check=True, capture_output=True)
+
+def decode(path):
+    """Décode un fichier stéréo en tableau float32 (échantillons, canaux)."""
+    result = subprocess.run(["ffmpeg", "-v", "error", "-i", path, "-f", "f32le", "-"],
+                            check=True, capture_output=True)
+    return np.frombuffer(result.stdout, dtype=np.float32).reshape(-1, 2)
+
+def run_parity(seconds=600, pause_count=8, pause_duration=3.0):
+    """
+    Insère les mêmes pauses avec les deux implémentations et compare les sorties.
+
+    Returns:
+        dict: Temps des deux implémentations, écart maximal, processus FFmpeg lancés
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        voice = os.path.join(work_dir, "voice.wav")
+        # Voix stéréo, comme le fichier de silence d'origine (anullsrc stéréo)
+        subprocess.run([
+            "ffmpeg", "-y", "-v", "error", "-f", "lavfi",
+            "-i", f"aevalsrc=0.6*sin(2*PI*220*t)*(0.5+0.5*sin(2*PI*0.7*t))|0.4*sin(2*PI*330*t):d={seconds}",
+            "-ar", str(INTERMEDIATE_SAMPLE_RATE), *intermediate_codec_args(voice), voice
+        ], check=True)
+        # Points de pause alignés sur la milliseconde, comme ceux de detect_prayer_transitions
+        pause_points_ms = [int(seconds * 1000 * (i + 1) / (pause_count + 1)) for i in range(pause_count)]
+
+        reference_output = os.path.join(work_dir, "reference.wav")
+        start = time.perf_counter()
+        reference_insert_silences(voice, reference_output, pause_points_ms, pause_duration, work_dir)
+        reference_time = time.perf_counter() - start
+
+        single_output = os.path.join(work_dir, "single_pass.wav")
+        start = time.perf_counter()
+        insert_silences_single_pass(voice, single_output, pause_points_ms, pause_duration)
+        single_time = time.perf_counter() - start
+
+        reference, single = decode(reference_output), decode(single_output)
+
+    if abs(len(reference) - len(single)) > LENGTH_TOLERANCE_FRAMES:
+        raise AssertionError(f"Durées différentes : {len(reference)} vs {len(single)} échantillons")
+    frames = min(len(reference), len(single))
+    max_diff = float(np.abs(reference[:frames] - single[:frames]).max())
+    if max_diff > PARITY_TOLERANCE:
+        raise AssertionError(f"Les sorties diffèrent (écart maximal {max_diff:.2e})")
+
+    return {"reference_time": reference_time, "single_time": single_time, "max_diff": max_diff,
+            "reference_processes": pause_count + 3, "frames": frames}
+
+def main():
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Équivalence et benchmark de l'insertion des pauses")
+    parser.add_argument("--seconds", type=float, default=600, help="Durée de la voix synthétique")
+    parser.add_argument("--pauses", type=int, default=8, help="Nombre de pauses insérées")
+    args = parser.parse_args()
+
+    result = run_parity(args.seconds, args.pauses)
+    print(f"📊 Voix synthétique : {args.seconds:.0f}s, {args.pauses} pause(s) de 3s, "
+          f"{result['frames'] / INTERMEDIATE_SAMPLE_RATE:.1f}s en sortie")
+    print(f"   Écart maximal entre les sorties : {result['max_diff']:.2e}")
+    print(f"   Implémentation d'origine ({result['reference_processes']} FFmpeg) : {result['reference_time']:.2f} s")
+    print(f"   Une seule passe (1 FFmpeg)         : {result['single_time']:.2f} s")
+    print(f"   ⚡ Accélération                     : x{result['reference_time'] / result['single_time']:.1f}")
+
+if __name__ == "__main__":
+    main()
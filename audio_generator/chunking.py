@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Découpage du script en chunks TTS stables face aux modifications.
+
+split_text_smart coupe à la dernière phrase avant 4900 caractères en partant
+du début : insérer une phrase au début décale toutes les frontières suivantes
+et invalide tous les caches en aval (TTS, normalisation, transcription).
+
+Ici les frontières dépendent du contenu : on coupe après une phrase quand le
+hash des dernières phrases tombe dans une plage donnée (chunking défini par le
+contenu). Une modification locale ne déplace que les frontières voisines ;
+les chunks suivants se resynchronisent et gardent le même texte.
+"""
+import os
+import re
+import hashlib
+
+# Mode de découpage : "fixed" (split_text_smart) ou "content" (frontières stables)
+TTS_CHUNKING = os.getenv("TTS_CHUNKING", "fixed").lower()
+
+# Limite de l'API ElevenLabs
+TTS_MAX_CHUNK_CHARS = 4900
+
+# Taille minimale d'un chunk et longueur moyenne ajoutée au-delà de ce minimum
+CDC_MIN_CHARS = int(os.getenv("CDC_MIN_CHARS", "1000"))
+CDC_AVERAGE_EXTRA_CHARS = int(os.getenv("CDC_AVERAGE_EXTRA_CHARS", "2500"))
+
+# Nombre de phrases dans la fenêtre glissante du hash
+CDC_WINDOW_SENTENCES = 2
+
+# Fin de phrase : ponctuation, guillemets ou parenthèses fermants, puis séparateur (espaces, sauts de ligne)
+SENTENCE_END = re.compile(r'(?<=[.!?…])["»)\]]*(\s+)')
+
+def sentence_spans(text):
+    """
+    Positions (début, fin) des phrases dans text : la ponctuation finale reste
+    attachée, les séparateurs (espaces, sauts de ligne) restent entre les phrases.
+    """
+    spans = []
+    start = len(text) - len(text.lstrip())
+    for match in SENTENCE_END.finditer(text):
+        if match.start(1) > start:
+            spans.append((start, match.start(1)))
+        start = match.end(1)
+    end = len(text.rstrip())
+    if end > start:
+        spans.append((start, end))
+    return spans
+
+def split_sentences(text):
+    """Découpe le texte en phrases (la ponctuation finale reste attachée)."""
+    return [text[start:end] for start, end in sentence_spans(text)]
+
+def _split_long_span(text, start, end, max_length):
+    """Coupe une phrase plus longue que max_length sur les espaces (positions dans text)."""
+    spans = []
+    while end - start > max_length:
+        split_index = max(text.rfind(" ", start, start + max_length), text.rfind("\n", start, start + max_length))
+        if split_index <= start:
+            split_index = start + max_length
+        piece_end = split_index
+        while piece_end > start + 1 and text[piece_end - 1].isspace():
+            piece_end -= 1
+        spans.append((start, piece_end))
+        start = split_index
+        while start < end and text[start].isspace():
+            start += 1
+    if end > start:
+        spans.append((start, end))
+    return spans
+
+def _window_hash(sentences):
+    """Hash stable d'une fenêtre de phrases (indépendant de PYTHONHASHSEED)."""
+    digest = hashlib.blake2b(" ".join(sentences).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+def split_text_content_defined(text, max_length=TTS_MAX_CHUNK_CHARS,
+                               min_length=None, average_extra=None):
+    """
+    Découpe le texte en chunks dont les frontières dépendent du contenu.
+
+    Une frontière est posée après une phrase si le chunk courant dépasse
+    min_length et si le hash des CDC_WINDOW_SENTENCES dernières phrases tombe
+    sous un seuil proportionnel à la longueur de la phrase (probabilité de
+    coupure constante par caractère, soit environ min_length + average_extra
+    caractères par chunk). max_length n'est jamais dépassé.
+
+    Les chunks sont des tranches du texte source : les sauts de ligne et de
+    paragraphe (pauses d'ElevenLabs) sont conservés comme avec split_text_smart.
+    Un texte qui tient dans max_length reste un seul chunk (une requête TTS).
+
+    Args:
+        text: Script nettoyé
+        max_length: Taille maximale d'un chunk (limite de l'API)
+        min_length: Taille minimale avant de pouvoir couper (défaut: CDC_MIN_CHARS)
+        average_extra: Longueur moyenne au-delà du minimum (défaut: CDC_AVERAGE_EXTRA_CHARS)
+
+    Returns:
+        list: Chunks de texte
+    """
+    if len(text.strip()) <= max_length:
+        return [text.strip()] if text.strip() else []
+
+    min_length = CDC_MIN_CHARS if min_length is None else min_length
+    average_extra = max(1, CDC_AVERAGE_EXTRA_CHARS if average_extra is None else average_extra)
+    min_length = min(min_length, max_length)
+
+    spans = []
+    for start, end in sentence_spans(text):
+        spans.extend(_split_long_span(text, start, end, max_length))
+
+    chunks = []
+    chunk_start = None
+    chunk_end = None
+    window = []
+
+    for start, end in spans:
+        # Coupure forcée : la phrase ne rentre plus dans la limite de l'API
+        if chunk_start is not None and end - chunk_start > max_length:
+            chunks.append(text[chunk_start:chunk_end])
+            chunk_start = None
+
+        if chunk_start is None:
+            chunk_start = start
+        chunk_end = end
+        window = (window + [text[start:end]])[-CDC_WINDOW_SENTENCES:]
+
+        if chunk_end - chunk_start >= min_length:
+            threshold = (2 ** 64) * min(1.0, (end - start) / average_extra)
+            if _window_hash(window) < threshold:
+                chunks.append(text[chunk_start:chunk_end])
+                chunk_start = None
+
+    if chunk_start is not None:
+        chunks.append(text[chunk_start:chunk_end])
+    return chunks
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Moteur audio en mémoire (NumPy) pour la fin de chaîne de la voix.
+
+Avec AUDIO_ENGINE=numpy, insertion des pauses de prière, boucle et
+atténuation de la musique de fond, délai de la voix et mixage sont faits sur
+des blocs float32 : la voix et la musique sont décodées une fois (FFmpeg en
+pipe, f32le, stéréo) et le résultat est encodé une seule fois en AAC. Aucun
+fichier intermédiaire, deux décodages et un encodage au lieu d'un processus
+FFmpeg par étape. Le traitement se fait par blocs de MIX_BLOCK_FRAMES
+échantillons : la mémoire reste constante quelle que soit la durée.
+
+Le mixage reproduit amix=inputs=2:duration=longest:dropout_transition=3
+(poids 1/2 par entrée, remontée progressive du gain de la musique quand la
+voix se termine), pour rester équivalent à mix_audio_with_background_delayed.
+Vérification de l'équivalence et mesure des temps :
+    python -m audio_generator.bench_numpy_mix [--seconds 120]
+"""
+import os
+import subprocess
+
+import numpy as np
+
+from audio_generator.audio_chain import (
+    LOUDNORM_TWO_PASS, BACKGROUND_LOUDNESS_I, INTERMEDIATE_SAMPLE_RATE, measure_loudness
+)
+
+# Moteur de fin de chaîne : "ffmpeg" (défaut, un processus par étape) ou "numpy"
+AUDIO_ENGINE = os.getenv("AUDIO_ENGINE", "ffmpeg").lower()
+
+# Paramètres du mixage historique
+BACKGROUND_VOLUME = 0.2
+DROPOUT_TRANSITION_SECONDS = 3.0
+MIX_CODEC_ARGS = ["-c:a", "aac", "-b:a", "192k"]
+
+# Le mixage final est stéréo (musique de fond stéréo, voix dupliquée sur les deux canaux)
+MIX_CHANNELS = 2
+
+# Taille des blocs traités (en échantillons) : ~0,5 Mo par bloc stéréo float32
+MIX_BLOCK_FRAMES = 1 << 16
+
+def start_decoder(path, sample_rate=INTERMEDIATE_SAMPLE_RATE, channels=MIX_CHANNELS, loop=False):
+    """
+    Lance FFmpeg qui décode path en f32le sur sa sortie standard.
+    Le rééchantillonnage et le passage en channels canaux sont faits par FFmpeg,
+    comme dans le graphe amix ; avec loop, le fichier est répété sans fin.
+    """
+    cmd = ["ffmpeg", "-v", "error"]
+    if loop:
+        cmd += ["-stream_loop", "-1"]
+    cmd += [
+        "-i", path,
+        "-map", "0:a:0",
+        "-f", "f32le", "-ac", str(channels), "-ar", str(sample_rate),
+        "pipe:1"
+    ]
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE)
+
+def read_frames(process, frames, channels=MIX_CHANNELS):
+    """Lit jusqu'à frames échantillons sur la sortie du décodeur (moins en fin de flux)."""
+    data = process.stdout.read(frames * channels * 4)
+    usable = len(data) - len(data) % (channels * 4)
+    return np.frombuffer(data[:usable], dtype=np.float32).reshape(-1, channels)
+
+def finish_decoder(process, cmd_label, expect_eof=True):
+    """Arrête un décodeur ; lève CalledProcessError s'il a échoué avant la fin de son flux."""
+    if not expect_eof:
+        process.kill()
+    process.stdout.close()
+    returncode = process.wait()
+    if expect_eof and returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd_label)
+
+def start_encoder(output, sample_rate=INTERMEDIATE_SAMPLE_RATE, channels=MIX_CHANNELS, codec_args=MIX_CODEC_ARGS):
+    """Lance FFmpeg qui encode le flux f32le reçu sur son entrée standard vers output."""
+    cmd = [
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "f32le", "-ar", str(sample_rate), "-ac", str(channels),
+        "-i", "pipe:0",
+        *codec_args,
+        output
+    ]
+    return subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+def db_to_gain(gain_db):
+    """Gain linéaire d'un gain en dB."""
+    return 10.0 ** (gain_db / 20.0)
+
+def pause_schedule(pause_points_ms, pause_duration=3.0, sample_rate=INTERMEDIATE_SAMPLE_RATE):
+    """
+    Points de pause en échantillons de la voix source, triés, avec la durée de
+    silence (en échantillons) à insérer à chacun. Plusieurs pauses au même point
+    s'additionnent (comme build_silence_insertion_graph).
+    """
+    pause_frames = int(round(pause_duration * sample_rate))
+    schedule = {}
+    for pause_ms in pause_points_ms or []:
+        point = max(0, int(round(pause_ms * sample_rate / 1000.0)))
+        schedule[point] = schedule.get(point, 0) + pause_frames
+    return sorted(schedule.items())
+
+def zero_blocks(frames, channels=MIX_CHANNELS, block_frames=MIX_BLOCK_FRAMES):
+    """Silence de frames échantillons, par blocs."""
+    while frames > 0:
+        count = min(block_frames, frames)
+        yield np.zeros((count, channels), dtype=np.float32)
+        frames -= count
+
+def voice_timeline(decoder, delay_frames, pauses, gain=1.0, channels=MIX_CHANNELS,
+                   block_frames=MIX_BLOCK_FRAMES):
+    """
+    Blocs de la piste voix telle qu'elle entre dans amix : délai initial, voix
+    (avec gain) et silences insérés aux points de pause. Les pauses situées
+    après la fin de la voix sont ajoutées à la fin, comme asegment + apad.
+    """
+    yield from zero_blocks(delay_frames, channels, block_frames)
+    position = 0
+    pauses = list(pauses)
+    while True:
+        # Ne jamais lire au-delà du prochain point de pause
+        limit = block_frames if not pauses else min(block_frames, pauses[0][0] - position)
+        if limit > 0:
+            block = read_frames(decoder, limit, channels)
+            if len(block) == 0:
+                break
+            position += len(block)
+            yield block * np.float32(gain) if gain != 1.0 else block
+            if len(block) < limit:
+                break
+        if pauses and pauses[0][0] <= position:
+            yield from zero_blocks(pauses.pop(0)[1], channels, block_frames)
+    for _, frames in pauses:
+        yield from zero_blocks(frames, channels, block_frames)
+
+def background_gain(bg_music):
+    """
+    Gain linéaire appliqué à la musique de fond avant l'atténuation : équivalent
+    de background_loudnorm_prefix (loudnorm linéaire, plafonné par le true peak).
+    """
+    if not LOUDNORM_TWO_PASS:
+        return 1.0
+    measured = measure_loudness(bg_music, BACKGROUND_LOUDNESS_I, -1)
+    gain_db = BACKGROUND_LOUDNESS_I - float(measured["input_i"])
+    gain_db = min(gain_db, -1 - float(measured["input_tp"]))
+    return db_to_gain(gain_db)
+
+def read_background(decoder, frames, channels=MIX_CHANNELS, bg_music=None):
+    """
+    frames échantillons de la musique bouclée. La musique est répétée sans fin :
+    un flux qui s'arrête signifie que le décodage a échoué (fichier illisible
+    ou vide), ce qui lève une erreur au lieu d'un mixage sans musique.
+    """
+    block = read_frames(decoder, frames, channels)
+    if len(block) < frames:
+        returncode = decoder.wait()
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, ["ffmpeg", "-i", bg_music])
+        raise RuntimeError(f"Musique de fond vide ou illisible : {bg_music}")
+    return block
+
+def render_voice_mix(voice_audio, bg_music, output, voice_delay_seconds=2, pause_points_ms=None,
+                     pause_duration=3.0, gain_db=0.0, bg_volume=BACKGROUND_VOLUME, tail_seconds=2,
+                     codec_args=MIX_CODEC_ARGS, block_frames=MIX_BLOCK_FRAMES):
+    """
+    Fin de chaîne par blocs : gain de la voix, pauses, musique bouclée et
+    atténuée, délai, mixage stéréo puis un seul encodage (AAC par défaut) vers output.
+    Comme amix, chaque entrée est pondérée par 1/2 tant que la voix est active,
+    puis le gain de la musique remonte vers 1 sur DROPOUT_TRANSITION_SECONDS.
+
+    Returns:
+        float: Durée du mixage en secondes
+    """
+    sample_rate = INTERMEDIATE_SAMPLE_RATE
+    channels = MIX_CHANNELS
+    bg_gain = np.float32(bg_volume * background_gain(bg_music))
+    delay_frames = int(round(voice_delay_seconds * sample_rate))
+    tail_frames = int(round(tail_seconds * sample_rate))
+    transition_frames = DROPOUT_TRANSITION_SECONDS * sample_rate
+
+    voice_decoder = start_decoder(voice_audio, sample_rate, channels)
+    bg_decoder = start_decoder(bg_music, sample_rate, channels, loop=True)
+    encoder = start_encoder(output, sample_rate, channels, codec_args)
+    total_frames = 0
+    try:
+        voice_blocks = voice_timeline(voice_decoder, delay_frames,
+                                      pause_schedule(pause_points_ms, pause_duration, sample_rate),
+                                      db_to_gain(gain_db), channels, block_frames)
+        for voice in voice_blocks:
+            mixed = (read_background(bg_decoder, len(voice), channels, bg_music) * bg_gain + voice) * np.float32(0.5)
+            encoder.stdin.write(mixed.tobytes())
+            total_frames += len(voice)
+
+        # Après la fin de la voix : scale_norm passe de 2 à 1 sur la durée de transition
+        for start in range(0, tail_frames, block_frames):
+            count = min(block_frames, tail_frames - start)
+            elapsed = np.arange(start + 1, start + count + 1, dtype=np.float32) / np.float32(transition_frames)
+            scale = np.maximum(np.float32(1.0), np.float32(2.0) - elapsed)[:, None]
+            encoder.stdin.write((read_background(bg_decoder, count, channels, bg_music) * bg_gain / scale).tobytes())
+            total_frames += count
+        encoder.stdin.close()
+    except BaseException:
+        for process in (voice_decoder, bg_decoder, encoder):
+            process.kill()
+            process.wait()
+        raise
+
+    finish_decoder(voice_decoder, ["ffmpeg", "-i", voice_audio])
+    finish_decoder(bg_decoder, ["ffmpeg", "-i", bg_music], expect_eof=False)
+    if encoder.wait() != 0:
+        raise subprocess.CalledProcessError(encoder.returncode, ["ffmpeg", output])
+    return total_frames / sample_rate
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Cache disque des audios synthétisés par ElevenLabs.
+
+La clé est le hash du texte du chunk, de la voix, du model_id et des
+voice_settings : après une modification locale du script, seuls les chunks
+réellement modifiés repassent par l'API.
+"""
+import os
+import json
+import shutil
+import hashlib
+import threading
+
+# Cache des audios synthétisés (désactivable avec TTS_CACHE=0)
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(os.getcwd(), "cache", "tts"))
+TTS_CACHE_MAX_MB = float(os.getenv("TTS_CACHE_MAX_MB", "1000"))
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE", "1") != "0"
+
+# Une seule éviction à la fois (les chunks sont stockés depuis plusieurs threads)
+_EVICTION_LOCK = threading.Lock()
+
+def get_tts_cache_key(text, voice_id, model_id, voice_settings):
+    """Clé du cache : hash du texte + voix + modèle + réglages de voix."""
+    material = json.dumps({
+        "text": text,
+        "voice_id": voice_id,
+        "model_id": model_id,
+        "voice_settings": voice_settings
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+def load_cached_tts_audio(cache_key, output_path, cache_dir=None):
+    """
+    Copie l'audio en cache vers output_path (et le marque comme récemment utilisé).
+
+    Returns:
+        bool: True si l'entrée existait
+    """
+    cache_path = os.path.join(cache_dir or TTS_CACHE_DIR, f"{cache_key}.mp3")
+    try:
+        shutil.copyfile(cache_path, output_path)
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        print(f"⚠️ Entrée de cache TTS illisible, ignorée: {e}")
+        return False
+
+    # Mise à jour de la date d'accès pour l'éviction LRU
+    try:
+        os.utime(cache_path, None)
+    except OSError:
+        pass
+    return True
+
+def store_cached_tts_audio(cache_key, audio_path, cache_dir=None, max_size_mb=None):
+    """Enregistre un audio synthétisé puis applique la limite de taille du cache."""
+    cache_dir = cache_dir or TTS_CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = os.path.join(cache_dir, f"{cache_key}.mp3")
+
+    # Écriture atomique pour ne jamais laisser d'entrée tronquée
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.copyfile(audio_path, tmp_path)
+    os.replace(tmp_path, cache_path)
+
+    evict_tts_cache(cache_dir, max_size_mb)
+    return cache_path
+
+def evict_tts_cache(cache_dir=None, max_size_mb=None):
+    """Supprime les entrées les moins récemment utilisées au-delà de la taille maximale."""
+    cache_dir = cache_dir or TTS_CACHE_DIR
+    max_bytes = (max_size_mb if max_size_mb is not None else TTS_CACHE_MAX_MB) * 1024 * 1024
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    with _EVICTION_LOCK:
+        entries = []
+        for name in os.listdir(cache_dir):
+            if name.endswith(".mp3"):
+                try:
+                    stat = os.stat(os.path.join(cache_dir, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total_size = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, name in sorted(entries):
+            if total_size <= max_bytes:
+                break
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total_size -= size
+            removed += 1
+
+    if removed:
+        print(f"🧹 Cache TTS: {removed} entrée(s) évincée(s) (LRU)")
+    return removed
+
+class TtsCacheStats:
+    """Compteurs de hits/misses d'une génération (mis à jour depuis plusieurs threads)."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.saved_chars = 0
+        self._lock = threading.Lock()
+
+    def record_hit(self, text):
+        with self._lock:
+            self.hits += 1
+            self.saved_chars += len(text)
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def report(self):
+        """Affiche le bilan du cache."""
+        total = self.hits + self.misses
+        if not total:
+            return
+        print(f"📊 Cache TTS : {self.hits}/{total} chunk(s) réutilisé(s), "
+              f"{self.misses} synthétisé(s), {self.saved_chars} caractère(s) économisé(s)")
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Moteur de synthèse ElevenLabs partagé par les pipelines.
+
+- Une seule requests.Session (keep-alive) avec un pool de connexions
+- N requêtes en vol (ELEVENLABS_MAX_INFLIGHT)
+- La normalisation FFmpeg tourne dans un pool séparé (AUDIO_NORMALIZE_WORKERS) :
+  le réseau et FFmpeg se recouvrent
+- Les fichiers retournés respectent l'ordre des chunks
+- Les chunks déjà synthétisés (même texte, voix et réglages) sont relus
+  depuis le cache disque (voir tts_cache)
+- Mode streaming (ELEVENLABS_STREAMING=1) : l'endpoint /stream est lu par
+  blocs, écrit sur disque et envoyé en même temps dans FFmpeg (loudnorm) via stdin
+- Retries, backoff, Retry-After, limiteur de débit et journal des échecs :
+  voir tts_scheduler
+"""
+import os
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, Future
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from audio_generator.audio_chain import (
+    LOUDNORM_FILTER, LOUDNORM_TWO_PASS, intermediate_codec_args, voice_loudnorm_filter
+)
+from audio_generator.tts_cache import (
+    TTS_CACHE_ENABLED, TtsCacheStats, get_tts_cache_key,
+    load_cached_tts_audio, store_cached_tts_audio
+)
+from audio_generator.tts_scheduler import (
+    TTS_REQUEST_TIMEOUT, TtsRequestError, TtsRequestScheduler, FailureJournal,
+    parse_retry_after
+)
+
+# Requêtes de synthèse simultanées (surchargeable via ELEVENLABS_MAX_INFLIGHT)
+ELEVENLABS_MAX_INFLIGHT = max(1, int(os.getenv("ELEVENLABS_MAX_INFLIGHT", "4")))
+
+# Normalisations FFmpeg simultanées (surchargeable via AUDIO_NORMALIZE_WORKERS)
+AUDIO_NORMALIZE_WORKERS = max(1, int(os.getenv("AUDIO_NORMALIZE_WORKERS", "2")))
+
+# Endpoint de streaming + normalisation alimentée au fil de l'eau (ELEVENLABS_STREAMING=1)
+ELEVENLABS_STREAMING = os.getenv("ELEVENLABS_STREAMING", "0") == "1"
+
+# Taille des blocs lus sur la réponse HTTP
+STREAM_BLOCK_SIZE = 64 * 1024
+
+# Paramètres de synthèse envoyés à ElevenLabs
+DEFAULT_TTS_MODEL_ID = "eleven_multilingual_v1"
+DEFAULT_VOICE_SETTINGS = {
+    "speed": 1.0,
+    "stability": 0.5,
+    "similarity_boost": 0.75
+}
+
+def build_tts_payload(text, model_id=DEFAULT_TTS_MODEL_ID, voice_settings=None):
+    """Construit le corps JSON d'une requête text-to-speech."""
+    return {
+        "text": text,
+        "model_id": model_id,
+        "voice_settings": dict(voice_settings or DEFAULT_VOICE_SETTINGS)
+    }
+
+def create_tts_session(api_key, pool_size=None):
+    """
+    Crée une session HTTP partagée par tous les chunks.
+    Le pool garde pool_size connexions ouvertes (keep-alive).
+    """
+    pool_size = pool_size or ELEVENLABS_MAX_INFLIGHT
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "xi-api-key": api_key or "",
+        "Content-Type": "application/json"
+    })
+    return session
+
+def describe_error_response(response):
+    """Message d'erreur lisible pour une réponse non 200."""
+    try:
+        error_msg = response.json()
+    except ValueError:
+        error_msg = response.text
+    return f"Status {response.status_code}: {error_msg}"
+
+def raise_for_tts_status(response):
+    """Lève TtsRequestError (avec Retry-After éventuel) pour une réponse non 200."""
+    if response.status_code != 200:
+        raise TtsRequestError(
+            describe_error_response(response),
+            status_code=response.status_code,
+            retry_after=parse_retry_after(response.headers.get("Retry-After"))
+        )
+
+def normalize_audio_file(input_file, output_file, loudnorm_filter=None):
+    """Normalisation par défaut des parties de voix (loudnorm, deux passes si LOUDNORM_TWO_PASS)."""
+    loudnorm_filter = loudnorm_filter or voice_loudnorm_filter(input_file)
+    cmd = ["ffmpeg", "-y", "-i", input_file, "-af", loudnorm_filter,
+           *intermediate_codec_args(output_file), output_file]
+    subprocess.run(cmd, check=True, capture_output=True)
+    print(f"✅ Audio normalisé sauvegardé dans {output_file}")
+
+def synthesize_chunk(session, api_url, payload, output_path):
+    """
+    Envoie un chunk à ElevenLabs et écrit l'audio reçu par blocs.
+
+    Raises:
+        TtsRequestError: Réponse non 200
+        requests.RequestException: Erreur réseau
+    """
+    with session.post(api_url, json=payload, stream=True, timeout=TTS_REQUEST_TIMEOUT) as response:
+        raise_for_tts_status(response)
+        with open(output_path, "wb") as af:
+            for block in response.iter_content(chunk_size=STREAM_BLOCK_SIZE):
+                af.write(block)
+    return output_path
+
+def stream_chunk_normalized(session, api_url, payload, output_path, normalized_path,
+                            loudnorm_filter=LOUDNORM_FILTER):
+    """
+    Lit l'endpoint de streaming et envoie chaque bloc reçu à la fois dans
+    output_path et dans FFmpeg (stdin) qui écrit normalized_path.
+    La normalisation se termine quelques instants après le dernier octet reçu.
+
+    Raises:
+        TtsRequestError: Réponse non 200 ou échec de FFmpeg
+        requests.RequestException: Erreur réseau
+    """
+    with session.post(f"{api_url}/stream", json=payload, stream=True,
+                      timeout=TTS_REQUEST_TIMEOUT) as response:
+        raise_for_tts_status(response)
+
+        cmd = [
+            "ffmpeg", "-y", "-nostats", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-af", loudnorm_filter,
+            *intermediate_codec_args(normalized_path),
+            normalized_path
+        ]
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        broken_pipe = False
+        try:
+            with open(output_path, "wb") as af:
+                for block in response.iter_content(chunk_size=STREAM_BLOCK_SIZE):
+                    af.write(block)
+                    process.stdin.write(block)
+            process.stdin.close()
+        except BrokenPipeError:
+            # FFmpeg s'est arrêté avant la fin du flux : la sortie est incomplète
+            broken_pipe = True
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+
+        stderr = process.stderr.read().decode("utf-8", errors="replace").strip()
+        returncode = process.wait()
+        if broken_pipe or returncode != 0:
+            reason = "arrêté avant la fin du flux" if broken_pipe else "a échoué"
+            raise TtsRequestError(
+                f"FFmpeg loudnorm {reason} (code {returncode}): {stderr[-500:] or 'aucun message'}",
+                retryable=False
+            )
+    return normalized_path
+
+def synthesize_chunks(text_chunks, api_url, api_key, output_dir, normalize_func=None,
+                      voice_id=None, model_id=None, voice_settings=None,
+                      max_inflight=None, normalize_workers=None, use_cache=None, streaming=None,
+                      scheduler=None, normalized_ext=".mp3", normalize=True):
+    """
+    Génère et normalise un fichier audio par chunk.
+
+    Args:
+        text_chunks: Liste des textes à synthétiser (ou dictionnaire index -> texte)
+        api_url: URL text-to-speech (voix incluse)
+        api_key: Clé API ElevenLabs
+        output_dir: Dossier des fichiers audio_part_N.mp3 / audio_part_N_norm{normalized_ext}
+        normalize_func: Fonction (input_file, output_file) de normalisation
+            (défaut: normalize_audio_file)
+        voice_id, model_id, voice_settings: Paramètres de synthèse (clé du cache)
+        max_inflight: Requêtes simultanées (défaut: ELEVENLABS_MAX_INFLIGHT)
+        normalize_workers: Normalisations simultanées (défaut: AUDIO_NORMALIZE_WORKERS)
+        use_cache: Réutiliser les audios déjà synthétisés (défaut: TTS_CACHE_ENABLED)
+        streaming: Endpoint /stream (défaut: ELEVENLABS_STREAMING) ; avec la normalisation
+            par défaut, le loudnorm est alimenté via stdin pendant la réception
+        scheduler: TtsRequestScheduler (retries, backoff, débit) partagé
+        normalized_ext: Extension des fichiers normalisés (".wav" : sans perte)
+        normalize: False pour retourner les audios bruts (normalisés plus tard,
+            par exemple dans le graphe unique de render_fused_voice)
+
+    Returns:
+        list: Fichiers normalisés (ou bruts), dans l'ordre des chunks (chunks en échec exclus,
+            et inscrits dans le journal tts_failures.json du dossier de sortie)
+    """
+    max_inflight = max_inflight or ELEVENLABS_MAX_INFLIGHT
+    normalize_workers = normalize_workers or AUDIO_NORMALIZE_WORKERS
+    use_cache = TTS_CACHE_ENABLED if use_cache is None else use_cache
+    streaming = ELEVENLABS_STREAMING if streaming is None else streaming
+    # Loudnorm au fil de l'eau seulement avec la normalisation par défaut : une
+    # normalize_func fournie par l'appelant n'expose pas son filtre, elle est
+    # appliquée après réception. En deux passes, la mesure exige le fichier complet.
+    stream_normalize = streaming and normalize and normalize_func is None and not LOUDNORM_TWO_PASS
+    normalize_func = normalize_func or normalize_audio_file
+    model_id = model_id or DEFAULT_TTS_MODEL_ID
+    voice_settings = dict(voice_settings or DEFAULT_VOICE_SETTINGS)
+    if not isinstance(text_chunks, dict):
+        text_chunks = dict(enumerate(text_chunks, 1))
+
+    scheduler = scheduler or TtsRequestScheduler(burst=max_inflight)
+    journal = FailureJournal(output_dir, {
+        "api_url": api_url,
+        "voice_id": voice_id,
+        "model_id": model_id,
+        "voice_settings": voice_settings,
+        "normalized_ext": normalized_ext,
+        "normalize": normalize,
+        "streaming": streaming
+    })
+    session = create_tts_session(api_key, max_inflight)
+    cache_stats = TtsCacheStats()
+    print_lock = threading.Lock()
+
+    print(f"🎙️ Synthèse de {len(text_chunks)} chunk(s) - {max_inflight} requête(s) en parallèle, "
+          f"{normalize_workers} normalisation(s) en parallèle")
+
+    def run_chunk(i, chunk):
+        audio_filename = os.path.join(output_dir, f"audio_part_{i}.mp3")
+        normalized_filename = os.path.join(output_dir, f"audio_part_{i}_norm{normalized_ext}")
+        payload = build_tts_payload(chunk, model_id, voice_settings)
+
+        cache_key = None
+        if use_cache:
+            cache_key = get_tts_cache_key(chunk, voice_id, payload["model_id"], payload["voice_settings"])
+            if load_cached_tts_audio(cache_key, audio_filename):
+                cache_stats.record_hit(chunk)
+                with print_lock:
+                    print(f"♻️ Audio chunk {i} réutilisé depuis le cache : {audio_filename}")
+                return finish(audio_filename, normalized_filename)
+            cache_stats.record_miss()
+
+        if stream_normalize:
+            send = lambda: stream_chunk_normalized(session, api_url, payload, audio_filename,
+                                                   normalized_filename, voice_loudnorm_filter(audio_filename))
+        elif streaming:
+            send = lambda: synthesize_chunk(session, f"{api_url}/stream", payload, audio_filename)
+        else:
+            send = lambda: synthesize_chunk(session, api_url, payload, audio_filename)
+        try:
+            scheduler.call(send, label=f"Chunk {i}")
+        except (TtsRequestError, OSError) as e:
+            journal.record_failure(i, chunk, e)
+            with print_lock:
+                print(f"❌ Erreur audio chunk {i} après {getattr(e, 'attempts', 1)} essai(s) ({e})")
+            return None
+        journal.record_success(i)
+        with print_lock:
+            print(f"✅ Audio généré : {audio_filename}")
+        if cache_key:
+            store_cached_tts_audio(cache_key, audio_filename)
+        if stream_normalize:
+            # Déjà normalisé pendant la réception
+            return done_future(normalized_filename)
+        return finish(audio_filename, normalized_filename)
+
+    def done_future(path):
+        done = Future()
+        done.set_result(path)
+        return done
+
+    def normalize_chunk(audio_filename, normalized_filename):
+        normalize_func(audio_filename, normalized_filename)
+        return normalized_filename
+
+    def finish(audio_filename, normalized_filename):
+        if not normalize:
+            return done_future(audio_filename)
+        # La normalisation part dans son propre pool : ce thread réseau est libéré
+        return normalize_pool.submit(normalize_chunk, audio_filename, normalized_filename)
+
+    try:
+        with ThreadPoolExecutor(max_workers=normalize_workers) as normalize_pool:
+            with ThreadPoolExecutor(max_workers=max_inflight) as network_pool:
+                synth_futures = [(i, network_pool.submit(run_chunk, i, chunk))
+                                 for i, chunk in sorted(text_chunks.items())]
+
+            audio_files = []
+            for i, synth_future in synth_futures:
+                normalize_future = synth_future.result()
+                if normalize_future is None:
+                    continue
+                audio_files.append(normalize_future.result())
+    finally:
+        session.close()
+
+    cache_stats.report()
+    if journal.failures:
+        print(f"⚠️ {len(journal.failures)} chunk(s) en échec, journal : {journal.path}")
+        print(f"   Relance des seuls chunks en échec : python -m audio_generator.tts_scheduler {output_dir}")
+        print("   (ils rejoignent le cache TTS : la prochaine exécution du pipeline les relit sans appel API)")
+    return audio_files
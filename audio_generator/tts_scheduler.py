@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Ordonnanceur des requêtes TTS : retries, backoff, Retry-After, limiteur de débit
+et journal persistant des chunks en échec.
+
+- 429 / 5xx / erreurs réseau : nouvel essai avec backoff exponentiel (+ jitter)
+- Retry-After est respecté, et met en pause toutes les requêtes (pas seulement
+  celle qui l'a reçu)
+- Un token bucket limite le nombre de requêtes par seconde (TTS_RATE_LIMIT)
+- Les chunks toujours en échec sont écrits dans tts_failures.json (dossier du
+  projet) et peuvent être relancés individuellement :
+    python -m audio_generator.tts_scheduler Project_DDMMYYYY_HHMMSS
+
+Retour dans un rendu : un pipeline avec des chunks manquants s'arrête avant
+la fusion. La relance écrit les chunks récupérés dans le dossier du projet et
+dans le cache TTS (même clé texte/voix/modèle/réglages) ; il suffit ensuite de
+relancer le pipeline sur le même script : tous les chunks sont relus du cache,
+sans nouvel appel à l'API. Sans cache (TTS_CACHE=0), la relance ne sert qu'à
+récupérer les fichiers audio_part_N du projet.
+"""
+import os
+import json
+import time
+import random
+import argparse
+import threading
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# Nombre d'essais supplémentaires par chunk
+TTS_MAX_RETRIES = int(os.getenv("TTS_MAX_RETRIES", "5"))
+
+# Backoff exponentiel : TTS_BACKOFF_BASE * 2^essai, plafonné à TTS_BACKOFF_MAX (secondes)
+TTS_BACKOFF_BASE = float(os.getenv("TTS_BACKOFF_BASE", "1.0"))
+TTS_BACKOFF_MAX = float(os.getenv("TTS_BACKOFF_MAX", "60"))
+
+# Requêtes par seconde (0 = illimité) et rafale autorisée
+TTS_RATE_LIMIT = float(os.getenv("TTS_RATE_LIMIT", "0"))
+TTS_RATE_BURST = int(os.getenv("TTS_RATE_BURST", "4"))
+
+# Timeouts HTTP (connexion, lecture) en secondes
+TTS_REQUEST_TIMEOUT = (10, float(os.getenv("TTS_READ_TIMEOUT", "120")))
+
+# Statuts pour lesquels un nouvel essai a un sens
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Nom du journal des échecs dans le dossier du projet
+FAILURE_JOURNAL_NAME = "tts_failures.json"
+
+class TtsRequestError(Exception):
+    """Échec d'une requête TTS (statut HTTP, Retry-After éventuel)."""
+
+    def __init__(self, message, status_code=None, retry_after=None, retryable=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        if retryable is None:
+            retryable = status_code in RETRYABLE_STATUS_CODES
+        self.retryable = retryable
+        self.attempts = 1
+
+def parse_retry_after(value):
+    """Convertit un en-tête Retry-After (secondes ou date HTTP) en secondes."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+class TokenBucket:
+    """
+    Limiteur de débit partagé par tous les threads réseau.
+    rate <= 0 désactive la limite ; defer() suspend toutes les acquisitions.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def defer(self, seconds):
+        """Aucune requête ne part avant seconds secondes (Retry-After)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def acquire(self):
+        """Bloque jusqu'à ce qu'une requête puisse partir."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.rate <= 0:
+                        return
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class TtsRequestScheduler:
+    """Exécute les requêtes TTS avec limiteur de débit, retries et backoff."""
+
+    def __init__(self, max_retries=None, backoff_base=None, backoff_max=None,
+                 rate=None, burst=None):
+        self.max_retries = TTS_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = TTS_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = TTS_BACKOFF_MAX if backoff_max is None else backoff_max
+        self.bucket = TokenBucket(TTS_RATE_LIMIT if rate is None else rate,
+                                  TTS_RATE_BURST if burst is None else burst)
+
+    def backoff_delay(self, attempt):
+        """Délai avant l'essai attempt+1 (backoff exponentiel avec jitter)."""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def call(self, request_func, label=""):
+        """
+        Appelle request_func() jusqu'au succès ou à l'épuisement des essais.
+
+        Raises:
+            TtsRequestError: Dernière erreur (attribut attempts renseigné)
+        """
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                return request_func()
+            except requests.RequestException as e:
+                error = TtsRequestError(str(e), retryable=True)
+            except TtsRequestError as e:
+                error = e
+
+            error.attempts = attempt + 1
+            if not error.retryable or attempt >= self.max_retries:
+                raise error
+
+            if error.retry_after is not None:
+                delay = min(error.retry_after, max(self.backoff_max, 300))
+                self.bucket.defer(delay)
+            else:
+                delay = self.backoff_delay(attempt)
+            print(f"🔁 {label} : {error} - nouvel essai {attempt + 2}/{self.max_retries + 1} dans {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+
+class FailureJournal:
+    """
+    Journal persistant des chunks en échec (JSON dans le dossier du projet).
+    Contient de quoi relancer chaque chunk seul : texte du chunk et tous les
+    paramètres de synthesize_chunks (URL, voix, modèle, réglages, extension,
+    normalisation, streaming).
+    """
+
+    def __init__(self, output_dir, request_info=None):
+        self.path = os.path.join(output_dir, FAILURE_JOURNAL_NAME)
+        self._lock = threading.Lock()
+        self.data = {"request": request_info or {}, "failures": {}}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Journal des échecs illisible, ignoré: {e}")
+            if request_info:
+                self.data["request"] = request_info
+
+    @property
+    def failures(self):
+        return self.data.get("failures", {})
+
+    def record_failure(self, index, text, error):
+        with self._lock:
+            self.data.setdefault("failures", {})[str(index)] = {
+                "text": text,
+                "error": str(error),
+                "status_code": getattr(error, "status_code", None),
+                "attempts": getattr(error, "attempts", 1),
+                "time": time.strftime("%Y-%m-%d %H:%M:%S")
+            }
+            self._save()
+
+    def record_success(self, index):
+        with self._lock:
+            if self.data.get("failures", {}).pop(str(index), None) is not None:
+                self._save()
+
+    def _save(self):
+        if not self.failures:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+def retry_failed_chunks(output_dir, api_key=None, normalize_func=None):
+    """
+    Relance uniquement les chunks listés dans le journal des échecs du projet,
+    avec les paramètres de synthèse d'origine. Les fichiers audio_part_N(_norm)
+    manquants sont écrits à leur place et les audios récupérés sont ajoutés au
+    cache TTS, où la prochaine exécution du pipeline les relit.
+
+    Returns:
+        list: Index des chunks encore en échec
+    """
+    from audio_generator.tts_cache import TTS_CACHE_ENABLED
+    from audio_generator.tts_engine import synthesize_chunks
+
+    journal = FailureJournal(output_dir)
+    failures = journal.failures
+    if not failures:
+        print(f"✅ Aucun chunk en échec dans {output_dir}")
+        return []
+
+    request_info = journal.data.get("request", {})
+    indices = sorted(int(i) for i in failures)
+    print(f"🔁 Relance de {len(indices)} chunk(s) : {indices}")
+
+    synthesize_chunks(
+        {i: failures[str(i)]["text"] for i in indices},
+        request_info["api_url"],
+        api_key or os.getenv("ELEVENLABS_API_KEY"),
+        output_dir,
+        normalize_func,
+        voice_id=request_info.get("voice_id"),
+        model_id=request_info.get("model_id"),
+        voice_settings=request_info.get("voice_settings"),
+        normalized_ext=request_info.get("normalized_ext", ".mp3"),
+        normalize=request_info.get("normalize", True),
+        streaming=request_info.get("streaming"),
+        use_cache=True
+    )
+    remaining = sorted(int(i) for i in FailureJournal(output_dir).failures)
+    if remaining:
+        print(f"❌ Toujours en échec : {remaining}")
+    elif TTS_CACHE_ENABLED:
+        print("✅ Chunks récupérés dans le cache TTS : relancez le pipeline sur le même script")
+    else:
+        print("⚠️ Cache TTS désactivé (TTS_CACHE=0) : le pipeline ne relira pas ces chunks")
+    return remaining
+
+def main():
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Relance les chunks TTS en échec d'un projet")
+    parser.add_argument("output_dir", help="Dossier du projet (contient tts_failures.json)")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    retry_failed_chunks(args.output_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark de advanced_deduplication sur une transcription synthétique.
+
+Compare l'implémentation d'origine (normalisation + ratio() complet à chaque
+comparaison) au chemin rapide actuel, et vérifie que les sorties sont identiques.
+
+Lancement :
+    python -m subs_generator.bench_dedup [--segments 10000]
+"""
+import io
+import time
+import random
+import argparse
+import contextlib
+from difflib import SequenceMatcher
+
+from subs_generator.srt_generator import advanced_deduplication, normalize_text
+
+PHRASES = [
+    "Le Seigneur est mon berger, je ne manquerai de rien.",
+    "Car Dieu a tant aimé le monde qu'il a donné son Fils unique.",
+    "Heureux ceux qui ont le cœur pur, car ils verront Dieu.",
+    "Je puis tout par celui qui me fortifie.",
+    "Que la paix de Dieu garde vos cœurs et vos pensées.",
+    "Maintenant prions ensemble pour nos familles.",
+    "L'Éternel est près de ceux qui ont le cœur brisé.",
+    "Merci d'avoir regardé cette vidéo.",
+]
+
+def build_synthetic_transcript(segment_count, seed=42):
+    """Transcription synthétique avec des salves d'hallucinations répétées."""
+    rng = random.Random(seed)
+    segments = []
+    t = 0.0
+    while len(segments) < segment_count:
+        if rng.random() < 0.1:
+            # Hallucination : la même phrase répétée 3 à 30 fois
+            text = rng.choice(PHRASES)
+            repeats = rng.randint(3, 30)
+        else:
+            words = rng.choice(PHRASES).split()
+            rng.shuffle(words)
+            text = " ".join(words[:rng.randint(3, len(words))])
+            repeats = 1
+        for _ in range(min(repeats, segment_count - len(segments))):
+            duration = rng.uniform(1.0, 4.0)
+            segments.append({"start": t, "end": t + duration, "text": " " + text, "words": []})
+            t += duration
+    return segments
+
+def reference_deduplication(segments):
+    """Implémentation d'origine, conservée pour la comparaison."""
+    clean_segments = []
+    i = 0
+    while i < len(segments):
+        current = segments[i]
+        current_text = current["text"].strip()
+        if len(current_text) < 3:
+            i += 1
+            continue
+        consecutive_count = 1
+        j = i + 1
+        while j < len(segments):
+            next_text = segments[j]["text"].strip()
+            similarity = SequenceMatcher(None,
+                                       normalize_text(current_text),
+                                       normalize_text(next_text)).ratio()
+            if similarity > 0.8:
+                consecutive_count += 1
+                j += 1
+            else:
+                break
+        if consecutive_count >= 3:
+            clean_segments.append({
+                "start": current["start"],
+                "end": segments[j-1]["end"] if j-1 < len(segments) else current["end"],
+                "text": current_text,
+                "words": current.get("words", [])
+            })
+            i = j
+        else:
+            clean_segments.append(current)
+            i += 1
+    return clean_segments
+
+def run_benchmark(segment_count=10000, rounds=3):
+    """Mesure les deux implémentations (meilleur temps sur plusieurs passes)."""
+    segments = build_synthetic_transcript(segment_count)
+
+    def best_time(func):
+        best, output = None, None
+        for _ in range(rounds):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                output = func(segments)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
+
+    reference_time, reference_output = best_time(reference_deduplication)
+    fast_time, fast_output = best_time(advanced_deduplication)
+
+    if reference_output != fast_output:
+        raise AssertionError("Les sorties de déduplication diffèrent")
+
+    print(f"📊 Transcription synthétique : {segment_count} segments -> {len(fast_output)} après déduplication")
+    print(f"   Implémentation d'origine : {reference_time * 1000:.1f} ms")
+    print(f"   Chemin rapide            : {fast_time * 1000:.1f} ms")
+    print(f"   ⚡ Accélération           : x{reference_time / fast_time:.1f}")
+    return reference_time, fast_time
+
+def main():
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Benchmark de advanced_deduplication")
+    parser.add_argument("--segments", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    run_benchmark(args.segments, args.rounds)
+
+if __name__ == "__main__":
+    main()
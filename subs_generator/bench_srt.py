@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Équivalence et benchmark du parseur SRT en flux (srt_file.read_srt).
+
+Compare l'ancien parse_srt_file des pipelines (expression régulière
+multiligne sur le fichier entier) à read_srt sur des fichiers SRT
+synthétiques à une et à plusieurs lignes de texte par sous-titre, et vérifie
+que les deux parseurs produisent les mêmes sous-titres.
+
+Lancement :
+    python -m subs_generator.bench_srt [--cues 10000] [--rounds 5]
+"""
+import os
+import re
+import time
+import random
+import argparse
+import tempfile
+
+from subs_generator.srt_file import ms_to_timecode, read_srt
+
+WORDS = ["Seigneur", "paix", "cœur", "grâce", "lumière", "chemin", "prière", "amour", "vérité", "foi"]
+
+def reference_parse_srt_file(srt_path):
+    """Ancien parse_srt_file des pipelines, conservé pour la comparaison."""
+    with open(srt_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    subtitle_pattern = r'(\d+)\n(\d{2}):(\d{2}):(\d{2}),(\d{3}) --> (\d{2}):(\d{2}):(\d{2}),(\d{3})\n((?:.*\n?)+?)(?=\n\d+\n|\Z)'
+
+    subtitles = []
+    for match in re.finditer(subtitle_pattern, content, re.MULTILINE):
+        index = int(match.group(1))
+        start_h, start_m, start_s, start_ms = map(int, match.groups()[1:5])
+        end_h, end_m, end_s, end_ms = map(int, match.groups()[5:9])
+        subtitles.append({
+            'index': index,
+            'start_time': (start_h * 3600 + start_m * 60 + start_s) * 1000 + start_ms,
+            'end_time': (end_h * 3600 + end_m * 60 + end_s) * 1000 + end_ms,
+            'text': match.group(10).strip()
+        })
+    return subtitles
+
+def write_synthetic_srt(path, cue_count, lines_per_cue, seed=42):
+    """Fichier SRT de cue_count sous-titres de lines_per_cue lignes."""
+    rng = random.Random(seed)
+    position = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(1, cue_count + 1):
+            start = position + rng.randint(0, 500)
+            end = start + rng.randint(800, 4000)
+            position = end
+            lines = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 8))) for _ in range(lines_per_cue)]
+            f.write(f"{i}\n{ms_to_timecode(start)} --> {ms_to_timecode(end)}\n" + "\n".join(lines) + "\n\n")
+
+def best_time(func, path, rounds):
+    """Meilleur temps sur rounds passes, et le résultat de la dernière."""
+    best, output = None, None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        output = func(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+def run_benchmark(cue_count=10000, rounds=5, lines_per_cue=(1, 3)):
+    """
+    Mesure les deux parseurs pour chaque nombre de lignes par sous-titre.
+
+    Returns:
+        dict: lignes par sous-titre -> (temps regex, temps read_srt) en secondes
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for lines in lines_per_cue:
+            path = os.path.join(work_dir, f"cues_{lines}.srt")
+            write_synthetic_srt(path, cue_count, lines)
+            reference_time, reference = best_time(reference_parse_srt_file, path, rounds)
+            stream_time, cues = best_time(read_srt, path, rounds)
+            if [cue.to_dict() for cue in cues] != reference:
+                raise AssertionError(f"Les parseurs diffèrent ({lines} ligne(s) par sous-titre)")
+            results[lines] = (reference_time, stream_time)
+
+    print(f"📊 {cue_count} sous-titres synthétiques (meilleur temps sur {rounds} passes)")
+    for lines, (reference_time, stream_time) in results.items():
+        print(f"   {lines} ligne(s) : regex {reference_time * 1000:.1f} ms, "
+              f"read_srt {stream_time * 1000:.1f} ms (x{reference_time / stream_time:.2f})")
+    return results
+
+def main():
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Équivalence et benchmark du parseur SRT")
+    parser.add_argument("--cues", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    run_benchmark(args.cues, args.rounds)
+
+if __name__ == "__main__":
+    main()
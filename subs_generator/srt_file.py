@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Lecture et écriture de fichiers SRT en flux, partagées par tous les pipelines.
+
+Le parseur lit le fichier par morceaux et le découpe sur les lignes vides
+(aucune expression régulière multiligne, aucun retour arrière) ; il produit
+des SubtitleCue compacts (__slots__, temps en millisecondes entières) et
+accepte les fichiers CRLF ou avec BOM. Son temps est du même ordre que
+l'ancienne expression régulière (mesure et vérification d'équivalence :
+python -m subs_generator.bench_srt).
+"""
+import re
+
+TIMECODE_LINE = re.compile(
+    r"^(\d+):(\d{2}):(\d{2})[,.](\d{3})\s*-->\s*(\d+):(\d{2}):(\d{2})[,.](\d{3})"
+)
+
+class SubtitleCue:
+    """
+    Un sous-titre : index, start_time et end_time (ms), text.
+    Accessible aussi comme un dictionnaire (cue['start_time']) pour rester
+    compatible avec le code qui manipulait les dictionnaires de parse_srt_file.
+    """
+    __slots__ = ("index", "start_time", "end_time", "text")
+
+    def __init__(self, index, start_time, end_time, text):
+        self.index = index
+        self.start_time = start_time
+        self.end_time = end_time
+        self.text = text
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        return {
+            "index": self.index,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "text": self.text
+        }
+
+    def __repr__(self):
+        return f"SubtitleCue({self.index}, {self.start_time}, {self.end_time}, {self.text!r})"
+
+def ms_to_timecode(total_ms):
+    """Convertit des millisecondes en format timecode HH:MM:SS,mmm"""
+    total_ms = int(total_ms)
+    hours = total_ms // (3600 * 1000)
+    minutes = (total_ms % (3600 * 1000)) // (60 * 1000)
+    seconds = (total_ms % (60 * 1000)) // 1000
+    milliseconds = total_ms % 1000
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+
+def parse_timecode_line(line):
+    """
+    Retourne (start_ms, end_ms) pour une ligne "HH:MM:SS,mmm --> HH:MM:SS,mmm",
+    ou None si la ligne n'est pas une ligne de timecodes.
+    """
+    # Chemin rapide : format canonique à positions fixes (découpage sans regex)
+    if len(line) >= 29 and line[12:17] == " --> " and line[2] == ":" and line[8] in ",.":
+        try:
+            return (
+                ((int(line[0:2]) * 60 + int(line[3:5])) * 60 + int(line[6:8])) * 1000 + int(line[9:12]),
+                ((int(line[17:19]) * 60 + int(line[20:22])) * 60 + int(line[23:25])) * 1000 + int(line[26:29])
+            )
+        except ValueError:
+            pass
+    match = TIMECODE_LINE.match(line)
+    if not match:
+        return None
+    h1, m1, s1, ms1, h2, m2, s2, ms2 = map(int, match.groups())
+    return (h1 * 3600 + m1 * 60 + s1) * 1000 + ms1, (h2 * 3600 + m2 * 60 + s2) * 1000 + ms2
+
+def parse_srt_block(block):
+    """Parse un bloc SRT (sans ligne vide) ; retourne un SubtitleCue ou None."""
+    block = block.strip("\n")
+    # Deux premières lignes repérées par position : le texte reste une tranche du bloc
+    index_end = block.find("\n")
+    if index_end < 0:
+        return None
+    times_end = block.find("\n", index_end + 1)
+    if times_end < 0:
+        times_end = len(block)
+    index = block[:index_end].strip().lstrip("\ufeff")
+    if not index.isdigit():
+        return None
+    times = parse_timecode_line(block[index_end + 1:times_end].strip())
+    if times is None:
+        return None
+    return SubtitleCue(int(index), times[0], times[1], block[times_end + 1:].strip())
+
+def iter_srt_cues(stream, chunk_size=1 << 20):
+    """
+    Parse un flux SRT texte au fil de l'eau (générateur de SubtitleCue).
+
+    Le flux est lu par morceaux de chunk_size caractères et découpé sur les
+    lignes vides : la mémoire reste bornée quelle que soit la taille du
+    fichier. Les blocs mal formés sont ignorés.
+    """
+    pending = ""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        data = pending + chunk
+        if "\r" in data:
+            # Un "\r" en fin de morceau peut précéder un "\n" du morceau suivant
+            data = data.replace("\r\n", "\n")
+            if data.endswith("\r"):
+                pending = data
+                continue
+            data = data.replace("\r", "\n")
+        blocks = data.split("\n\n")
+        pending = blocks.pop()
+        for block in blocks:
+            if block.strip():
+                cue = parse_srt_block(block)
+                if cue is not None:
+                    yield cue
+    if pending.strip():
+        cue = parse_srt_block(pending.replace("\r", "\n"))
+        if cue is not None:
+            yield cue
+
+def read_srt(srt_path):
+    """Lit un fichier SRT et retourne la liste de ses SubtitleCue."""
+    with open(srt_path, "r", encoding="utf-8-sig", newline="") as f:
+        return list(iter_srt_cues(f))
+
+def parse_srt_file(srt_path):
+    """
+    Parse un fichier SRT et retourne une liste de sous-titres avec leurs informations
+    (index, start_time, end_time en ms, text).
+    """
+    return read_srt(srt_path)
+
+def write_srt_cues(cues, output_srt, renumber=False):
+    """
+    Écrit des sous-titres (SubtitleCue ou dictionnaires équivalents) au format SRT.
+
+    Args:
+        cues: Itérable de sous-titres, consommé au fil de l'écriture
+        output_srt: Chemin du fichier SRT de sortie
+        renumber: Renuméroter les blocs à partir de 1
+
+    Returns:
+        int: Nombre de sous-titres écrits
+    """
+    count = 0
+    with open(output_srt, "w", encoding="utf-8") as f:
+        for cue in cues:
+            count += 1
+            index = count if renumber else cue["index"]
+            f.write(f"{index}\n")
+            f.write(f"{ms_to_timecode(cue['start_time'])} --> {ms_to_timecode(cue['end_time'])}\n")
+            f.write(f"{cue['text']}\n\n")
+    return count
+
+def shift_srt_cues(cues, delay_ms):
+    """Décale des sous-titres de delay_ms millisecondes (générateur)."""
+    delay_ms = int(round(delay_ms))
+    for cue in cues:
+        yield SubtitleCue(cue["index"], cue["start_time"] + delay_ms, cue["end_time"] + delay_ms, cue["text"])
+
+def shift_srt_file(input_srt, output_srt, delay_ms):
+    """Décale tous les timecodes d'un fichier SRT, en flux de l'entrée vers la sortie."""
+    with open(input_srt, "r", encoding="utf-8-sig", newline="") as f:
+        return write_srt_cues(shift_srt_cues(iter_srt_cues(f), delay_ms), output_srt)
@@ -1,6 +1,12 @@
 #!/usr/bin/env python3
 import os
+import gc
+import json
 import time
+import hashlib
+import importlib.util
+import dataclasses
+import threading
 import whisper
 import re
 from datetime import datetime
@@ -14,14 +20,27 @@ warnings.filterwarnings("ignore", category=UserWarning, module="whisper.timing")
 warnings.filterwarnings("ignore", category=FutureWarning, module="whisper")
 warnings.filterwarnings("ignore", message=".*weights_only.*")
 
-def setup_rtx4000_model():
-    """Configuration optimale pour Quadro RTX 4000 avec modèle MEDIUM."""
+# Modèle Whisper par défaut (surchargeable via la variable d'environnement WHISPER_MODEL)
+DEFAULT_WHISPER_MODEL = os.getenv("WHISPER_MODEL", "medium")
+
+# Registre des modèles chargés dans ce processus : (nom, device, dtype) -> modèle
+_MODEL_REGISTRY = {}
+_MODEL_REGISTRY_LOCK = threading.Lock()
+_RESOLVED_DEVICE = None
+
+def _resolve_whisper_device():
+    """Détermine le device utilisable. Le test GPU n'est exécuté qu'une fois par processus."""
+    global _RESOLVED_DEVICE
+    if _RESOLVED_DEVICE is not None:
+        return _RESOLVED_DEVICE
+    
     print("🎮 Configuration GPU RTX 4000...")
     
     # Vérifier et préparer le GPU
     if not torch.cuda.is_available():
         print("   ❌ CUDA non disponible - utilisation CPU")
-        return whisper.load_model("medium", device="cpu")
+        _RESOLVED_DEVICE = "cpu"
+        return _RESOLVED_DEVICE
     
     try:
         # Nettoyer la mémoire GPU
@@ -45,21 +64,898 @@ def setup_rtx4000_model():
         if total_memory < 3:  # Moins de 3GB
             print("   ⚠️ Mémoire GPU limitée mais suffisante pour le modèle medium")
         
-        # Charger le modèle medium sur GPU
-        print("   📥 Chargement modèle 'medium' sur GPU...")
-        model = whisper.load_model("medium", device="cuda")
+        _RESOLVED_DEVICE = "cuda"
+    except Exception as e:
+        print(f"   ❌ Erreur GPU: {e}")
+        print("   🔄 Fallback vers CPU...")
+        _RESOLVED_DEVICE = "cpu"
+    
+    return _RESOLVED_DEVICE
+
+def get_whisper_model(model_name=None, device=None, compute_dtype=None):
+    """
+    Retourne un modèle Whisper depuis le registre du processus.
+    
+    Le checkpoint n'est lu sur disque qu'au premier appel pour une clé
+    (model_name, device, compute_dtype) donnée ; les appels suivants
+    réutilisent le modèle déjà résident.
+    
+    Args:
+        model_name: Nom du checkpoint Whisper (défaut: DEFAULT_WHISPER_MODEL)
+        device: "cuda" ou "cpu" (défaut: détection automatique)
+        compute_dtype: "float16" ou "float32" (défaut: float16 sur GPU, float32 sur CPU).
+            Les poids sont convertis en float16 sur GPU ; le CPU reste toujours en float32.
+    
+    Returns:
+        Le modèle Whisper chargé
+    """
+    model_name = model_name or DEFAULT_WHISPER_MODEL
+    device = device or _resolve_whisper_device()
+    compute_dtype = compute_dtype or ("float16" if device == "cuda" else "float32")
+    if device == "cpu":
+        # Pas de float16 sur CPU (non supporté par Whisper)
+        compute_dtype = "float32"
+    requested_key = key = (model_name, device, compute_dtype)
+    
+    with _MODEL_REGISTRY_LOCK:
+        model = _MODEL_REGISTRY.get(key)
+        if model is not None:
+            print(f"♻️ Modèle '{model_name}' déjà chargé ({model.device.type}) - réutilisation")
+            return model
+        
+        print(f"   📥 Chargement modèle '{model_name}' sur {device.upper()}...")
+        try:
+            model = whisper.load_model(model_name, device=device)
+            if compute_dtype == "float16":
+                model = model.half()
+        except Exception as e:
+            if device != "cuda":
+                raise
+            print(f"   ❌ Erreur GPU: {e}")
+            print("   🔄 Fallback vers CPU...")
+            device, compute_dtype = "cpu", "float32"
+            key = (model_name, device, compute_dtype)
+            model = _MODEL_REGISTRY.get(key) or whisper.load_model(model_name, device=device)
+            # Les demandes GPU suivantes réutilisent ce modèle CPU sans retenter le chargement GPU
+            _MODEL_REGISTRY[requested_key] = model
+        
+        if device == "cuda":
+            # Vérifier mémoire utilisée
+            allocated = torch.cuda.memory_allocated(0) / 1024**3
+            print(f"   ✅ Modèle {model_name} chargé - Mémoire utilisée: {allocated:.1f} GB")
+        else:
+            print(f"   ✅ Modèle {model_name} chargé sur CPU")
         
-        # Vérifier mémoire utilisée
-        allocated = torch.cuda.memory_allocated(0) / 1024**3
-        print(f"   ✅ Modèle medium chargé - Mémoire utilisée: {allocated:.1f} GB")
+        _MODEL_REGISTRY[key] = model
+        return model
+
+def evict_whisper_models(model_name=None, device=None, compute_dtype=None):
+    """
+    Retire du registre les modèles correspondant aux critères (None = tous).
+    À appeler en cas de pression mémoire ; la mémoire GPU est libérée ensuite.
+    
+    Returns:
+        int: Nombre de modèles évincés
+    """
+    with _MODEL_REGISTRY_LOCK:
+        evicted = [
+            key for key in _MODEL_REGISTRY
+            if (model_name is None or key[0] == model_name)
+            and (device is None or key[1] == device)
+            and (compute_dtype is None or key[2] == compute_dtype)
+        ]
+        for key in evicted:
+            del _MODEL_REGISTRY[key]
+            print(f"🗑️ Modèle évincé du registre: {key[0]} ({key[1]}, {key[2]})")
+    
+    if evicted:
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    
+    return len(evicted)
+
+def loaded_whisper_models():
+    """Liste les clés (model_name, device, compute_dtype) actuellement chargées."""
+    with _MODEL_REGISTRY_LOCK:
+        return list(_MODEL_REGISTRY)
+
+def setup_rtx4000_model(model_name=None):
+    """Configuration optimale pour Quadro RTX 4000 avec modèle MEDIUM (servi par le registre)."""
+    model = get_whisper_model(model_name)
+    if model.device.type == "cuda":
         print(f"   🚀 Avantages medium: ~2-3x plus rapide, moins d'hallucinations")
+    return model
+
+##############################
+# BACKENDS DE TRANSCRIPTION
+##############################
+
+# Backend sélectionné par configuration : "whisper" (défaut), "faster-whisper" ou "auto"
+WHISPER_BACKEND = os.getenv("WHISPER_BACKEND", "whisper").lower()
+# Type de calcul CTranslate2 pour le backend faster-whisper (int8 = quantifié CPU)
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+
+class WhisperBackend:
+    """Backend de référence : openai-whisper (PyTorch), servi par le registre de modèles."""
+    name = "whisper"
+    
+    def __init__(self, model_name=None, device=None):
+        self.model = setup_rtx4000_model(model_name) if device is None else get_whisper_model(model_name, device)
+        self.device = "cuda" if self.model.device.type == "cuda" else "cpu"
+    
+    def transcribe(self, audio_path, **params):
+        """Retourne le dictionnaire brut de model.transcribe (text, segments, language)."""
+        return self.model.transcribe(audio_path, **params)
+
+class FasterWhisperBackend:
+    """
+    Backend CPU quantifié basé sur CTranslate2 (paquet optionnel faster-whisper).
+    Retourne la même structure segments/words que openai-whisper.
+    """
+    name = "faster-whisper"
+    
+    # Correspondance des paramètres openai-whisper -> faster-whisper
+    PARAM_MAPPING = {
+        "language": "language",
+        "word_timestamps": "word_timestamps",
+        "temperature": "temperature",
+        "no_speech_threshold": "no_speech_threshold",
+        "logprob_threshold": "log_prob_threshold",
+        "compression_ratio_threshold": "compression_ratio_threshold",
+        "condition_on_previous_text": "condition_on_previous_text",
+        "initial_prompt": "initial_prompt",
+        "beam_size": "beam_size",
+        "patience": "patience",
+    }
+    
+    def __init__(self, model_name=None, device="cpu", compute_type=None):
+        self.device = device
+        self.compute_type = compute_type or WHISPER_COMPUTE_TYPE
+        self.model = get_faster_whisper_model(model_name, device, self.compute_type)
+    
+    def transcribe(self, audio_path, **params):
+        """Transcrit et convertit le résultat au format openai-whisper."""
+        fw_params = {
+            self.PARAM_MAPPING[key]: value
+            for key, value in params.items()
+            if key in self.PARAM_MAPPING
+        }
+        # openai-whisper décode en glouton quand beam_size est absent
+        fw_params.setdefault("beam_size", 1)
+        
+        segments_iter, info = self.model.transcribe(audio_path, **fw_params)
+        
+        segments = []
+        for seg in segments_iter:
+            segments.append({
+                "id": len(segments),
+                "start": seg.start,
+                "end": seg.end,
+                "text": seg.text,
+                "words": [
+                    {"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
+                    for w in (seg.words or [])
+                ]
+            })
         
+        return {
+            "text": "".join(seg["text"] for seg in segments),
+            "segments": segments,
+            "language": info.language
+        }
+
+def get_faster_whisper_model(model_name=None, device="cpu", compute_type=None):
+    """Retourne un modèle faster-whisper depuis le registre du processus (chargé une seule fois)."""
+    try:
+        from faster_whisper import WhisperModel
+    except ImportError:
+        raise ImportError(
+            "Le backend 'faster-whisper' nécessite le paquet optionnel faster-whisper "
+            "(pip install faster-whisper)"
+        )
+    
+    model_name = model_name or DEFAULT_WHISPER_MODEL
+    compute_type = compute_type or WHISPER_COMPUTE_TYPE
+    key = (f"faster-whisper:{model_name}", device, compute_type)
+    
+    with _MODEL_REGISTRY_LOCK:
+        model = _MODEL_REGISTRY.get(key)
+        if model is None:
+            print(f"   📥 Chargement modèle '{model_name}' (CTranslate2 {compute_type}) sur {device.upper()}...")
+            model = WhisperModel(model_name, device=device, compute_type=compute_type)
+            _MODEL_REGISTRY[key] = model
+            print(f"   ✅ Modèle {model_name} quantifié ({compute_type}) chargé")
+        else:
+            print(f"♻️ Modèle '{model_name}' ({compute_type}) déjà chargé - réutilisation")
         return model
+
+TRANSCRIPTION_BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+def resolve_transcription_backend_name(backend_name=None):
+    """
+    Résout le nom du backend configuré.
+    
+    "auto" utilise faster-whisper (int8) quand aucun GPU n'est disponible
+    et que le paquet est installé, sinon openai-whisper.
+    """
+    backend_name = (backend_name or WHISPER_BACKEND).lower()
+    
+    if backend_name == "auto":
+        backend_name = WhisperBackend.name
+        if _resolve_whisper_device() == "cpu":
+            if importlib.util.find_spec("faster_whisper") is not None:
+                backend_name = FasterWhisperBackend.name
+            else:
+                print("   ℹ️ faster-whisper non installé - backend whisper utilisé")
+    
+    if backend_name not in TRANSCRIPTION_BACKENDS:
+        raise ValueError(
+            f"Backend de transcription inconnu: {backend_name} "
+            f"(disponibles: {', '.join(TRANSCRIPTION_BACKENDS)}, auto)"
+        )
+    
+    return backend_name
+
+def get_transcription_backend(model_name=None, backend_name=None):
+    """Instancie le backend de transcription configuré."""
+    backend_name = resolve_transcription_backend_name(backend_name)
+    print(f"🔌 Backend de transcription: {backend_name}")
+    return TRANSCRIPTION_BACKENDS[backend_name](model_name)
+
+##############################
+# CACHE DE TRANSCRIPTION (adressé par contenu)
+##############################
+
+# Dossier du cache persistant (hors dossier Project_* pour survivre aux relances)
+TRANSCRIPTION_CACHE_DIR = os.getenv(
+    "TRANSCRIPTION_CACHE_DIR", os.path.join(os.getcwd(), "cache", "transcriptions")
+)
+TRANSCRIPTION_CACHE_MAX_MB = float(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", "500"))
+TRANSCRIPTION_CACHE_ENABLED = os.getenv("TRANSCRIPTION_CACHE", "1") != "0"
+
+def hash_file(path, block_size=1024 * 1024):
+    """Empreinte SHA-256 du contenu d'un fichier (lecture par blocs)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def get_transcription_cache_key(audio_path, transcribe_params, model_name):
+    """Clé du cache : hash de l'audio + paramètres de transcription + modèle."""
+    material = json.dumps({
+        "audio_sha256": hash_file(audio_path),
+        "params": transcribe_params,
+        "model": model_name
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+def _json_default(obj):
+    """Sérialise les scalaires/tableaux numpy ou torch présents dans le résultat brut."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Type non sérialisable: {type(obj).__name__}")
+
+def load_cached_transcription(cache_key, cache_dir=None):
+    """Retourne le résultat en cache (et le marque comme récemment utilisé) ou None."""
+    cache_path = os.path.join(cache_dir or TRANSCRIPTION_CACHE_DIR, f"{cache_key}.json")
+    if not os.path.exists(cache_path):
+        return None
+    
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            result = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Entrée de cache illisible, ignorée: {e}")
+        return None
+    
+    # Mise à jour de la date d'accès pour l'éviction LRU
+    os.utime(cache_path, None)
+    return result
+
+def store_cached_transcription(cache_key, result, cache_dir=None, max_size_mb=None):
+    """Enregistre le résultat brut en JSON puis applique la limite de taille du cache."""
+    cache_dir = cache_dir or TRANSCRIPTION_CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = os.path.join(cache_dir, f"{cache_key}.json")
+    
+    # Écriture atomique pour ne jamais laisser d'entrée tronquée
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, default=_json_default)
+    os.replace(tmp_path, cache_path)
+    
+    evict_transcription_cache(cache_dir, max_size_mb)
+    return cache_path
+
+def evict_transcription_cache(cache_dir=None, max_size_mb=None):
+    """Supprime les entrées les moins récemment utilisées au-delà de la taille maximale."""
+    cache_dir = cache_dir or TRANSCRIPTION_CACHE_DIR
+    max_bytes = (max_size_mb if max_size_mb is not None else TRANSCRIPTION_CACHE_MAX_MB) * 1024 * 1024
+    if not os.path.isdir(cache_dir):
+        return 0
+    
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".json"):
+            stat = os.stat(os.path.join(cache_dir, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+    
+    total_size = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, name in sorted(entries):
+        if total_size <= max_bytes:
+            break
+        os.remove(os.path.join(cache_dir, name))
+        total_size -= size
+        removed += 1
+    
+    if removed:
+        print(f"🧹 Cache transcription: {removed} entrée(s) évincée(s) (LRU)")
+    return removed
+
+def transcribe_audio(input_audio_path, model_name=None, backend_name=None, use_cache=None, use_vad=None):
+    """
+    Transcrit un fichier audio avec le backend configuré.
+    
+    Le résultat brut est mis en cache sur disque : une relance sur le même
+    audio avec les mêmes paramètres ne recharge ni le modèle ni ne retranscrit.
+    Avec use_vad (défaut: WHISPER_VAD), l'audio est découpé aux silences et
+    les morceaux sont décodés par lots (voir transcribe_with_vad).
+    
+    Returns:
+        tuple: (résultat brut de transcription, device utilisé)
+    """
+    model_name = model_name or DEFAULT_WHISPER_MODEL
+    backend_name = resolve_transcription_backend_name(backend_name)
+    use_cache = TRANSCRIPTION_CACHE_ENABLED if use_cache is None else use_cache
+    use_vad = WHISPER_VAD_ENABLED if use_vad is None else use_vad
+    
+    # Device connu sans charger le modèle (faster-whisper tourne sur CPU)
+    model_device = _resolve_whisper_device() if backend_name == WhisperBackend.name else "cpu"
+    transcribe_params = get_rtx4000_transcribe_params(model_device)
+    
+    cache_model_id = f"{backend_name}:{model_name}"
+    if backend_name == FasterWhisperBackend.name:
+        cache_model_id += f":{WHISPER_COMPUTE_TYPE}"
+    if use_vad:
+        cache_model_id += f":vad{VAD_SILENCE_DB}:{VAD_MIN_SILENCE}:{VAD_MAX_CHUNK}"
+    
+    cache_key = None
+    if use_cache:
+        cache_key = get_transcription_cache_key(input_audio_path, transcribe_params, cache_model_id)
+        result = load_cached_transcription(cache_key)
+        if result is not None:
+            print(f"⚡ Transcription trouvée dans le cache ({cache_key[:12]}) - Whisper ignoré")
+            return result, model_device
+    
+    backend = get_transcription_backend(model_name, backend_name)
+    if backend.device != model_device:
+        # Fallback CPU pendant le chargement : paramètres et clé à recalculer
+        model_device = backend.device
+        transcribe_params = get_rtx4000_transcribe_params(model_device)
+        if use_cache:
+            cache_key = get_transcription_cache_key(input_audio_path, transcribe_params, cache_model_id)
+    
+    # Transcription avec paramètres anti-répétition optimisés
+    print("🎤 Début transcription avec modèle MEDIUM...")
+    if use_vad:
+        result = transcribe_with_vad(backend, input_audio_path, transcribe_params)
+    else:
+        result = backend.transcribe(input_audio_path, **transcribe_params)
+    
+    # Monitoring GPU si utilisé
+    if model_device == "cuda" and backend.name == WhisperBackend.name:
+        max_memory = torch.cuda.max_memory_allocated(0) / 1024**3
+        print(f"🎮 Mémoire GPU max utilisée: {max_memory:.1f} GB")
+    
+    if use_cache:
+        store_cached_transcription(cache_key, result)
+        print(f"💾 Transcription mise en cache ({cache_key[:12]})")
+    
+    return result, model_device
+
+##############################
+# DÉCOUPAGE VAD + DÉCODAGE PAR LOTS
+##############################
+
+# Pré-passe de détection d'activité vocale (énergie) avant transcription
+WHISPER_VAD_ENABLED = os.getenv("WHISPER_VAD", "0") == "1"
+WHISPER_VAD_BATCH_SIZE = int(os.getenv("WHISPER_VAD_BATCH_SIZE", "8"))
+VAD_SILENCE_DB = -35.0   # Seuil de silence relatif au pic d'énergie
+VAD_MIN_SILENCE = 0.3    # Silence minimal (s) pour couper entre deux zones de parole
+VAD_MAX_CHUNK = 28.0     # Durée maximale d'un morceau (< fenêtre Whisper de 30s)
+VAD_MAX_MERGE_GAP = 2.0  # Au-delà, deux zones de parole ne sont jamais regroupées
+VAD_SPEECH_PAD = 0.2     # Marge (s) conservée autour de la parole
+
+# Températures essayées sur un morceau suspect (même échelle que model.transcribe)
+VAD_FALLBACK_TEMPERATURES = (0.2, 0.4, 0.6, 0.8, 1.0)
+VAD_FALLBACK_BEST_OF = 5  # Candidats échantillonnés par température > 0
+
+def detect_speech_chunks(audio, sample_rate=16000, frame_ms=30, silence_db=VAD_SILENCE_DB,
+                         min_silence=VAD_MIN_SILENCE, max_chunk=VAD_MAX_CHUNK,
+                         max_merge_gap=VAD_MAX_MERGE_GAP, speech_pad=VAD_SPEECH_PAD):
+    """
+    Détection d'activité vocale par énergie : retourne des morceaux
+    (début, fin) en secondes, coupés dans les silences et limités à max_chunk.
+    Les longues plages de silence sont exclues et ne sont donc jamais décodées.
+    """
+    import numpy as np
+    
+    frame = int(sample_rate * frame_ms / 1000)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return []
+    
+    energy = np.sqrt(np.mean(audio[:n_frames * frame].reshape(n_frames, frame) ** 2, axis=1))
+    peak = energy.max()
+    if peak <= 0:
+        return []
+    voiced = 20 * np.log10(energy / peak + 1e-10) > silence_db
+    
+    # Zones de parole continues [début, fin) en trames
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    regions = edges.reshape(-1, 2).tolist()
+    
+    frame_sec = frame / sample_rate
+    min_silence_frames = int(min_silence / frame_sec)
+    max_chunk_frames = int(max_chunk / frame_sec)
+    max_gap_frames = int(max_merge_gap / frame_sec)
+    
+    # Fusionner les zones séparées par des micro-pauses
+    merged = []
+    for start, end in regions:
+        if merged and start - merged[-1][1] < min_silence_frames:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    
+    # Couper les zones trop longues sur la trame la plus calme avant la limite
+    bounded = []
+    for start, end in merged:
+        while end - start > max_chunk_frames:
+            search_from = start + max_chunk_frames // 2
+            cut = search_from + int(np.argmin(energy[search_from:start + max_chunk_frames]))
+            bounded.append([start, cut])
+            start = cut
+        bounded.append([start, end])
+    
+    # Regrouper les zones voisines tant que le morceau reste sous max_chunk
+    chunks = []
+    for start, end in bounded:
+        if (chunks and end - chunks[-1][0] <= max_chunk_frames
+                and start - chunks[-1][1] <= max_gap_frames):
+            chunks[-1][1] = end
+        else:
+            chunks.append([start, end])
+    
+    duration = len(audio) / sample_rate
+    result = []
+    for start, end in chunks:
+        chunk_start = max(0.0, start * frame_sec - speech_pad)
+        chunk_end = min(duration, end * frame_sec + speech_pad)
+        if result:
+            chunk_start = max(chunk_start, result[-1][1])
+        if chunk_end > chunk_start:
+            result.append((chunk_start, chunk_end))
+    
+    return result
+
+def _needs_temperature_fallback(decoded, compression_threshold, logprob_threshold, no_speech_threshold):
+    """Résultat trop répétitif ou peu probable à redécoder (sauf silence avéré)."""
+    if no_speech_threshold is not None and decoded.no_speech_prob > no_speech_threshold:
+        return False
+    return (
+        (compression_threshold is not None and decoded.compression_ratio > compression_threshold)
+        or (logprob_threshold is not None and decoded.avg_logprob < logprob_threshold)
+    )
+
+def _decode_chunks_batched(model, audio, chunks, transcribe_params, batch_size):
+    """
+    Décode les morceaux VAD par lots avec model.decode (une passe encodeur
+    par lot), puis calcule les timestamps des mots morceau par morceau.
+    Les morceaux suspects (compression/logprob) sont redécodés seuls en
+    remontant VAD_FALLBACK_TEMPERATURES, comme le fallback de model.transcribe.
+    """
+    from whisper.audio import log_mel_spectrogram, pad_or_trim, N_FRAMES, SAMPLE_RATE, HOP_LENGTH
+    from whisper.decoding import DecodingOptions
+    from whisper.timing import add_word_timestamps
+    from whisper.tokenizer import get_tokenizer
+    
+    fp16 = bool(transcribe_params.get("fp16")) and model.device.type == "cuda"
+    dtype = torch.float16 if fp16 else torch.float32
+    language = transcribe_params.get("language")
+    tokenizer = get_tokenizer(
+        model.is_multilingual, num_languages=model.num_languages,
+        language=language, task="transcribe"
+    )
+    options = DecodingOptions(
+        task="transcribe",
+        language=language,
+        temperature=transcribe_params.get("temperature", 0.0),
+        beam_size=transcribe_params.get("beam_size"),
+        patience=transcribe_params.get("patience"),
+        prompt=transcribe_params.get("initial_prompt"),
+        without_timestamps=True,
+        fp16=fp16
+    )
+    no_speech_threshold = transcribe_params.get("no_speech_threshold")
+    logprob_threshold = transcribe_params.get("logprob_threshold")
+    compression_threshold = transcribe_params.get("compression_ratio_threshold")
+    
+    segments = []
+    last_speech_timestamp = 0.0
+    
+    for batch_start in range(0, len(chunks), batch_size):
+        batch = chunks[batch_start:batch_start + batch_size]
+        mels, frame_counts = [], []
+        for start, end in batch:
+            mel = log_mel_spectrogram(audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)], model.dims.n_mels)
+            frame_counts.append(min(mel.shape[-1], N_FRAMES))
+            mels.append(pad_or_trim(mel, N_FRAMES))
+        mel_batch = torch.stack(mels).to(model.device).to(dtype)
         
-    except Exception as e:
-        print(f"   ❌ Erreur GPU: {e}")
-        print("   🔄 Fallback vers CPU...")
-        return whisper.load_model("medium", device="cpu")
+        results = model.decode(mel_batch, options)
+        print(f"  ✓ Lot {batch_start // batch_size + 1}: {len(batch)} morceau(x) décodé(s)")
+        
+        for (start, end), mel, num_frames, decoded in zip(batch, mel_batch, frame_counts, results):
+            # Repli de température de ce seul morceau (règles de decode_with_fallback)
+            for temperature in VAD_FALLBACK_TEMPERATURES:
+                if not _needs_temperature_fallback(decoded, compression_threshold,
+                                                   logprob_threshold, no_speech_threshold):
+                    break
+                fallback_options = dataclasses.replace(
+                    options, temperature=temperature, best_of=VAD_FALLBACK_BEST_OF,
+                    beam_size=None, patience=None
+                )
+                decoded = model.decode(mel.unsqueeze(0), fallback_options)[0]
+            
+            # Même règle que model.transcribe pour ignorer un morceau sans parole
+            if (no_speech_threshold is not None and decoded.no_speech_prob > no_speech_threshold
+                    and (logprob_threshold is None or decoded.avg_logprob <= logprob_threshold)):
+                continue
+            
+            if not decoded.text.strip():
+                continue
+            
+            segment = {
+                "seek": int(round(start * SAMPLE_RATE / HOP_LENGTH)),
+                "start": start,
+                "end": end,
+                "text": decoded.text,
+                "tokens": decoded.tokens,
+                "temperature": decoded.temperature,
+                "avg_logprob": decoded.avg_logprob,
+                "compression_ratio": decoded.compression_ratio,
+                "no_speech_prob": decoded.no_speech_prob,
+            }
+            if transcribe_params.get("word_timestamps"):
+                add_word_timestamps(
+                    segments=[segment],
+                    model=model,
+                    tokenizer=tokenizer,
+                    mel=mel,
+                    num_frames=num_frames,
+                    last_speech_timestamp=last_speech_timestamp
+                )
+            segments.append(segment)
+            last_speech_timestamp = segment["end"]
+    
+    return segments
+
+def transcribe_with_vad(backend, input_audio_path, transcribe_params, batch_size=None):
+    """
+    Transcription avec pré-passe VAD : l'audio est découpé aux silences en
+    morceaux indépendants, décodés par lots puis fusionnés en une seule liste
+    de segments (format model.transcribe).
+    """
+    import whisper.audio
+    
+    batch_size = batch_size or WHISPER_VAD_BATCH_SIZE
+    audio = whisper.audio.load_audio(input_audio_path)
+    chunks = detect_speech_chunks(audio, whisper.audio.SAMPLE_RATE)
+    
+    speech_duration = sum(end - start for start, end in chunks)
+    total_duration = len(audio) / whisper.audio.SAMPLE_RATE
+    print(f"🔇 VAD: {len(chunks)} morceau(x) de parole, {speech_duration:.1f}s sur {total_duration:.1f}s")
+    
+    if backend.name == WhisperBackend.name:
+        segments = _decode_chunks_batched(backend.model, audio, chunks, transcribe_params, batch_size)
+    else:
+        # Backends sans décodage par lots : morceaux transcrits un par un
+        segments = []
+        for start, end in chunks:
+            chunk_audio = audio[int(start * whisper.audio.SAMPLE_RATE):int(end * whisper.audio.SAMPLE_RATE)]
+            chunk_result = offset_transcription_result(backend.transcribe(chunk_audio, **transcribe_params), start)
+            segments.extend(chunk_result.get("segments", []))
+    
+    for i, segment in enumerate(segments):
+        segment["id"] = i
+    
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": transcribe_params.get("language")
+    }
+
+##############################
+# ALIGNEMENT FORCÉ (texte connu)
+##############################
+
+# Aligner le texte source connu au lieu de le retranscrire (nécessite reference_text)
+WHISPER_FORCED_ALIGNMENT = os.getenv("WHISPER_FORCED_ALIGNMENT", "0") == "1"
+ALIGN_MAX_TOKENS = 200         # Tokens de texte candidats par fenêtre de 30s
+ALIGN_WINDOW_MARGIN = 2.0      # Les mots finissant dans les 2 dernières secondes sont réalignés
+ALIGN_INITIAL_WORD_RATE = 3.0  # Débit de départ (mots/s), réestimé à chaque fenêtre
+
+def align_reference_text(model, audio, reference_text, language="fr"):
+    """
+    Alignement forcé du texte connu sur l'audio (DTW sur l'attention croisée
+    de Whisper, sans décodage). L'audio est parcouru par fenêtres de 30s :
+    on aligne les mots candidats, on garde ceux qui se terminent avant la fin
+    de la fenêtre, puis la fenêtre suivante repart du dernier mot conservé.
+    
+    Returns:
+        list: Mots au format Whisper {"word", "start", "end", "probability"}
+    """
+    from whisper.audio import log_mel_spectrogram, pad_or_trim, N_FRAMES, N_SAMPLES, SAMPLE_RATE
+    from whisper.timing import find_alignment
+    from whisper.tokenizer import get_tokenizer
+    
+    tokenizer = get_tokenizer(
+        model.is_multilingual, num_languages=model.num_languages,
+        language=language, task="transcribe"
+    )
+    dtype = torch.float16 if model.device.type == "cuda" else torch.float32
+    
+    words = reference_text.split()
+    word_tokens = [tokenizer.encode(" " + word) for word in words]
+    duration = len(audio) / SAMPLE_RATE
+    
+    # Débuts de parole : les fenêtres sautent les silences au lieu d'y forcer des mots
+    speech_starts = [start for start, _ in detect_speech_chunks(audio, SAMPLE_RATE)]
+    
+    aligned = []
+    word_index = 0
+    seek_time = 0.0
+    word_rate = ALIGN_INITIAL_WORD_RATE
+    
+    while word_index < len(words) and seek_time < duration:
+        next_speech = next((start for start in speech_starts if start >= seek_time), None)
+        if next_speech is not None and next_speech - seek_time > VAD_MIN_SILENCE:
+            seek_time = next_speech
+        
+        seek_sample = int(seek_time * SAMPLE_RATE)
+        window = audio[seek_sample:seek_sample + N_SAMPLES]
+        window_duration = len(window) / SAMPLE_RATE
+        is_last_window = seek_sample + N_SAMPLES >= len(audio)
+        
+        # Mots candidats : débit estimé + 25%, dans la limite du budget de tokens
+        max_words = max(20, int(word_rate * window_duration * 1.25))
+        candidate_end, token_count = word_index, 0
+        while (candidate_end < len(words) and candidate_end - word_index < max_words
+               and token_count + len(word_tokens[candidate_end]) <= ALIGN_MAX_TOKENS):
+            token_count += len(word_tokens[candidate_end])
+            candidate_end += 1
+        candidate_end = max(candidate_end, word_index + 1)
+        
+        mel = log_mel_spectrogram(window, model.dims.n_mels)
+        num_frames = min(mel.shape[-1], N_FRAMES)
+        mel = pad_or_trim(mel, N_FRAMES).to(model.device).to(dtype)
+        text_tokens = [token for tokens in word_tokens[word_index:candidate_end] for token in tokens]
+        timings = find_alignment(model, tokenizer, text_tokens, mel, num_frames)
+        
+        # Rattacher les sous-mots Whisper (ponctuation séparée) aux mots du texte
+        word_bounds = [None] * (candidate_end - word_index)
+        boundaries, total = [], 0
+        for tokens in word_tokens[word_index:candidate_end]:
+            total += len(tokens)
+            boundaries.append(total)
+        consumed, current = 0, 0
+        for timing in timings:
+            while current < len(boundaries) - 1 and consumed >= boundaries[current]:
+                current += 1
+            start, end = float(timing.start), float(timing.end)
+            if word_bounds[current] is None:
+                word_bounds[current] = [start, end, [float(timing.probability)]]
+            else:
+                word_bounds[current][1] = end
+                word_bounds[current][2].append(float(timing.probability))
+            consumed += len(timing.tokens)
+        
+        # Conserver les mots terminés avant la marge de fin de fenêtre
+        all_candidates_fit = is_last_window and candidate_end == len(words)
+        limit = window_duration if all_candidates_fit else window_duration - ALIGN_WINDOW_MARGIN
+        accepted = 0
+        for offset, bounds in enumerate(word_bounds):
+            if bounds is None or (bounds[1] > limit and accepted > 0):
+                break
+            aligned.append({
+                "word": " " + words[word_index + offset],
+                "start": round(seek_time + bounds[0], 2),
+                "end": round(seek_time + bounds[1], 2),
+                "probability": sum(bounds[2]) / len(bounds[2])
+            })
+            accepted += 1
+        
+        if accepted == 0:
+            # Fenêtre sans mot exploitable : avancer pour garantir la progression
+            seek_time += max(window_duration - ALIGN_WINDOW_MARGIN, 1.0)
+            continue
+        
+        window_speech = aligned[-1]["end"] - seek_time
+        if window_speech > 1.0:
+            word_rate = accepted / window_speech
+        word_index += accepted
+        seek_time = max(aligned[-1]["end"], seek_time + 0.5)
+        print(f"  ✓ Fenêtre alignée: {accepted} mots ({word_index}/{len(words)}) → {seek_time:.1f}s")
+    
+    # Mots restants (audio épuisé) : placés à la fin pour n'en perdre aucun
+    for word in words[word_index:]:
+        aligned.append({"word": " " + word, "start": round(duration, 2), "end": round(duration, 2), "probability": 0.0})
+    
+    return aligned
+
+def group_words_into_segments(words):
+    """Regroupe les mots alignés en segments (une phrase par segment) au format Whisper."""
+    segments = []
+    current = []
+    for i, word in enumerate(words):
+        current.append(word)
+        if word["word"].rstrip().endswith(('.', '!', '?')) or i == len(words) - 1:
+            segments.append({
+                "id": len(segments),
+                "start": current[0]["start"],
+                "end": current[-1]["end"],
+                "text": "".join(w["word"] for w in current),
+                "words": current
+            })
+            current = []
+    return segments
+
+def align_audio_with_text(input_audio_path, reference_text, model_name=None, use_cache=None):
+    """
+    Produit un résultat au format model.transcribe à partir du texte connu,
+    sans transcription libre (mis en cache comme une transcription).
+    """
+    import whisper.audio
+    
+    model_name = model_name or DEFAULT_WHISPER_MODEL
+    use_cache = TRANSCRIPTION_CACHE_ENABLED if use_cache is None else use_cache
+    language = "fr"
+    
+    cache_key = None
+    if use_cache:
+        align_params = {
+            "mode": "forced_alignment",
+            "language": language,
+            "reference_text_sha256": hashlib.sha256(reference_text.encode("utf-8")).hexdigest()
+        }
+        cache_key = get_transcription_cache_key(input_audio_path, align_params, f"whisper:{model_name}")
+        result = load_cached_transcription(cache_key)
+        if result is not None:
+            print(f"⚡ Alignement trouvé dans le cache ({cache_key[:12]})")
+            return result
+    
+    # L'alignement utilise l'attention croisée : modèle openai-whisper requis
+    model = get_whisper_model(model_name)
+    audio = whisper.audio.load_audio(input_audio_path)
+    
+    print(f"📐 Alignement forcé de {len(reference_text.split())} mots sur l'audio...")
+    with torch.no_grad():
+        words = align_reference_text(model, audio, reference_text, language)
+    segments = group_words_into_segments(words)
+    
+    result = {
+        "text": " ".join(reference_text.split()),
+        "segments": segments,
+        "language": language
+    }
+    
+    if use_cache:
+        store_cached_transcription(cache_key, result)
+    
+    return result
+
+##############################
+# TRANSCRIPTION PARALLÈLE PAR PARTIE AUDIO
+##############################
+
+# Nombre de processus pour la transcription par partie (1 = désactivé)
+WHISPER_PARALLEL_WORKERS = int(os.getenv("WHISPER_PARALLEL_WORKERS", "1"))
+
+def get_audio_duration(audio_path):
+    """Retourne la durée de l'audio en secondes (ffprobe)."""
+    import subprocess
+    result = subprocess.run([
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        audio_path
+    ], capture_output=True, text=True, timeout=30)
+    return float(result.stdout.strip())
+
+def offset_transcription_result(result, offset):
+    """Décale tous les timestamps (segments et mots) d'un résultat de transcription."""
+    for segment in result.get("segments", []):
+        segment["start"] += offset
+        segment["end"] += offset
+        for word in segment.get("words") or []:
+            word["start"] += offset
+            word["end"] += offset
+    return result
+
+def _init_transcription_worker(num_threads):
+    """Initialise un processus de transcription : limite les threads PyTorch."""
+    torch.set_num_threads(num_threads)
+
+def _transcribe_part_worker(audio_path, model_name):
+    """Point d'entrée d'un processus : transcrit une partie (modèle chargé une fois par processus)."""
+    result, _ = transcribe_audio(audio_path, model_name)
+    return result
+
+def transcribe_audio_parts(audio_parts, gap_seconds=0.0, model_name=None, max_workers=None):
+    """
+    Transcrit chaque partie audio indépendamment sur un pool de processus,
+    puis fusionne les segments en décalant les timestamps de la durée
+    cumulée des parties précédentes (plus les pauses insérées à la fusion).
+    
+    Args:
+        audio_parts: Liste ordonnée des fichiers audio (ex: audio_part_N_norm.mp3)
+        gap_seconds: Silence inséré entre deux parties lors de la fusion
+        model_name: Checkpoint Whisper (optionnel)
+        max_workers: Nombre de processus (défaut: WHISPER_PARALLEL_WORKERS)
+    
+    Returns:
+        dict: Résultat au format model.transcribe couvrant l'audio fusionné
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    max_workers = min(max_workers or WHISPER_PARALLEL_WORKERS, len(audio_parts))
+    
+    # Offsets connus à l'avance : aucune dépendance entre les parties
+    offsets = []
+    cumulative = 0.0
+    for i, part in enumerate(audio_parts):
+        offsets.append(cumulative)
+        cumulative += get_audio_duration(part)
+        if i < len(audio_parts) - 1:
+            cumulative += gap_seconds
+    
+    print(f"⚡ Transcription parallèle de {len(audio_parts)} partie(s) sur {max_workers} processus...")
+    
+    if max_workers <= 1 or _resolve_whisper_device() == "cuda":
+        # Un seul GPU : transcription séquentielle dans ce processus
+        results = [transcribe_audio(part, model_name)[0] for part in audio_parts]
+    else:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // max_workers)
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_transcription_worker,
+            initargs=(threads_per_worker,)
+        ) as executor:
+            results = list(executor.map(
+                _transcribe_part_worker, audio_parts, [model_name] * len(audio_parts)
+            ))
+    
+    merged_segments = []
+    for i, (result, offset) in enumerate(zip(results, offsets)):
+        offset_transcription_result(result, offset)
+        merged_segments.extend(result.get("segments", []))
+        print(f"  ✓ Partie {i+1}: {len(result.get('segments', []))} segments (offset {offset:.2f}s)")
+    
+    for i, segment in enumerate(merged_segments):
+        segment["id"] = i
+    
+    return {
+        "text": "".join(result.get("text", "") for result in results),
+        "segments": merged_segments,
+        "language": results[0].get("language") if results else None
+    }
 
 def get_rtx4000_transcribe_params(model_device):
     """Paramètres ÉQUILIBRÉS pour modèle MEDIUM - Optimisés pour vitesse et précision."""
@@ -183,6 +1079,28 @@ def normalize_text(text):
     text = re.sub(r'\s+', ' ', text)
     return text.strip()
 
+# Seuil de similarité au-delà duquel deux segments sont considérés comme répétés
+REPETITION_SIMILARITY = 0.8
+
+def _is_similar(matcher, current_norm, next_norm, threshold=REPETITION_SIMILARITY):
+    """
+    Teste SequenceMatcher(None, current_norm, next_norm).ratio() > threshold en
+    évitant le calcul complet quand des bornes supérieures suffisent à conclure.
+    matcher doit déjà avoir current_norm comme première séquence.
+    """
+    if current_norm == next_norm:
+        return 1.0 > threshold
+    
+    # Borne sur les longueurs (équivalent de real_quick_ratio) : ratio <= 2*min / (la + lb)
+    len_a, len_b = len(current_norm), len(next_norm)
+    if 2.0 * min(len_a, len_b) / (len_a + len_b) <= threshold:
+        return False
+    
+    matcher.set_seq2(next_norm)
+    if matcher.quick_ratio() <= threshold:
+        return False
+    return matcher.ratio() > threshold
+
 def advanced_deduplication(segments):
     """Déduplication contre les répétitions de Whisper."""
     if not segments:
@@ -191,10 +1109,15 @@ def advanced_deduplication(segments):
     print("Déduplication des répétitions en cours...")
     clean_segments = []
     
+    # Normalisation une seule fois par segment
+    stripped_texts = [segment["text"].strip() for segment in segments]
+    normalized_texts = [normalize_text(text) for text in stripped_texts]
+    matcher = SequenceMatcher(None)
+    
     i = 0
     while i < len(segments):
         current = segments[i]
-        current_text = current["text"].strip()
+        current_text = stripped_texts[i]
         
         # Ignorer les segments très courts ou vides
         if len(current_text) < 3:
@@ -204,14 +1127,10 @@ def advanced_deduplication(segments):
         # Chercher des répétitions consécutives (minimum 3 répétitions)
         consecutive_count = 1
         j = i + 1
+        matcher.set_seq1(normalized_texts[i])
         
         while j < len(segments):
-            next_text = segments[j]["text"].strip()
-            similarity = SequenceMatcher(None, 
-                                       normalize_text(current_text), 
-                                       normalize_text(next_text)).ratio()
-            
-            if similarity > 0.8:  # Très similaire
+            if _is_similar(matcher, normalized_texts[i], normalized_texts[j]):  # Très similaire
                 consecutive_count += 1
                 j += 1
             else:
@@ -289,48 +1208,87 @@ def count_linguistic_words(word_data):
     merged_words = merge_compound_words(word_data)
     return len(merged_words)
 
-def process_words_sequentially(word_data, max_words, max_chars, min_gap):
-    """Traite les mots séquentiellement avec timings précis - AUCUN mot perdu."""
-    if not word_data:
-        return []
+# Niveau de détail des logs de segmentation (2 = une ligne par segment créé)
+SRT_VERBOSITY = int(os.getenv("SRT_VERBOSITY", "1"))
+
+def iter_word_segments(merged_words, max_words, max_chars, verbosity=None):
+    """
+    Segmenteur en flux : émet les segments au fil des mots (générateur).
     
-    # First, merge compound words to get proper linguistic units
-    merged_word_data = merge_compound_words(word_data)
+    Les compteurs de mots et de caractères sont tenus à jour mot par mot,
+    le texte d'un segment n'est construit qu'une fois, à son émission :
+    coût linéaire quelle que soit la longueur de la transcription.
+    
+    Args:
+        merged_words: Mots Whisper (après merge_compound_words), itérable
+        max_words: Nombre maximal de mots linguistiques par segment
+        max_chars: Nombre maximal de caractères par segment
+        verbosity: Niveau de log (défaut: SRT_VERBOSITY)
+    """
+    verbosity = SRT_VERBOSITY if verbosity is None else verbosity
     
-    segments = []
     current_words = []
+    raw_length = 0        # Longueur de "".join(mots) avant strip()
+    leading_spaces = 0    # Espaces retirés par strip() au début
+    trailing_spaces = 0   # Espaces retirés par strip() à la fin
+    has_text = False      # Le texte strippé est non vide
     
-    for i, word_info in enumerate(merged_word_data):
+    def emit():
+        text = "".join(w["word"] for w in current_words).strip()
+        if verbosity >= 2:
+            print(f"    Segment créé: '{text}' ({len(current_words)} mots linguistiques, {len(text)} chars)")
+        return {
+            "start": current_words[0]["start"],
+            "end": current_words[-1]["end"],
+            "text": text
+        }
+    
+    for word_info in merged_words:
+        word = word_info["word"]
         current_words.append(word_info)
+        raw_length += len(word)
+        
+        stripped_word = word.strip()
+        if stripped_word:
+            if not has_text:
+                leading_spaces += len(word) - len(word.lstrip())
+                has_text = True
+            trailing_spaces = len(word) - len(word.rstrip())
+        elif has_text:
+            trailing_spaces += len(word)
+        else:
+            leading_spaces += len(word)
         
-        # Construire le texte actuel avec les espaces de Whisper
-        current_text = "".join([w["word"] for w in current_words]).strip()
+        text_length = raw_length - leading_spaces - trailing_spaces if has_text else 0
         
-        # Vérifier si on doit créer un segment (now using linguistic word count)
+        # Vérifier si on doit créer un segment (le dernier mot est traité après la boucle)
         should_create_segment = (
             len(current_words) >= max_words or  # Limite de mots linguistiques atteinte
-            len(current_text) >= max_chars or   # Limite de caractères atteinte
-            i == len(merged_word_data) - 1 or   # Dernier mot
-            word_info["word"].rstrip().endswith(('.', '!', '?', ';', ':'))  # Fin de phrase naturelle
+            text_length >= max_chars or         # Limite de caractères atteinte
+            word.rstrip().endswith(('.', '!', '?', ';', ':'))  # Fin de phrase naturelle
         )
         
-        if should_create_segment and current_text:
-            # Créer le segment avec timings précis
-            segment_start = current_words[0]["start"]
-            segment_end = current_words[-1]["end"]
-            
-            segments.append({
-                "start": segment_start,
-                "end": segment_end,
-                "text": current_text
-            })
-            
-            print(f"    Segment créé: '{current_text}' ({len(current_words)} mots linguistiques, {len(current_text)} chars)")
+        if should_create_segment and has_text:
+            yield emit()
             
             # Réinitialiser pour le prochain segment
             current_words = []
+            raw_length = leading_spaces = trailing_spaces = 0
+            has_text = False
     
-    return segments
+    # Dernier mot : émettre ce qui reste
+    if current_words and has_text:
+        yield emit()
+
+def process_words_sequentially(word_data, max_words, max_chars, min_gap):
+    """Traite les mots séquentiellement avec timings précis - AUCUN mot perdu."""
+    if not word_data:
+        return []
+    
+    # First, merge compound words to get proper linguistic units
+    merged_word_data = merge_compound_words(word_data)
+    
+    return list(iter_word_segments(merged_word_data, max_words, max_chars))
 
 def process_text_sequentially(text, start_time, end_time, max_words, max_chars, min_gap):
     """Traite le texte séquentiellement sans horodatages précis - AUCUN mot perdu."""
@@ -375,7 +1333,8 @@ def process_text_sequentially(text, start_time, end_time, max_words, max_chars,
                 "text": current_text
             })
             
-            print(f"    Segment créé: '{current_text}' ({len(current_words)} mots, {len(current_text)} chars)")
+            if SRT_VERBOSITY >= 2:
+                print(f"    Segment créé: '{current_text}' ({len(current_words)} mots, {len(current_text)} chars)")
     
     return segments
 
@@ -396,9 +1355,11 @@ def smart_segmentation(segments):
         end_time = segment["end"]
         duration = end_time - start_time
         
-        # Count linguistic words (after merging compound words)
+        # Count linguistic words (after merging compound words, done once per segment)
+        merged_words = None
         if "words" in segment and segment["words"]:
-            linguistic_word_count = count_linguistic_words(segment["words"])
+            merged_words = merge_compound_words(segment["words"])
+            linguistic_word_count = len(merged_words)
         else:
             # Fallback: split on whitespace for basic word count
             linguistic_word_count = len(text.split())
@@ -415,13 +1376,12 @@ def smart_segmentation(segments):
             continue
         
         # Segment dépasse les limites : traitement séquentiel avec timings précis
-        print(f"  Traitement séquentiel: '{text[:30]}...' ({linguistic_word_count} mots linguistiques)")
+        if SRT_VERBOSITY >= 2:
+            print(f"  Traitement séquentiel: '{text[:30]}...' ({linguistic_word_count} mots linguistiques)")
         
-        if "words" in segment and segment["words"] and len(segment["words"]) > 0:
-            # Utiliser les horodatages précis des mots (version 27 style)
-            word_data = segment["words"]
-            processed_segments = process_words_sequentially(word_data, MAX_WORDS_PER_SEGMENT, MAX_CHARS_PER_SEGMENT, MIN_GAP)
-            optimized.extend(processed_segments)
+        if merged_words:
+            # Utiliser les horodatages précis des mots (version 27 style), en flux
+            optimized.extend(iter_word_segments(merged_words, MAX_WORDS_PER_SEGMENT, MAX_CHARS_PER_SEGMENT))
         else:
             # Fallback : traitement séquentiel sans horodatages précis
             fallback_segments = process_text_sequentially(text, start_time, end_time, MAX_WORDS_PER_SEGMENT, MAX_CHARS_PER_SEGMENT, MIN_GAP)
@@ -518,7 +1478,8 @@ def format_timestamp(seconds):
     
     return f"{hours:02d}:{minutes:02d}:{int(seconds):02d},{milliseconds:03d}"
 
-def generate_srt(input_audio_path, output_srt_path=None):
+def generate_srt(input_audio_path, output_srt_path=None, model_name=None,
+                 audio_parts=None, part_gap_seconds=0.0, reference_text=None):
     """
     Fonction principale qui génère le fichier SRT professionnel.
     Compatible avec le pipeline existant.
@@ -526,6 +1487,12 @@ def generate_srt(input_audio_path, output_srt_path=None):
     Args:
         input_audio_path: Chemin vers le fichier audio d'entrée
         output_srt_path: Chemin où sauvegarder le fichier SRT (optionnel)
+        model_name: Checkpoint Whisper (optionnel, défaut: DEFAULT_WHISPER_MODEL)
+        audio_parts: Parties audio dont input_audio_path est la fusion (optionnel).
+            Si WHISPER_PARALLEL_WORKERS > 1, elles sont transcrites en parallèle.
+        part_gap_seconds: Silence inséré entre les parties lors de la fusion
+        reference_text: Texte exact prononcé (optionnel). Si WHISPER_FORCED_ALIGNMENT=1,
+            il est aligné sur l'audio au lieu d'être retranscrit.
     
     Returns:
         str: Chemin du fichier SRT généré
@@ -540,27 +1507,22 @@ def generate_srt(input_audio_path, output_srt_path=None):
     print(f"Début de la transcription avec le modèle Whisper MEDIUM optimisé...")
     start_time = time.time()
     
-    # Charger le modèle avec optimisations RTX 4000
-    model = setup_rtx4000_model()
-    model_device = "cuda" if model.device.type == "cuda" else "cpu"
-    
-    # Paramètres optimisés selon le device
-    transcribe_params = get_rtx4000_transcribe_params(model_device)
-    
-    # Transcription avec paramètres anti-répétition optimisés
-    print("🎤 Début transcription avec modèle MEDIUM...")
+    # Transcription via le backend configuré (modèle chargé une seule fois, résultat mis en cache)
     try:
-        result = model.transcribe(input_audio_path, **transcribe_params)
+        use_alignment = bool(reference_text) and WHISPER_FORCED_ALIGNMENT
+        if use_alignment:
+            result = align_audio_with_text(input_audio_path, reference_text, model_name)
+            model_device = _resolve_whisper_device()
+        elif audio_parts and WHISPER_PARALLEL_WORKERS > 1:
+            result = transcribe_audio_parts(audio_parts, part_gap_seconds, model_name)
+            model_device = _resolve_whisper_device()
+        else:
+            result, model_device = transcribe_audio(input_audio_path, model_name)
         
         end_time = time.time()
         duration = end_time - start_time
         
         print(f"✅ Transcription MEDIUM terminée en {duration:.2f} secondes.")
-        
-        # Monitoring GPU si utilisé
-        if model_device == "cuda":
-            max_memory = torch.cuda.max_memory_allocated(0) / 1024**3
-            print(f"🎮 Mémoire GPU max utilisée: {max_memory:.1f} GB")
             
     except Exception as e:
         print(f"❌ Erreur transcription: {e}")
@@ -575,7 +1537,12 @@ def generate_srt(input_audio_path, output_srt_path=None):
     print("=" * 60)
     
     # Déduplication intelligente (fusionner au lieu de supprimer)
-    cleaned_segments = advanced_deduplication(result["segments"])
+    if use_alignment:
+        # Texte source aligné : aucune hallucination à nettoyer
+        cleaned_segments = result["segments"]
+        print("Alignement forcé: déduplication inutile")
+    else:
+        cleaned_segments = advanced_deduplication(result["segments"])
     print(f"Après déduplication intelligente: {len(cleaned_segments)} segments")
     
     print("\n" + "=" * 60)
@@ -614,10 +1581,10 @@ def generate_srt(input_audio_path, output_srt_path=None):
     with open(srt_filename, "w", encoding="utf-8") as srt_file:
         write_srt(final_segments, srt_file)
     
-    # Nettoyage final GPU
+    # Nettoyage final GPU (le modèle reste résident dans le registre)
     if model_device == "cuda":
         torch.cuda.empty_cache()
-        print("🧹 Mémoire GPU nettoyée")
+        print("🧹 Cache GPU nettoyé (modèle conservé pour les prochains appels)")
     
     print("\n" + "=" * 60)
     print("GÉNÉRATION SRT TERMINÉE AVEC SUCCÈS!")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Worker de transcription persistant.
+
+Garde le modèle Whisper résident en mémoire et accepte des jobs SRT sur un
+port HTTP local, pour éviter à chaque pipeline le démarrage de Python,
+l'import de torch/whisper et le chargement du modèle.
+
+Lancement :
+    python -m subs_generator.worker [--host 127.0.0.1] [--port 8765] [--model medium]
+
+Les fonctions client (is_worker_available, generate_srt_via_worker) n'importent
+que la bibliothèque standard : elles peuvent être appelées sans coût de démarrage.
+"""
+import os
+import json
+import argparse
+import threading
+import urllib.request
+import urllib.error
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Adresse du worker (surchargeable via la variable d'environnement SRT_WORKER_URL)
+DEFAULT_WORKER_HOST = "127.0.0.1"
+DEFAULT_WORKER_PORT = 8765
+SRT_WORKER_URL = os.getenv("SRT_WORKER_URL", f"http://{DEFAULT_WORKER_HOST}:{DEFAULT_WORKER_PORT}")
+
+##############################
+# CLIENT
+##############################
+
+def is_worker_available(worker_url=None, timeout=1.0):
+    """Vérifie si un worker répond sur l'adresse configurée."""
+    try:
+        with urllib.request.urlopen(f"{worker_url or SRT_WORKER_URL}/health", timeout=timeout) as response:
+            return response.status == 200
+    except (urllib.error.URLError, OSError, ValueError):
+        return False
+
+def generate_srt_via_worker(input_audio_path, output_srt_path, worker_url=None, **options):
+    """
+    Envoie un job de génération SRT au worker et attend le résultat.
+
+    Args:
+        input_audio_path: Chemin vers le fichier audio d'entrée
+        output_srt_path: Chemin où sauvegarder le fichier SRT
+        worker_url: Adresse du worker (défaut: SRT_WORKER_URL)
+        **options: Arguments supplémentaires de generate_srt
+            (model_name, audio_parts, part_gap_seconds, reference_text)
+
+    Returns:
+        str: Chemin du fichier SRT généré
+
+    Raises:
+        urllib.error.HTTPError: Erreur 5xx du worker (OSError : l'appelant peut
+            retranscrire dans son propre processus)
+        RuntimeError: Job refusé par le worker (4xx)
+    """
+    # Le worker peut tourner dans un autre dossier : chemins absolus
+    job = {
+        "input_audio_path": os.path.abspath(input_audio_path),
+        "output_srt_path": os.path.abspath(output_srt_path),
+    }
+    if options.get("audio_parts"):
+        options["audio_parts"] = [os.path.abspath(part) for part in options["audio_parts"]]
+    job.update({key: value for key, value in options.items() if value is not None})
+
+    request = urllib.request.Request(
+        f"{worker_url or SRT_WORKER_URL}/srt",
+        data=json.dumps(job, ensure_ascii=False).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            payload = json.loads(response.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        try:
+            payload = json.loads(e.read().decode("utf-8") or "{}")
+        except ValueError:
+            payload = {}
+        e.msg = payload.get("error", e.reason)
+        if e.code >= 500:
+            # Erreur côté worker (modèle, GPU...) : l'appelant se replie sur le processus courant
+            raise
+        raise RuntimeError(f"Le worker a refusé le job (Status {e.code}): {e.msg}")
+
+    return payload["srt_path"]
+
+##############################
+# SERVEUR
+##############################
+
+class TranscriptionJobHandler(BaseHTTPRequestHandler):
+    """
+    Reçoit les jobs SRT ; un seul job s'exécute à la fois (modèle partagé).
+
+    Le serveur est multi-thread uniquement pour que /health réponde pendant
+    une transcription : les jobs /srt sont sérialisés par job_lock, un second
+    pipeline attend donc la fin du job en cours.
+    """
+
+    job_lock = threading.Lock()
+    # Modèle préchargé par serve (--model), utilisé par les jobs sans model_name
+    default_model = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": "Route inconnue"})
+            return
+        from subs_generator.srt_generator import loaded_whisper_models
+        self._send_json(200, {
+            "status": "ok",
+            "models": [list(key) for key in loaded_whisper_models()]
+        })
+
+    def do_POST(self):
+        if self.path != "/srt":
+            self._send_json(404, {"error": "Route inconnue"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            job = json.loads(self.rfile.read(length).decode("utf-8"))
+            input_audio_path = job.pop("input_audio_path")
+            output_srt_path = job.pop("output_srt_path")
+        except (ValueError, KeyError) as e:
+            self._send_json(400, {"error": f"Job invalide: {e}"})
+            return
+        if job.get("model_name") is None:
+            job["model_name"] = self.default_model
+
+        from subs_generator.srt_generator import generate_srt
+
+        with self.job_lock:
+            try:
+                srt_path = generate_srt(input_audio_path, output_srt_path, **job)
+            except Exception as e:
+                print(f"❌ Erreur job SRT: {e}")
+                self._send_json(500, {"error": str(e)})
+                return
+
+        self._send_json(200, {"srt_path": srt_path})
+
+    def log_message(self, format, *args):
+        print(f"🌐 {self.address_string()} - {format % args}")
+
+def serve(host=DEFAULT_WORKER_HOST, port=DEFAULT_WORKER_PORT, model_name=None):
+    """Charge le modèle une fois puis sert les jobs jusqu'à interruption."""
+    from subs_generator.srt_generator import get_transcription_backend
+
+    print("=" * 60)
+    print("WORKER DE TRANSCRIPTION SRT")
+    print("=" * 60)
+
+    # Préchargement : les requêtes suivantes trouvent le modèle dans le registre
+    get_transcription_backend(model_name)
+    TranscriptionJobHandler.default_model = model_name
+
+    # Un thread par requête, mais un seul job SRT à la fois (job_lock)
+    server = ThreadingHTTPServer((host, port), TranscriptionJobHandler)
+    print(f"🚀 Worker prêt sur http://{host}:{port} (Ctrl+C pour arrêter)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Arrêt du worker")
+    finally:
+        server.server_close()
+
+def main():
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Worker de transcription SRT persistant")
+    parser.add_argument("--host", default=DEFAULT_WORKER_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_WORKER_PORT)
+    parser.add_argument("--model", default=None, help="Checkpoint Whisper (défaut: WHISPER_MODEL ou medium)")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.model)
+
+if __name__ == "__main__":
+    main()
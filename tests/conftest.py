@@ -0,0 +1,81 @@
+"""
+Fixtures communes : serveur HTTP local scriptable (simule ElevenLabs ou le
+worker de transcription sans réseau) et marqueur requires_ffmpeg (test ignoré
+si ffmpeg est introuvable).
+"""
+import os
+import sys
+import shutil
+import subprocess
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "requires_ffmpeg: test qui lance ffmpeg (ignoré s'il est introuvable)")
+
+def skip_without_ffmpeg():
+    if shutil.which("ffmpeg") is None:
+        pytest.skip("ffmpeg introuvable")
+
+def pytest_runtest_setup(item):
+    if item.get_closest_marker("requires_ffmpeg"):
+        skip_without_ffmpeg()
+
+class StubServer:
+    """
+    Serveur local dont les réponses sont une file de (status, headers, body) ;
+    la dernière réponse est rejouée quand la file est épuisée.
+    """
+
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self):
+                length = int(self.headers.get("Content-Length", 0))
+                stub.requests.append((self.command, self.path, self.rfile.read(length)))
+                status, headers, body = stub.responses.pop(0) if len(stub.responses) > 1 else stub.responses[0]
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _reply
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def respond(self, status, body=b"", headers=None):
+        self.responses.append((status, headers or {}, body))
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    yield server
+    server.close()
+
+@pytest.fixture(scope="session")
+def mp3_bytes(tmp_path_factory):
+    """Une seconde de sinus encodée en MP3 (réponse ElevenLabs simulée)."""
+    skip_without_ffmpeg()
+    path = tmp_path_factory.mktemp("audio") / "tone.mp3"
+    subprocess.run(["ffmpeg", "-y", "-v", "error", "-f", "lavfi", "-i", "sine=frequency=440:duration=1",
+                    "-ac", "1", "-c:a", "libmp3lame", "-b:a", "64k", str(path)], check=True)
+    return path.read_bytes()
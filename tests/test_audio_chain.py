@@ -0,0 +1,33 @@
+import subprocess
+
+import numpy as np
+import pytest
+
+from audio_generator.audio_chain import build_fused_voice_graph, intermediate_codec_args, intermediate_ext
+
+def test_flac_intermediates_are_float_wav():
+    assert intermediate_ext("flac") == ".wav"
+    assert intermediate_ext("wav") == ".wav"
+    assert intermediate_ext("mp3") == ".mp3"
+
+@pytest.mark.requires_ffmpeg
+def test_boosted_wav_intermediate_keeps_peaks_above_full_scale(tmp_path):
+    output = str(tmp_path / "boosted.wav")
+    subprocess.run(["ffmpeg", "-y", "-v", "error", "-f", "lavfi", "-i", "aevalsrc=0.8*sin(2*PI*440*t):d=0.5",
+                    "-af", "volume=10dB", *intermediate_codec_args(output), output], check=True)
+    pcm = subprocess.run(["ffmpeg", "-v", "error", "-i", output, "-f", "f32le", "-"],
+                         check=True, capture_output=True).stdout
+    assert np.abs(np.frombuffer(pcm, np.float32)).max() > 2.0
+
+@pytest.mark.requires_ffmpeg
+@pytest.mark.parametrize("channel_layout", ["mono", "stereo"])
+def test_fused_voice_graph_keeps_the_parts_channel_layout(tmp_path, channel_layout):
+    output = str(tmp_path / "voice.wav")
+    cmd = ["ffmpeg", "-y", "-v", "error"]
+    for _ in range(2):
+        cmd += ["-f", "lavfi", "-i", f"sine=d=0.5,aformat=channel_layouts={channel_layout}"]
+    cmd += ["-filter_complex", build_fused_voice_graph(2, 0.2, "anull", 10, channel_layout),
+            "-map", "[voice]", *intermediate_codec_args(output), output]
+    subprocess.run(cmd, check=True)
+    info = subprocess.run(["ffmpeg", "-hide_banner", "-i", output], capture_output=True, text=True).stderr
+    assert f"44100 Hz, {channel_layout}" in info
@@ -0,0 +1,42 @@
+import random
+
+from audio_generator.bench_chunking import build_edit_pair, check_chunks, run_benchmark
+from audio_generator.chunking import split_text_content_defined
+
+def test_content_defined_chunks_respect_the_api_limit_and_keep_the_text():
+    original, edited = build_edit_pair(random.Random(1), 300)
+    for text in (original, edited):
+        check_chunks(text, split_text_content_defined(text))
+
+def test_chunks_after_an_early_edit_are_reused():
+    original, edited = build_edit_pair(random.Random(3), 400)
+    before, after = split_text_content_defined(original), split_text_content_defined(edited)
+    # Les frontières se resynchronisent : la fin du script découpe à l'identique
+    assert after[-3:] == before[-3:]
+
+def test_content_defined_chunking_reuses_more_than_the_fixed_splitter():
+    fixed_ratio, content_ratio = run_benchmark(script_count=10, sentence_count=300)
+    assert content_ratio > fixed_ratio
+    assert content_ratio > 0.8
+
+def test_short_scripts_stay_a_single_chunk():
+    text = "Première phrase.\n\nDeuxième paragraphe. " * 50
+    assert split_text_content_defined(text) == [text.strip()]
+
+def test_chunks_keep_line_and_paragraph_breaks():
+    original, _ = build_edit_pair(random.Random(5), 300)
+    text = original.replace(". ", ".\n\n").replace("! ", "!\n")
+    chunks = split_text_content_defined(text)
+    assert len(chunks) > 1
+    # Chaque chunk est une tranche du texte source : les séparateurs sont intacts
+    position = 0
+    for chunk in chunks:
+        position = text.index(chunk, position) + len(chunk)
+        assert not chunk.startswith(("\n", " ")) and not chunk.endswith(("\n", " "))
+    assert "\n\n" in chunks[0]
+    assert "".join(chunks).replace("\n", "").replace(" ", "") == text.replace("\n", "").replace(" ", "")
+
+def test_closing_quotes_stay_with_their_sentence():
+    text = " ".join(f"Il dit « Paix sur toi {i}.» Puis il repart vers la ville {i} !" for i in range(400))
+    chunks = split_text_content_defined(text)
+    assert " ".join(chunks).split() == text.split()
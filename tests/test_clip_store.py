@@ -0,0 +1,97 @@
+import pytest
+
+from video_library.clip_store import (
+    TRIM_MARGIN_SECONDS, get_clip_store_key, get_normalized_clip, get_stored_clip_path, get_trimmed_clip,
+    plan_background_segments
+)
+
+def fake_normalizer(used_encoder, calls):
+    def normalize(source_video, output_video):
+        calls.append(source_video)
+        with open(output_video, "wb") as f:
+            f.write(used_encoder.encode())
+        return used_encoder
+    return normalize
+
+def test_store_key_depends_on_the_encoder(tmp_path):
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"source")
+    keys = {get_clip_store_key(str(clip), encoder) for encoder in ("h264_nvenc", "h264_qsv", "libx264")}
+    assert len(keys) == 3
+
+def test_fallback_clip_is_stored_under_the_cpu_key(tmp_path):
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"source")
+    store = str(tmp_path / "store")
+    calls = []
+
+    path = get_normalized_clip(str(clip), store, fake_normalizer("libx264", calls), encoder="h264_nvenc")
+    assert path == get_stored_clip_path(str(clip), store, "libx264")
+    # La relance ne renormalise pas : le repli CPU est retrouvé
+    assert get_normalized_clip(str(clip), store, fake_normalizer("libx264", calls), encoder="h264_nvenc") == path
+    assert len(calls) == 1
+
+def test_clips_of_another_hardware_encoder_are_not_reused(tmp_path):
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"source")
+    store = str(tmp_path / "store")
+    calls = []
+    nvenc_path = get_normalized_clip(str(clip), store, fake_normalizer("h264_nvenc", calls), encoder="h264_nvenc")
+    qsv_path = get_normalized_clip(str(clip), store, fake_normalizer("h264_qsv", calls), encoder="h264_qsv")
+    assert nvenc_path != qsv_path
+    assert len(calls) == 2
+
+def cycling_choice(order):
+    picks = iter(order)
+    return lambda clips: next(picks)
+
+def test_plan_covers_the_target_with_only_the_last_segment_partial():
+    clips = [{"path": "a.mp4", "duration": 10.0}, {"path": "b.mp4", "duration": 7.0}]
+    segments = plan_background_segments(clips, 30.0, cycling_choice([clips[0], clips[1], clips[0], clips[1]]))
+    assert [path for path, _, _ in segments] == ["a.mp4", "b.mp4", "a.mp4", "b.mp4"]
+    assert all(used == duration for _, duration, used in segments[:-1])
+    # Dernier segment : le reste à couvrir plus TRIM_MARGIN_SECONDS, plus court que le clip
+    assert segments[-1][2] == pytest.approx(30.0 - 27.0 + TRIM_MARGIN_SECONDS)
+    assert segments[-1][2] < segments[-1][1]
+    assert sum(used for _, _, used in segments) == pytest.approx(30.0 + TRIM_MARGIN_SECONDS)
+
+def test_clip_shorter_than_the_remainder_is_used_whole():
+    clips = [{"path": "a.mp4", "duration": 10.0}, {"path": "court.mp4", "duration": 2.0}]
+    segments = plan_background_segments(clips, 13.0, cycling_choice([clips[0], clips[1], clips[0]]))
+    assert segments == [("a.mp4", 10.0, 10.0), ("court.mp4", 2.0, 2.0), ("a.mp4", 10.0, 1.0 + TRIM_MARGIN_SECONDS)]
+
+def test_plan_skips_clips_without_duration():
+    clips = [{"path": "vide.mp4", "duration": 0.0}, {"path": "a.mp4", "duration": 5.0}]
+    segments = plan_background_segments(clips, 4.0, lambda clips: clips[0])
+    assert segments == [("a.mp4", 5.0, 4.0 + TRIM_MARGIN_SECONDS)]
+    with pytest.raises(ValueError):
+        plan_background_segments(clips[:1], 4.0)
+
+def test_trimmed_clip_reuses_the_stored_full_clip(tmp_path):
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"source")
+    store = str(tmp_path / "store")
+    calls = []
+    stored = get_normalized_clip(str(clip), store, fake_normalizer("libx264", calls), encoder="libx264")
+    trimmed = get_trimmed_clip(str(clip), 3.0, str(tmp_path / "trimmed.mp4"), store,
+                               fake_normalizer("libx264", calls), encoder="libx264")
+    assert trimmed == stored
+    assert len(calls) == 1
+
+def test_trimmed_clip_normalizes_only_the_used_seconds(tmp_path):
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"source")
+    output = tmp_path / "trimmed.mp4"
+    durations = []
+
+    def normalize(source_video, output_video, duration=None):
+        durations.append(duration)
+        with open(output_video, "wb") as f:
+            f.write(b"partiel")
+        return "libx264" if duration != 9.0 else None
+
+    assert get_trimmed_clip(str(clip), 3.5, str(output), str(tmp_path / "store"), normalize, "libx264") == str(output)
+    # Échec : le fichier partiel est supprimé
+    assert get_trimmed_clip(str(clip), 9.0, str(output), str(tmp_path / "store"), normalize, "libx264") is None
+    assert durations == [3.5, 9.0]
+    assert not output.exists()
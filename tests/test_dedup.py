@@ -0,0 +1,16 @@
+import io
+import contextlib
+
+from subs_generator.bench_dedup import build_synthetic_transcript, reference_deduplication, run_benchmark
+from subs_generator.srt_generator import advanced_deduplication
+
+def test_fast_deduplication_matches_the_original_implementation():
+    for seed in (1, 2, 3):
+        segments = build_synthetic_transcript(800, seed=seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert advanced_deduplication(segments) == reference_deduplication(segments)
+
+def test_benchmark_checks_parity():
+    # run_benchmark lève AssertionError si les sorties diffèrent
+    reference_time, fast_time = run_benchmark(segment_count=500, rounds=1)
+    assert reference_time > 0 and fast_time > 0
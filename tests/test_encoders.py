@@ -0,0 +1,91 @@
+import os
+import json
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from video_library import encoders
+
+ENCODERS_OUTPUT = """Encoders:
+ V..... = Video
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC (codec h264)
+ V....D h264_nvenc           NVIDIA NVENC H.264 encoder (codec h264)
+ V..... h264_qsv             H.264 / AVC / MPEG-4 AVC (Intel Quick Sync Video acceleration) (codec h264)
+ A....D aac                  AAC (Advanced Audio Coding)
+"""
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    """ffmpeg simulé : encodeurs compilés et encodeurs qui passent l'encodage de test."""
+    state = SimpleNamespace(compiled=ENCODERS_OUTPUT, working={"libx264"}, calls=[],
+                            fingerprint={"host": "machine", "ffmpeg": "/usr/bin/ffmpeg", "ffmpeg_size": 1})
+
+    def run(cmd, **kwargs):
+        state.calls.append(cmd)
+        if "-encoders" in cmd:
+            return SimpleNamespace(stdout=state.compiled)
+        if cmd[cmd.index("-c:v") + 1] not in state.working:
+            raise subprocess.CalledProcessError(1, cmd)
+        return SimpleNamespace(stdout="")
+
+    monkeypatch.setattr(encoders.subprocess, "run", run)
+    monkeypatch.setattr(encoders, "get_host_fingerprint", lambda: dict(state.fingerprint))
+    monkeypatch.setattr(encoders, "HOST_PROFILE_PATH", str(tmp_path / "cache" / "host_profile.json"))
+    monkeypatch.setattr(encoders, "VIDEO_ENCODER", "")
+    monkeypatch.setattr(encoders, "_BEST_ENCODER", None)
+    return state
+
+def encoder_probes(state):
+    return [cmd for cmd in state.calls if "-encoders" in cmd]
+
+def test_hardware_encoders_are_preferred_in_order(fake_ffmpeg):
+    fake_ffmpeg.working = {"h264_nvenc", "h264_qsv", "libx264"}
+    assert encoders.probe_encoders() == {"available": ["h264_nvenc", "h264_qsv", "libx264"], "best": "h264_nvenc"}
+
+def test_failing_encoder_falls_back_to_the_next(fake_ffmpeg):
+    fake_ffmpeg.working = {"h264_qsv", "libx264"}
+    assert encoders.probe_encoders()["best"] == "h264_qsv"
+    fake_ffmpeg.working = {"libx264"}
+    assert encoders.probe_encoders() == {"available": ["libx264"], "best": "libx264"}
+
+def test_cpu_is_the_last_resort(fake_ffmpeg):
+    fake_ffmpeg.compiled = "Encoders:\n A....D aac                  AAC\n"
+    assert encoders.probe_encoders()["best"] == "libx264"
+
+def test_profile_is_detected_once_per_fingerprint(fake_ffmpeg):
+    first = encoders.get_host_profile()
+    assert encoders.get_host_profile() == first
+    assert len(encoder_probes(fake_ffmpeg)) == 1
+
+    # Nouveau binaire ffmpeg : nouvelle détection
+    fake_ffmpeg.fingerprint["ffmpeg_size"] = 2
+    fake_ffmpeg.working = {"h264_nvenc", "libx264"}
+    assert encoders.get_host_profile()["best"] == "h264_nvenc"
+    assert len(encoder_probes(fake_ffmpeg)) == 2
+
+    encoders.get_host_profile(refresh=True)
+    assert len(encoder_probes(fake_ffmpeg)) == 3
+
+def test_corrupt_profile_is_detected_again(fake_ffmpeg):
+    os.makedirs(os.path.dirname(encoders.HOST_PROFILE_PATH))
+    with open(encoders.HOST_PROFILE_PATH, "w", encoding="utf-8") as f:
+        f.write("{pas du json")
+    assert encoders.get_host_profile()["best"] == "libx264"
+    assert len(encoder_probes(fake_ffmpeg)) == 1
+    with open(encoders.HOST_PROFILE_PATH, encoding="utf-8") as f:
+        assert json.load(f)["fingerprint"] == fake_ffmpeg.fingerprint
+
+def test_best_encoder_is_read_once_per_process(fake_ffmpeg):
+    fake_ffmpeg.working = {"h264_qsv", "libx264"}
+    assert encoders.best_h264_encoder() == "h264_qsv"
+    fake_ffmpeg.fingerprint["host"] = "autre"
+    assert encoders.best_h264_encoder() == "h264_qsv"
+    assert len(encoder_probes(fake_ffmpeg)) == 1
+
+def test_video_encoder_overrides_detection(fake_ffmpeg, monkeypatch):
+    monkeypatch.setattr(encoders, "VIDEO_ENCODER", "libx264")
+    fake_ffmpeg.working = {"h264_nvenc", "libx264"}
+    assert encoders.best_h264_encoder() == "libx264"
+    assert fake_ffmpeg.calls == []
@@ -0,0 +1,34 @@
+import video_library.media_index as media_index
+from video_library.media_index import MediaIndex
+
+def test_only_songs_are_hashed_and_measured(tmp_path, monkeypatch):
+    calls = {"hash": 0, "loudness": []}
+
+    def fake_hash(path):
+        calls["hash"] += 1
+        return "empreinte"
+
+    def fake_measure(path, target_i, target_tp, content_hash=None):
+        calls["loudness"].append(content_hash)
+        return {"input_i": "-20.0"}
+
+    monkeypatch.setattr(media_index, "probe_media", lambda path: {
+        "duration": 3.0, "width": None, "height": None, "fps": None, "codec": None, "audio_codec": "aac"
+    })
+    monkeypatch.setattr(media_index, "hash_file", fake_hash)
+    monkeypatch.setattr(media_index, "measure_loudness", fake_measure)
+
+    videos, songs = tmp_path / "videos", tmp_path / "songs"
+    videos.mkdir()
+    songs.mkdir()
+    (videos / "clip.mp4").write_bytes(b"v")
+    (songs / "song.mp3").write_bytes(b"s")
+
+    index = MediaIndex(str(tmp_path / "index.json"))
+    [clip] = index.refresh(str(videos), [".mp4"])
+    assert calls == {"hash": 0, "loudness": []}
+    assert clip["loudness"] is None and "hash" not in clip
+
+    [song] = index.refresh(str(songs), [".mp3"], with_loudness=True)
+    assert calls == {"hash": 1, "loudness": ["empreinte"]}
+    assert song["loudness"] == -20.0
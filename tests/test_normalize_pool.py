@@ -0,0 +1,51 @@
+import time
+import threading
+
+from video_library import clip_store, normalize
+from video_library.normalize import normalize_job_threads, normalize_pool_size
+
+def test_pool_size_is_bounded_by_cores_per_job(monkeypatch):
+    monkeypatch.setattr(normalize, "VIDEO_NORMALIZE_WORKERS", 0)
+    monkeypatch.setattr(normalize, "VIDEO_NORMALIZE_HW_WORKERS", 2)
+    assert normalize_pool_size("libx264", cpu_count=2) == 1
+    assert normalize_pool_size("libx264", cpu_count=8) == 2
+    assert normalize_pool_size("libx264", cpu_count=64) == 4
+    assert normalize_pool_size("h264_nvenc", cpu_count=64) == 2
+
+def test_job_threads_split_the_cores():
+    assert normalize_job_threads(2, cpu_count=8) == 4
+    assert normalize_job_threads(4, cpu_count=2) == 1
+
+def test_pool_normalizes_each_clip_once_within_the_bound(tmp_path, monkeypatch):
+    calls, active, peak = [], [0], [0]
+    lock = threading.Lock()
+
+    def fake_normalize_video(input_video, output_video, threads=0, encoder=None, start=None, duration=None):
+        with lock:
+            calls.append((input_video, threads))
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with open(output_video, "wb") as f:
+            f.write(b"normalized")
+        with lock:
+            active[0] -= 1
+        return encoder
+
+    monkeypatch.setattr(clip_store, "normalize_video", fake_normalize_video)
+    monkeypatch.setattr(clip_store, "best_h264_encoder", lambda: "libx264")
+    clips = []
+    for i in range(6):
+        clip = tmp_path / f"clip{i}.mp4"
+        clip.write_bytes(f"source {i}".encode())
+        clips.append(str(clip))
+    selection = clips + clips[:3]
+
+    paths = clip_store.get_normalized_clips(selection, str(tmp_path / "store"), workers=2)
+
+    assert len(calls) == 6
+    assert peak[0] == 2
+    assert all(threads == normalize_job_threads(2) for _, threads in calls)
+    # Résultats dans l'ordre de la sélection, un même clip partagé entre ses tirages
+    assert paths[6:] == paths[:3]
+    assert paths[:6] == [clip_store.get_stored_clip_path(clip, str(tmp_path / "store"), "libx264") for clip in clips]
@@ -0,0 +1,39 @@
+import io
+import subprocess
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from audio_generator.numpy_engine import pause_schedule, render_voice_mix, voice_timeline
+
+def fake_decoder(samples):
+    return SimpleNamespace(stdout=io.BytesIO(np.ascontiguousarray(samples, dtype=np.float32).tobytes()))
+
+def test_voice_timeline_inserts_delay_and_pauses_across_blocks():
+    voice = np.arange(1, 11, dtype=np.float32)[:, None].repeat(2, axis=1)
+    pauses = [(0, 2), (4, 3), (100, 1)]
+    blocks = list(voice_timeline(fake_decoder(voice), 1, pauses, gain=2.0, block_frames=3))
+    timeline = np.concatenate(blocks)[:, 0]
+    expected = [0, 0, 0, 2, 4, 6, 8, 0, 0, 0, 10, 12, 14, 16, 18, 20, 0]
+    assert timeline.tolist() == expected
+    assert all(len(block) <= 3 for block in blocks)
+
+def test_pause_schedule_merges_pauses_at_the_same_point():
+    assert pause_schedule([1000, 500, 1000], pause_duration=1.0, sample_rate=10) == [(5, 10), (10, 20)]
+
+@pytest.mark.requires_ffmpeg
+def test_numpy_mix_matches_ffmpeg_chain():
+    from audio_generator.bench_numpy_mix import run_parity
+    result = run_parity(seconds=8, pause_count=2)
+    assert result["max_diff"] < 1e-4
+
+@pytest.mark.requires_ffmpeg
+def test_unreadable_background_music_is_an_error(tmp_path):
+    voice = tmp_path / "voice.wav"
+    subprocess.run(["ffmpeg", "-y", "-v", "error", "-f", "lavfi", "-i", "sine=frequency=220:duration=1",
+                    str(voice)], check=True)
+    bg_music = tmp_path / "bg.mp3"
+    bg_music.write_bytes(b"pas un mp3")
+    with pytest.raises((subprocess.CalledProcessError, RuntimeError)):
+        render_voice_mix(str(voice), str(bg_music), str(tmp_path / "mix.m4a"))
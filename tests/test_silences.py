@@ -0,0 +1,10 @@
+import pytest
+
+from audio_generator.bench_silences import run_parity
+
+@pytest.mark.requires_ffmpeg
+def test_single_pass_matches_per_segment_insertion():
+    # run_parity lève AssertionError si les sorties diffèrent
+    result = run_parity(seconds=20, pause_count=3)
+    assert result["max_diff"] == 0.0
+    assert result["frames"] == pytest.approx((20 + 3 * 3.0) * 44100, abs=2)
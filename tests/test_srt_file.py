@@ -0,0 +1,53 @@
+import io
+
+from subs_generator.bench_srt import run_benchmark
+from subs_generator.srt_file import iter_srt_cues, read_srt, shift_srt_file
+
+SRT = (
+    "1\n00:00:01,000 --> 00:00:02,500\nPremière ligne\nDeuxième ligne\n\n"
+    "2\n00:00:03,000 --> 00:00:04,000\nSeule ligne\n\n"
+    "3\n00:01:05,250 --> 00:01:07,000\nA\nB\nC\n"
+)
+
+def cues_of(text, chunk_size=1 << 20):
+    return [cue.to_dict() for cue in iter_srt_cues(io.StringIO(text), chunk_size)]
+
+def test_multiline_cues_keep_their_line_breaks():
+    cues = cues_of(SRT)
+    assert [cue["index"] for cue in cues] == [1, 2, 3]
+    assert cues[0] == {"index": 1, "start_time": 1000, "end_time": 2500, "text": "Première ligne\nDeuxième ligne"}
+    assert cues[2]["text"] == "A\nB\nC"
+    assert cues[2]["start_time"] == 65250
+
+def test_missing_final_blank_line_keeps_the_last_cue():
+    assert cues_of(SRT.rstrip("\n"))[-1]["text"] == "A\nB\nC"
+
+def test_crlf_and_bom_parse_like_lf():
+    crlf = SRT.replace("\n", "\r\n")
+    assert cues_of(crlf) == cues_of(SRT)
+    # "\r" et "\n" d'une même fin de ligne séparés entre deux morceaux
+    for chunk_size in (7, 13, 64):
+        assert cues_of(crlf, chunk_size) == cues_of(SRT)
+
+def test_read_srt_skips_the_bom(tmp_path):
+    path = tmp_path / "bom.srt"
+    path.write_bytes(("\ufeff" + SRT.replace("\n", "\r\n")).encode("utf-8"))
+    assert [cue.to_dict() for cue in read_srt(path)] == cues_of(SRT)
+
+def test_malformed_blocks_are_skipped():
+    text = "x\n00:00:01,000 --> 00:00:02,000\nTexte\n\n" + SRT
+    assert [cue["index"] for cue in cues_of(text)] == [1, 2, 3]
+
+def test_shift_srt_file(tmp_path):
+    source, shifted = tmp_path / "in.srt", tmp_path / "out.srt"
+    source.write_text(SRT, encoding="utf-8")
+    assert shift_srt_file(source, shifted, 2000) == 3
+    cues = [cue.to_dict() for cue in read_srt(shifted)]
+    assert [(cue["start_time"], cue["end_time"]) for cue in cues] == [(3000, 4500), (5000, 6000), (67250, 69000)]
+    assert [cue["text"] for cue in cues] == [cue["text"] for cue in cues_of(SRT)]
+    assert shifted.read_text(encoding="utf-8").startswith("1\n00:00:03,000 --> 00:00:04,500\nPremière ligne\n")
+
+def test_parser_matches_the_original_regex():
+    # run_benchmark lève AssertionError si les parseurs diffèrent
+    results = run_benchmark(cue_count=500, rounds=1)
+    assert set(results) == {1, 3}
@@ -0,0 +1,93 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from subs_generator import srt_generator
+
+def fake_part_result(label):
+    return {
+        "text": f" {label}",
+        "language": "fr",
+        "segments": [
+            {"id": 0, "start": 0.5, "end": 1.5, "text": f" {label} a",
+             "words": [{"word": " a", "start": 0.5, "end": 1.0}]},
+            {"id": 1, "start": 2.0, "end": 2.8, "text": f" {label} b", "words": []},
+        ],
+    }
+
+def test_parts_are_stitched_at_their_offsets(monkeypatch):
+    durations = {"p1.mp3": 3.0, "p2.mp3": 4.5, "p3.mp3": 2.0}
+    monkeypatch.setattr(srt_generator, "get_audio_duration", lambda path: durations[path])
+    monkeypatch.setattr(srt_generator, "transcribe_audio", lambda path, model_name=None: (fake_part_result(path), None))
+
+    result = srt_generator.transcribe_audio_parts(list(durations), gap_seconds=0.25, max_workers=1)
+
+    starts = [segment["start"] for segment in result["segments"]]
+    # Offsets : 0, 3.0 + 0.25, 3.0 + 0.25 + 4.5 + 0.25
+    assert starts == [0.5, 2.0, 3.75, 5.25, 8.5, 10.0]
+    assert result["segments"][2]["words"][0]["start"] == 3.75
+    assert result["segments"][4]["words"][0]["end"] == 9.0
+    assert [segment["id"] for segment in result["segments"]] == list(range(6))
+    assert result["text"] == " p1.mp3 p2.mp3 p3.mp3"
+    assert result["language"] == "fr"
+
+class FakeBackend:
+    name = "whisper"
+    device = "cpu"
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio_path, **params):
+        self.calls.append(params)
+        return {"text": " Bonjour", "segments": [{"start": 0.0, "end": 1.0, "text": " Bonjour"}]}
+
+@pytest.fixture
+def cached_transcription(tmp_path, monkeypatch):
+    """transcribe_audio sur un backend simulé, avec un cache dans tmp_path."""
+    backend = FakeBackend()
+    params = {"language": "fr", "temperature": 0.0}
+    monkeypatch.setattr(srt_generator, "TRANSCRIPTION_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(srt_generator, "_resolve_whisper_device", lambda: "cpu")
+    monkeypatch.setattr(srt_generator, "get_rtx4000_transcribe_params", lambda device: dict(params))
+    monkeypatch.setattr(srt_generator, "get_transcription_backend", lambda model_name, backend_name: backend)
+    audio = tmp_path / "voix.mp3"
+    audio.write_bytes(b"audio")
+
+    def transcribe(model_name="medium"):
+        return srt_generator.transcribe_audio(str(audio), model_name, "whisper", use_cache=True, use_vad=False)[0]
+    return SimpleNamespace(backend=backend, params=params, audio=audio, transcribe=transcribe)
+
+def test_transcription_cache_hits_for_the_same_audio_model_and_params(cached_transcription):
+    first = cached_transcription.transcribe()
+    assert cached_transcription.transcribe() == first
+    assert len(cached_transcription.backend.calls) == 1
+
+def test_transcription_cache_misses_when_model_params_or_audio_change(cached_transcription):
+    cached_transcription.transcribe()
+    cached_transcription.transcribe(model_name="large-v3")
+    assert len(cached_transcription.backend.calls) == 2
+
+    cached_transcription.params["temperature"] = 0.2
+    cached_transcription.transcribe()
+    assert len(cached_transcription.backend.calls) == 3
+
+    cached_transcription.audio.write_bytes(b"autre audio")
+    cached_transcription.transcribe()
+    assert len(cached_transcription.backend.calls) == 4
+
+def test_eviction_keeps_the_cache_under_its_limit(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    result = {"text": "x" * 300_000}
+    for i in range(4):
+        path = srt_generator.store_cached_transcription(f"cle{i}", result, cache_dir, max_size_mb=100)
+        os.utime(path, (1000 + i, 1000 + i))
+    # La lecture marque l'entrée la plus ancienne comme récemment utilisée
+    assert srt_generator.load_cached_transcription("cle0", cache_dir) == result
+
+    srt_generator.evict_transcription_cache(cache_dir, max_size_mb=0.7)
+
+    remaining = sorted(os.listdir(cache_dir))
+    assert sum(os.path.getsize(os.path.join(cache_dir, name)) for name in remaining) <= 0.7 * 1024 * 1024
+    assert remaining == ["cle0.json", "cle3.json"]
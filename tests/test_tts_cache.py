@@ -0,0 +1,69 @@
+import os
+import shutil
+
+from audio_generator import tts_cache
+from audio_generator.tts_engine import DEFAULT_VOICE_SETTINGS, synthesize_chunks
+from audio_generator.tts_scheduler import TtsRequestScheduler
+
+def copy_normalize(input_file, output_file):
+    shutil.copyfile(input_file, output_file)
+
+def synthesize(stub_server, output_dir, chunks, voice_settings=None):
+    os.makedirs(output_dir, exist_ok=True)
+    return synthesize_chunks(chunks, stub_server.url, "cle", str(output_dir), copy_normalize,
+                             voice_id="voix", voice_settings=voice_settings, use_cache=True,
+                             streaming=False, scheduler=TtsRequestScheduler(max_retries=0, rate=0))
+
+def test_cache_key_covers_text_voice_model_and_voice_settings():
+    settings = {"speed": 1.0, "stability": 0.5, "similarity_boost": 0.75}
+    key = tts_cache.get_tts_cache_key("Bonjour.", "voix", "modele", settings)
+    # L'ordre des réglages ne change pas la clé
+    assert tts_cache.get_tts_cache_key("Bonjour.", "voix", "modele", dict(reversed(settings.items()))) == key
+    variants = [
+        ("Bonsoir.", "voix", "modele", settings),
+        ("Bonjour.", "autre", "modele", settings),
+        ("Bonjour.", "voix", "autre", settings),
+        ("Bonjour.", "voix", "modele", {**settings, "stability": 0.6}),
+        ("Bonjour.", "voix", "modele", {**settings, "speed": 1.1}),
+    ]
+    assert len({tts_cache.get_tts_cache_key(*variant) for variant in variants} | {key}) == len(variants) + 1
+
+def test_unchanged_chunks_are_read_from_the_cache(stub_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_cache, "TTS_CACHE_DIR", str(tmp_path / "cache"))
+    stub_server.respond(200, b"ID3 audio", {"Content-Type": "audio/mpeg"})
+
+    synthesize(stub_server, tmp_path / "run1", ["un", "deux"])
+    assert len(stub_server.requests) == 2
+
+    # Relance avec un chunk modifié : seul celui-ci repasse par l'API
+    files = synthesize(stub_server, tmp_path / "run2", ["un", "deux modifié"])
+    assert len(stub_server.requests) == 3
+    assert [open(f, "rb").read() for f in files] == [b"ID3 audio", b"ID3 audio"]
+
+def test_voice_settings_change_misses_the_cache(stub_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_cache, "TTS_CACHE_DIR", str(tmp_path / "cache"))
+    stub_server.respond(200, b"ID3 audio", {"Content-Type": "audio/mpeg"})
+    synthesize(stub_server, tmp_path, ["un"])
+    synthesize(stub_server, tmp_path, ["un"], {**DEFAULT_VOICE_SETTINGS, "stability": 0.9})
+    synthesize(stub_server, tmp_path, ["un"], dict(DEFAULT_VOICE_SETTINGS))
+    assert len(stub_server.requests) == 2
+
+def test_missing_entry_is_a_miss(tmp_path):
+    assert not tts_cache.load_cached_tts_audio("absente", str(tmp_path / "out.mp3"), str(tmp_path))
+    assert not (tmp_path / "out.mp3").exists()
+
+def test_eviction_keeps_the_tts_cache_under_its_limit(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    audio = tmp_path / "audio.mp3"
+    audio.write_bytes(b"\0" * 300_000)
+    for i in range(4):
+        path = tts_cache.store_cached_tts_audio(f"cle{i}", str(audio), cache_dir, max_size_mb=100)
+        os.utime(path, (1000 + i, 1000 + i))
+    # La lecture marque l'entrée la plus ancienne comme récemment utilisée
+    assert tts_cache.load_cached_tts_audio("cle0", str(tmp_path / "copie.mp3"), cache_dir)
+
+    tts_cache.evict_tts_cache(cache_dir, max_size_mb=0.7)
+
+    remaining = sorted(os.listdir(cache_dir))
+    assert sum(os.path.getsize(os.path.join(cache_dir, name)) for name in remaining) <= 0.7 * 1024 * 1024
+    assert remaining == ["cle0.mp3", "cle3.mp3"]
@@ -0,0 +1,57 @@
+import os
+import json
+import shutil
+
+import pytest
+
+from audio_generator.tts_engine import create_tts_session, stream_chunk_normalized, synthesize_chunks
+from audio_generator.tts_scheduler import TtsRequestError, TtsRequestScheduler
+
+def copy_normalize(input_file, output_file):
+    shutil.copyfile(input_file, output_file)
+
+def test_synthesize_chunks_keeps_chunk_order(stub_server, tmp_path):
+    stub_server.respond(200, b"ID3 audio", {"Content-Type": "audio/mpeg"})
+    files = synthesize_chunks(["un", "deux", "trois"], stub_server.url, "cle", str(tmp_path),
+                              copy_normalize, voice_id="voix", use_cache=False, streaming=False,
+                              scheduler=TtsRequestScheduler(max_retries=0, rate=0))
+    assert [os.path.basename(f) for f in files] == [f"audio_part_{i}_norm.mp3" for i in (1, 2, 3)]
+    assert sorted(json.loads(body)["text"] for _, _, body in stub_server.requests) == ["deux", "trois", "un"]
+
+@pytest.mark.requires_ffmpeg
+def test_stream_chunk_normalized_writes_both_files(stub_server, tmp_path, mp3_bytes):
+    stub_server.respond(200, mp3_bytes, {"Content-Type": "audio/mpeg"})
+    session = create_tts_session("cle")
+    raw, normalized = tmp_path / "raw.mp3", tmp_path / "norm.mp3"
+    stream_chunk_normalized(session, stub_server.url, {"text": "x"}, str(raw), str(normalized))
+    assert stub_server.requests[0][1] == "/stream"
+    assert raw.read_bytes() == mp3_bytes
+    assert normalized.stat().st_size > 0
+
+@pytest.mark.requires_ffmpeg
+def test_stream_chunk_normalized_reports_ffmpeg_failure(stub_server, tmp_path, mp3_bytes):
+    # FFmpeg quitte après la sonde (filtre invalide) alors que le flux continue : tube cassé
+    stub_server.respond(200, mp3_bytes * 200, {"Content-Type": "audio/mpeg"})
+    session = create_tts_session("cle")
+    with pytest.raises(TtsRequestError) as excinfo:
+        stream_chunk_normalized(session, stub_server.url, {"text": "x"}, str(tmp_path / "raw.mp3"),
+                                str(tmp_path / "norm.mp3"), loudnorm_filter="filtre_inexistant")
+    assert "FFmpeg loudnorm" in str(excinfo.value)
+    assert "filtre_inexistant" in str(excinfo.value)
+    assert not excinfo.value.retryable
+
+def test_custom_normalize_func_is_applied_in_streaming_mode(stub_server, tmp_path):
+    stub_server.respond(200, b"ID3 audio", {"Content-Type": "audio/mpeg"})
+    normalized = []
+
+    def custom_normalize(input_file, output_file):
+        normalized.append(input_file)
+        copy_normalize(input_file, output_file)
+
+    files = synthesize_chunks(["un", "deux"], stub_server.url, "cle", str(tmp_path),
+                              custom_normalize, use_cache=False, streaming=True,
+                              scheduler=TtsRequestScheduler(max_retries=0, rate=0))
+    # Endpoint de streaming, mais la normalisation de l'appelant n'est pas remplacée par le loudnorm
+    assert {path for _, path, _ in stub_server.requests} == {"/stream"}
+    assert sorted(os.path.basename(path) for path in normalized) == ["audio_part_1.mp3", "audio_part_2.mp3"]
+    assert [open(f, "rb").read() for f in files] == [b"ID3 audio", b"ID3 audio"]
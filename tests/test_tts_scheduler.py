@@ -0,0 +1,48 @@
+import os
+import json
+import time
+
+import audio_generator.tts_cache as tts_cache
+from audio_generator.tts_engine import synthesize_chunks
+from audio_generator.tts_scheduler import FAILURE_JOURNAL_NAME, TtsRequestScheduler, retry_failed_chunks
+
+def run(stub_server, output_dir, scheduler, **kwargs):
+    return synthesize_chunks(["bonjour"], stub_server.url, "cle", str(output_dir), voice_id="voix",
+                             use_cache=False, streaming=False, normalize=False,
+                             scheduler=scheduler, **kwargs)
+
+def test_429_retry_after_is_honoured(stub_server, tmp_path):
+    stub_server.respond(429, b'{"detail": "too_many_requests"}', {"Retry-After": "1"})
+    stub_server.respond(200, b"ID3 audio")
+    start = time.monotonic()
+    files = run(stub_server, tmp_path, TtsRequestScheduler(max_retries=2, backoff_base=0, rate=0))
+    assert time.monotonic() - start >= 0.9
+    assert len(stub_server.requests) == 2
+    assert [os.path.basename(f) for f in files] == ["audio_part_1.mp3"]
+    assert not (tmp_path / FAILURE_JOURNAL_NAME).exists()
+
+def test_persistent_5xx_is_journaled_then_retried_into_the_cache(stub_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_cache, "TTS_CACHE_DIR", str(tmp_path / "cache"))
+    stub_server.respond(503, b'{"detail": "unavailable"}')
+    scheduler = TtsRequestScheduler(max_retries=2, backoff_base=0.01, rate=0)
+    assert run(stub_server, tmp_path, scheduler, normalized_ext=".wav") == []
+    assert len(stub_server.requests) == 3
+
+    journal = json.loads((tmp_path / FAILURE_JOURNAL_NAME).read_text(encoding="utf-8"))
+    assert journal["failures"]["1"]["text"] == "bonjour"
+    assert journal["failures"]["1"]["status_code"] == 503
+    assert journal["failures"]["1"]["attempts"] == 3
+    assert journal["request"] == {
+        "api_url": stub_server.url, "voice_id": "voix", "model_id": "eleven_multilingual_v1",
+        "voice_settings": {"speed": 1.0, "stability": 0.5, "similarity_boost": 0.75},
+        "normalized_ext": ".wav", "normalize": False, "streaming": False
+    }
+
+    # Le service est revenu : la relance remplit le cache que relira le pipeline
+    stub_server.responses[:] = [(200, {}, b"ID3 audio")]
+    assert retry_failed_chunks(str(tmp_path), api_key="cle") == []
+    assert not (tmp_path / FAILURE_JOURNAL_NAME).exists()
+    assert (tmp_path / "audio_part_1.mp3").read_bytes() == b"ID3 audio"
+    key = tts_cache.get_tts_cache_key("bonjour", "voix", journal["request"]["model_id"],
+                                      journal["request"]["voice_settings"])
+    assert (tmp_path / "cache" / f"{key}.mp3").read_bytes() == b"ID3 audio"
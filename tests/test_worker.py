@@ -0,0 +1,49 @@
+import json
+import threading
+import urllib.error
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from subs_generator import srt_generator
+from subs_generator.worker import TranscriptionJobHandler, generate_srt_via_worker
+
+def test_worker_returns_srt_path(stub_server, tmp_path):
+    stub_server.respond(200, json.dumps({"srt_path": "/tmp/out.srt"}).encode())
+    assert generate_srt_via_worker(tmp_path / "a.mp3", tmp_path / "a.srt", stub_server.url) == "/tmp/out.srt"
+    job = json.loads(stub_server.requests[0][2])
+    assert job["input_audio_path"] == str(tmp_path / "a.mp3")
+
+def test_worker_5xx_is_an_oserror_for_fallback(stub_server, tmp_path):
+    stub_server.respond(500, json.dumps({"error": "CUDA out of memory"}).encode())
+    with pytest.raises(OSError) as excinfo:
+        generate_srt_via_worker(tmp_path / "a.mp3", tmp_path / "a.srt", stub_server.url)
+    assert isinstance(excinfo.value, urllib.error.HTTPError)
+    assert "CUDA out of memory" in str(excinfo.value)
+
+def test_worker_5xx_without_json_body(stub_server, tmp_path):
+    stub_server.respond(502, b"<html>Bad Gateway</html>")
+    with pytest.raises(OSError):
+        generate_srt_via_worker(tmp_path / "a.mp3", tmp_path / "a.srt", stub_server.url)
+
+def test_worker_rejected_job_is_not_retried(stub_server, tmp_path):
+    stub_server.respond(400, json.dumps({"error": "Job invalide"}).encode())
+    with pytest.raises(RuntimeError, match="Job invalide"):
+        generate_srt_via_worker(tmp_path / "a.mp3", tmp_path / "a.srt", stub_server.url)
+
+def test_jobs_without_model_use_the_preloaded_model(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(srt_generator, "generate_srt",
+                        lambda audio, srt, **job: calls.append(job) or srt)
+    monkeypatch.setattr(TranscriptionJobHandler, "default_model", "large-v3")
+    monkeypatch.setattr(TranscriptionJobHandler, "log_message", lambda self, format, *args: None)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TranscriptionJobHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        generate_srt_via_worker(tmp_path / "a.mp3", tmp_path / "a.srt", url)
+        generate_srt_via_worker(tmp_path / "a.mp3", tmp_path / "a.srt", url, model_name="small")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert [job["model_name"] for job in calls] == ["large-v3", "small"]
@@ -6,6 +6,12 @@ import sys
 import random
 import subprocess
 import shutil
+from audio_generator.audio_chain import intermediate_ext, background_loudnorm_prefix, insert_silences_single_pass
+from audio_generator.numpy_engine import AUDIO_ENGINE, render_voice_mix
+from video_library.clip_store import CLIP_STORE_ENABLED, get_normalized_clips, plan_background_segments
+from video_library.encoders import final_video_codec_args
+from video_library.media_index import list_background_songs, list_background_videos
+from subs_generator.srt_file import parse_srt_file, ms_to_timecode, read_srt, write_srt_cues, shift_srt_file
 
 # Fix pour l'encodage Windows
 if sys.platform == "win32":
@@ -20,6 +26,10 @@ OUTPUT_DIR = "Project_" + datetime.now().strftime("%d%m%Y_%H%M%S")
 if not os.path.exists(OUTPUT_DIR):
     os.makedirs(OUTPUT_DIR)
 
+# Extension des audios intermédiaires (AUDIO_INTERMEDIATE_FORMAT=wav : WAV flottant sans perte,
+# un seul encodage AAC au mixage final)
+AUDIO_EXT = intermediate_ext()
+
 ##############################
 # FONCTIONS UTILITAIRES
 ##############################
@@ -43,107 +53,19 @@ def select_random_background_music():
     if not os.path.exists(background_songs_dir):
         raise FileNotFoundError(f"Le dossier background_songs n'existe pas : {background_songs_dir}")
     
-    # Lister tous les fichiers audio (mp3, wav, m4a, etc.)
-    audio_extensions = ['.mp3', '.wav', '.m4a', '.aac', '.ogg']
-    audio_files = []
-    
-    for file in os.listdir(background_songs_dir):
-        if any(file.lower().endswith(ext) for ext in audio_extensions):
-            audio_files.append(file)
+    # Musiques audio (mp3, wav, m4a, etc.) depuis l'index des médias
+    audio_files = list_background_songs(background_songs_dir)
     
     if not audio_files:
         raise FileNotFoundError(f"Aucun fichier audio trouvé dans {background_songs_dir}")
     
     # Sélection aléatoire
-    selected_file = random.choice(audio_files)
-    selected_path = os.path.join(background_songs_dir, selected_file)
+    selected_path = random.choice(audio_files)["path"]
+    selected_file = os.path.basename(selected_path)
     
     print(f"🎵 Musique de fond sélectionnée aléatoirement : {selected_file}")
     return selected_path
 
-def normalize_video(input_video, output_video):
-    """
-    Normalise une vidéo à 1920x1080, 30fps, H264.
-    Utilise NVENC si disponible, sinon QSV, sinon CPU.
-    """
-    print(f"  🔄 Normalisation: {os.path.basename(input_video)}")
-    
-    # Commande NVENC (GPU NVIDIA)
-    cmd_nvenc = [
-        "ffmpeg", "-y",
-        "-i", input_video,
-        "-c:v", "h264_nvenc",
-        "-preset", "fast",
-        "-profile:v", "high",
-        "-cq", "23",
-        "-rc:v", "vbr",
-        "-maxrate", "8M",
-        "-bufsize", "16M",
-        "-vf", "scale=1920:1080:force_original_aspect_ratio=decrease,pad=1920:1080:(ow-iw)/2:(oh-ih)/2",
-        "-pix_fmt", "yuv420p",
-        "-r", "30",
-        "-an",
-        "-movflags", "+faststart",
-        output_video
-    ]
-    
-    # Fallback Intel QSV
-    cmd_qsv = [
-        "ffmpeg", "-y",
-        "-hwaccel", "qsv",
-        "-i", input_video,
-        "-c:v", "h264_qsv",
-        "-preset", "faster",
-        "-global_quality", "20",
-        "-look_ahead", "1",
-        "-vf", "scale_qsv=1920:1080:force_original_aspect_ratio=decrease",
-        "-pix_fmt", "nv12",
-        "-r", "30",
-        "-an",
-        "-movflags", "+faststart",
-        output_video
-    ]
-    
-    # Fallback CPU
-    cmd_cpu = [
-        "ffmpeg", "-y",
-        "-i", input_video,
-        "-c:v", "libx264",
-        "-preset", "faster",
-        "-crf", "20",
-        "-threads", "0",
-        "-vf", "scale=1920:1080:force_original_aspect_ratio=decrease,pad=1920:1080:(ow-iw)/2:(oh-ih)/2",
-        "-pix_fmt", "yuv420p",
-        "-r", "30",
-        "-an",
-        output_video
-    ]
-    
-    # Essayer NVENC en premier
-    try:
-        subprocess.run(cmd_nvenc, check=True, capture_output=True)
-        print(f"    ✅ Normalisé avec NVENC")
-        return True
-    except:
-        pass
-    
-    # Essayer QSV
-    try:
-        subprocess.run(cmd_qsv, check=True, capture_output=True)
-        print(f"    ✅ Normalisé avec QSV")
-        return True
-    except:
-        pass
-    
-    # Fallback CPU
-    try:
-        subprocess.run(cmd_cpu, check=True, capture_output=True)
-        print(f"    ✅ Normalisé avec CPU")
-        return True
-    except Exception as e:
-        print(f"    ❌ Erreur de normalisation: {e}")
-        return False
-
 def generate_background_video_from_local(target_duration, output_video):
     """
     Génère une vidéo de fond en utilisant des vidéos locales du dossier videos_db.
@@ -157,43 +79,39 @@ def generate_background_video_from_local(target_duration, output_video):
     if not os.path.exists(videos_dir):
         raise FileNotFoundError(f"Le dossier videos_db n'existe pas : {videos_dir}")
     
-    # Lister tous les fichiers vidéo
-    video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
-    video_files = []
-    
-    for file in os.listdir(videos_dir):
-        if any(file.lower().endswith(ext) for ext in video_extensions):
-            video_files.append(os.path.join(videos_dir, file))
+    # Vidéos et durées depuis l'index des médias (ffprobe seulement pour les fichiers nouveaux ou modifiés)
+    video_files = list_background_videos(videos_dir)
     
     if not video_files:
         raise FileNotFoundError(f"Aucun fichier vidéo trouvé dans {videos_dir}")
     
     print(f"📹 {len(video_files)} vidéos disponibles")
     
-    # Sélectionner aléatoirement des vidéos
+    # Sélectionner aléatoirement des vidéos (dernier clip limité aux secondes utilisées)
     selected_videos = []
+    used_durations = []
     total_duration = 0
     
-    while total_duration < extended_duration:
-        video = random.choice(video_files)
-        video_duration = get_audio_duration(video)
+    for video, video_duration, used_seconds in plan_background_segments(video_files, extended_duration):
         selected_videos.append(video)
-        total_duration += video_duration
-        print(f"  ✓ {os.path.basename(video)} ({video_duration:.1f}s) - Total: {total_duration:.1f}s")
+        used_durations.append(used_seconds if used_seconds < video_duration else None)
+        total_duration += used_seconds
+        print(f"  ✓ {os.path.basename(video)} ({used_seconds:.1f}s/{video_duration:.1f}s) - Total: {total_duration:.1f}s")
     
     print(f"📊 {len(selected_videos)} vidéo(s) sélectionnée(s)")
     
-    # Créer dossier temporaire
+    # Créer dossier temporaire (clips normalisés seulement si CLIP_STORE=0)
     temp_dir = os.path.join(OUTPUT_DIR, "temp_normalized")
     if not os.path.exists(temp_dir):
         os.makedirs(temp_dir)
     
-    # Normaliser chaque vidéo
+    # Normaliser chaque vidéo (store persistant : une seule fois par clip)
     print(f"🔧 Normalisation à 1920x1080@30fps...")
+    store_dir = None if CLIP_STORE_ENABLED else temp_dir
     normalized_videos = []
-    for i, video in enumerate(selected_videos):
-        normalized_path = os.path.join(temp_dir, f"normalized_{i}.mp4")
-        if normalize_video(video, normalized_path):
+    normalized_paths = get_normalized_clips(selected_videos, store_dir, durations=used_durations, trim_dir=temp_dir)
+    for video, normalized_path in zip(selected_videos, normalized_paths):
+        if normalized_path:
             normalized_videos.append(normalized_path)
     
     if not normalized_videos:
@@ -234,10 +152,18 @@ def generate_background_video_from_local(target_duration, output_video):
     
     return output_video
 
-def mix_audio_with_background_delayed(voice_audio, bg_music, output, voice_delay_seconds=2):
+def mix_audio_with_background_delayed(voice_audio, bg_music, output, voice_delay_seconds=2, pause_points=None):
     """
-    Mixe l'audio principal avec la musique d'ambiance.
+    Mixe l'audio principal avec la musique d'ambiance (mixage stéréo).
+    Avec AUDIO_ENGINE=numpy, les pauses (pause_points, en ms) sont insérées en
+    mémoire dans la même passe que le mixage.
     """
+    if AUDIO_ENGINE == "numpy":
+        total_duration = render_voice_mix(voice_audio, bg_music, output, voice_delay_seconds,
+                                          pause_points_ms=pause_points)
+        print(f"✅ Audio mixé en mémoire : {output} (durée: {total_duration:.1f}s)")
+        return
+    
     voice_duration = get_audio_duration(voice_audio)
     total_duration = voice_duration + 4
     
@@ -245,7 +171,7 @@ def mix_audio_with_background_delayed(voice_audio, bg_music, output, voice_delay
         "ffmpeg", "-y",
         "-i", voice_audio,
         "-stream_loop", "-1", "-i", bg_music,
-        "-filter_complex", f"[0:a]adelay={voice_delay_seconds * 1000}|{voice_delay_seconds * 1000}[a0];[1:a]volume=0.2[a1];[a0][a1]amix=inputs=2:duration=longest:dropout_transition=3",
+        "-filter_complex", f"[0:a]aformat=channel_layouts=stereo,adelay={voice_delay_seconds * 1000}|{voice_delay_seconds * 1000}[a0];[1:a]{background_loudnorm_prefix(bg_music)}volume=0.2[a1];[a0][a1]amix=inputs=2:duration=longest:dropout_transition=3",
         "-t", str(total_duration),
         "-c:a", "aac",
         "-b:a", "192k",
@@ -258,46 +184,7 @@ def shift_srt_timing(input_srt, output_srt, delay_seconds=2):
     """
     Décale tous les timecodes du fichier SRT de delay_seconds secondes.
     """
-    with open(input_srt, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Pattern pour matcher les timecodes SRT (HH:MM:SS,mmm --> HH:MM:SS,mmm)
-    import re
-    timecode_pattern = r'(\d{2}):(\d{2}):(\d{2}),(\d{3}) --> (\d{2}):(\d{2}):(\d{2}),(\d{3})'
-    
-    def shift_timecode(match):
-        # Extraire les composants du timecode de début
-        start_h, start_m, start_s, start_ms = map(int, match.groups()[:4])
-        # Extraire les composants du timecode de fin
-        end_h, end_m, end_s, end_ms = map(int, match.groups()[4:])
-        
-        # Convertir en millisecondes totales
-        start_total_ms = (start_h * 3600 + start_m * 60 + start_s) * 1000 + start_ms
-        end_total_ms = (end_h * 3600 + end_m * 60 + end_s) * 1000 + end_ms
-        
-        # Ajouter le délai
-        delay_ms = delay_seconds * 1000
-        start_total_ms += delay_ms
-        end_total_ms += delay_ms
-        
-        # Reconvertir en format HH:MM:SS,mmm
-        def ms_to_timecode(total_ms):
-            hours = total_ms // (3600 * 1000)
-            minutes = (total_ms % (3600 * 1000)) // (60 * 1000)
-            seconds = (total_ms % (60 * 1000)) // 1000
-            milliseconds = total_ms % 1000
-            return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
-        
-        start_tc = ms_to_timecode(start_total_ms)
-        end_tc = ms_to_timecode(end_total_ms)
-        
-        return f"{start_tc} --> {end_tc}"
-    
-    # Remplacer tous les timecodes
-    shifted_content = re.sub(timecode_pattern, shift_timecode, content)
-    
-    with open(output_srt, 'w', encoding='utf-8') as f:
-        f.write(shifted_content)
+    shift_srt_file(input_srt, output_srt, delay_seconds * 1000)
     
     print(f"✅ Fichier SRT décalé de +{delay_seconds}s sauvegardé dans {output_srt}")
 
@@ -305,36 +192,6 @@ def shift_srt_timing(input_srt, output_srt, delay_seconds=2):
 # FONCTIONS INTELLIGENTES - DÉTECTION DES TRANSITIONS
 ##############################
 
-def parse_srt_file(srt_path):
-    """
-    Parse un fichier SRT et retourne une liste de sous-titres avec leurs informations.
-    """
-    with open(srt_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Pattern pour matcher un bloc de sous-titre complet
-    subtitle_pattern = r'(\d+)\n(\d{2}):(\d{2}):(\d{2}),(\d{3}) --> (\d{2}):(\d{2}):(\d{2}),(\d{3})\n((?:.*\n?)+?)(?=\n\d+\n|\Z)'
-    
-    subtitles = []
-    for match in re.finditer(subtitle_pattern, content, re.MULTILINE):
-        index = int(match.group(1))
-        start_h, start_m, start_s, start_ms = map(int, match.groups()[1:5])
-        end_h, end_m, end_s, end_ms = map(int, match.groups()[5:9])
-        text = match.group(10).strip()
-        
-        # Convertir en millisecondes
-        start_time = (start_h * 3600 + start_m * 60 + start_s) * 1000 + start_ms
-        end_time = (end_h * 3600 + end_m * 60 + end_s) * 1000 + end_ms
-        
-        subtitles.append({
-            'index': index,
-            'start_time': start_time,
-            'end_time': end_time,
-            'text': text
-        })
-    
-    return subtitles
-
 def detect_prayer_transitions(srt_path):
     """Détecte les phrases de transition vers la prière"""
     
@@ -363,14 +220,6 @@ def detect_prayer_transitions(srt_path):
     
     return transition_points
 
-def ms_to_timecode(total_ms):
-    """Convertit des millisecondes en format timecode HH:MM:SS,mmm"""
-    hours = total_ms // (3600 * 1000)
-    minutes = (total_ms % (3600 * 1000)) // (60 * 1000)
-    seconds = (total_ms % (60 * 1000)) // 1000
-    milliseconds = total_ms % 1000
-    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
-
 def adjust_srt_with_pauses(srt_path, output_srt, pause_points, pause_duration_ms=3000):
     """
     Ajuste les timings du SRT en ajoutant des pauses aux points spécifiés.
@@ -398,17 +247,14 @@ def adjust_srt_with_pauses(srt_path, output_srt, pause_points, pause_duration_ms
         })
     
     # Écrire le nouveau fichier SRT
-    with open(output_srt, 'w', encoding='utf-8') as f:
-        for sub in adjusted_subtitles:
-            f.write(f"{sub['index']}\n")
-            f.write(f"{ms_to_timecode(sub['start_time'])} --> {ms_to_timecode(sub['end_time'])}\n")
-            f.write(f"{sub['text']}\n\n")
+    write_srt_cues(adjusted_subtitles, output_srt)
     
     print(f"✅ Fichier SRT ajusté avec {len(sorted_pauses)} pause(s) sauvegardé dans {output_srt}")
 
 def insert_silence_in_audio(audio_path, output_path, pause_points, pause_duration=3.0):
     """
-    Insère des silences dans l'audio aux points spécifiés.
+    Insère des silences dans l'audio aux points spécifiés (un seul décodage
+    et un seul encodage, quel que soit le nombre de pauses).
     pause_points: liste des timestamps (en ms) où insérer les pauses.
     pause_duration: durée du silence en secondes.
     """
@@ -423,77 +269,8 @@ def insert_silence_in_audio(audio_path, output_path, pause_points, pause_duratio
     
     print(f"🔄 Insertion de {len(sorted_pauses)} pause(s) de {pause_duration}s dans l'audio...")
     
-    # Créer un fichier de silence temporaire
-    silence_file = os.path.join(OUTPUT_DIR, "silence_temp.mp3")
-    cmd_silence = [
-        "ffmpeg", "-y",
-        "-f", "lavfi", "-i", f"anullsrc=r=44100:cl=stereo",
-        "-t", str(pause_duration),
-        "-c:a", "libmp3lame", "-q:a", "2",
-        silence_file
-    ]
-    subprocess.run(cmd_silence, check=True, capture_output=True)
-    
-    # Découper l'audio en segments et insérer les silences
-    segments = []
-    prev_time = 0
-    
-    for i, pause_time_ms in enumerate(sorted_pauses):
-        pause_time_s = pause_time_ms / 1000.0
-        
-        # Extraire le segment avant la pause
-        segment_file = os.path.join(OUTPUT_DIR, f"segment_{i}.mp3")
-        duration = pause_time_s - prev_time
-        
-        cmd_segment = [
-            "ffmpeg", "-y",
-            "-i", audio_path,
-            "-ss", str(prev_time),
-            "-t", str(duration),
-            "-c:a", "libmp3lame", "-q:a", "2",
-            segment_file
-        ]
-        subprocess.run(cmd_segment, check=True, capture_output=True)
-        segments.append(segment_file)
-        segments.append(silence_file)
-        
-        prev_time = pause_time_s
-        print(f"  ✓ Segment {i+1} extrait (0:{prev_time-duration:.2f} -> 0:{pause_time_s:.2f}) + pause de {pause_duration}s")
-    
-    # Extraire le dernier segment (après la dernière pause)
-    last_segment_file = os.path.join(OUTPUT_DIR, f"segment_last.mp3")
-    cmd_last = [
-        "ffmpeg", "-y",
-        "-i", audio_path,
-        "-ss", str(prev_time),
-        "-c:a", "libmp3lame", "-q:a", "2",
-        last_segment_file
-    ]
-    subprocess.run(cmd_last, check=True, capture_output=True)
-    segments.append(last_segment_file)
-    
-    # Concaténer tous les segments
-    concat_list_file = os.path.join(OUTPUT_DIR, "concat_audio_list.txt")
-    with open(concat_list_file, 'w', encoding='utf-8') as f:
-        for segment in segments:
-            f.write(f"file '{os.path.abspath(segment)}'\n")
-    
-    cmd_concat = [
-        "ffmpeg", "-y",
-        "-f", "concat",
-        "-safe", "0",
-        "-i", concat_list_file,
-        "-c:a", "libmp3lame", "-q:a", "2",
-        output_path
-    ]
-    subprocess.run(cmd_concat, check=True)
-    
-    # Nettoyer les fichiers temporaires
-    os.remove(silence_file)
-    os.remove(concat_list_file)
-    for segment in segments:
-        if os.path.exists(segment):
-            os.remove(segment)
+    # Un seul FFmpeg : découpe aux points de pause, silences, concaténation
+    insert_silences_single_pass(audio_path, output_path, sorted_pauses, pause_duration)
     
     print(f"✅ Audio avec {len(sorted_pauses)} pause(s) généré : {output_path}")
 
@@ -1437,7 +1214,6 @@ def generate_video_with_bible_overlays(input_video, input_audio, metadata_json_p
     import json
     import subprocess
     import os
-    import re
     
     print("\n" + "="*80)
     print("🎬 GÉNÉRATION VIDÉO - OVERLAYS BIBLIQUES (VERSION FINALE)")
@@ -1456,10 +1232,7 @@ def generate_video_with_bible_overlays(input_video, input_audio, metadata_json_p
     
     masked_srt = os.path.join(os.path.dirname(output_video), "subtitles_masked.srt")
     
-    with open(normal_srt_path, 'r', encoding='utf-8') as f:
-        srt_content = f.read()
-    
-    subtitle_pattern = r'(\d+)\n(\d{2}):(\d{2}):(\d{2}),(\d{3}) --> (\d{2}):(\d{2}):(\d{2}),(\d{3})\n((?:.*\n?)+?)(?=\n\d+\n|\Z)'
+    subtitles = read_srt(normal_srt_path)
     
     # Utiliser les timestamps DIRECTEMENT du JSON
     verse_times = []
@@ -1472,15 +1245,12 @@ def generate_video_with_bible_overlays(input_video, input_audio, metadata_json_p
         print(f"     Timestamps JSON : {start_ms}ms → {end_ms}ms")
         print(f"     Overlay affiché : {start_ms/1000:.2f}s → {end_ms/1000:.2f}s")
     
-    def srt_time_to_ms(h, m, s, ms):
-        return (int(h) * 3600 + int(m) * 60 + int(s)) * 1000 + int(ms)
-    
     kept_subtitles = []
     masked_count = 0
     
-    for match in re.finditer(subtitle_pattern, srt_content, re.MULTILINE):
-        sub_start = srt_time_to_ms(*match.groups()[1:5])
-        sub_end = srt_time_to_ms(*match.groups()[5:9])
+    for subtitle in subtitles:
+        sub_start = subtitle.start_time
+        sub_end = subtitle.end_time
         
         is_masked = False
         for verse_start, verse_end in verse_times:
@@ -1490,10 +1260,9 @@ def generate_video_with_bible_overlays(input_video, input_audio, metadata_json_p
                 break
         
         if not is_masked:
-            kept_subtitles.append(match.group(0))
+            kept_subtitles.append(subtitle)
     
-    with open(masked_srt, 'w', encoding='utf-8') as f:
-        f.write('\n\n'.join(kept_subtitles))
+    write_srt_cues(kept_subtitles, masked_srt)
     
     print(f"\n✅ SRT masqué créé")
     print(f"   Sous-titres conservés : {len(kept_subtitles)}")
@@ -1511,9 +1280,7 @@ def generate_video_with_bible_overlays(input_video, input_audio, metadata_json_p
         "ffmpeg", "-y",
         "-i", input_video,
         "-vf", f"subtitles='{srt_for_vf}':force_style='FontName=Montserrat ExtraLight,FontSize=18,OutlineColour=&H000000&,BorderStyle=1,Outline=1,Alignment=10,MarginV=0,MarginL=0,MarginR=0'",
-        "-c:v", "libx264",
-        "-preset", "medium",
-        "-crf", "18",
+        *final_video_codec_args(),
         "-an",
         video_with_subs
     ]
@@ -1665,9 +1432,7 @@ def generate_video_with_bible_overlays(input_video, input_audio, metadata_json_p
         "-vf", filter_vf,
         "-map", "0:v",
         "-map", "1:a",
-        "-c:v", "libx264",
-        "-preset", "medium",
-        "-crf", "18",
+        *final_video_codec_args(),
         "-c:a", "aac",
         "-b:a", "192k",
         output_video
@@ -1750,9 +1515,7 @@ def generate_final_video_standard(video_input, audio_input, subtitle_file, outpu
         "-vf", vf_filter,
         "-map", "0:v",
         "-map", "1:a",
-        "-c:v", "libx264",
-        "-preset", "medium",
-        "-crf", "18",
+        *final_video_codec_args(),
         "-c:a", "aac",
         "-b:a", "192k",
         output
@@ -1854,17 +1617,22 @@ def main():
     # ÉTAPE 2: Détection transitions + pauses
     print("🧠 ÉTAPE 2/7 : Détection des transitions de prière...")
     transition_points = detect_prayer_transitions(srt_path)
+    # Pauses restant à insérer en mémoire au mixage (AUDIO_ENGINE=numpy)
+    mix_pause_points = None
     
     if transition_points:
         print(f"✅ {len(transition_points)} transition(s) détectée(s)")
         
-        voice_audio_with_pauses = os.path.join(OUTPUT_DIR, "voice_audio_with_pauses.mp3")
-        insert_silence_in_audio(voice_audio, voice_audio_with_pauses, transition_points, pause_duration=3.0)
+        if AUDIO_ENGINE == "numpy":
+            mix_pause_points = transition_points
+        else:
+            voice_audio_with_pauses = os.path.join(OUTPUT_DIR, f"voice_audio_with_pauses{AUDIO_EXT}")
+            insert_silence_in_audio(voice_audio, voice_audio_with_pauses, transition_points, pause_duration=3.0)
+            voice_audio = voice_audio_with_pauses
         
         srt_file_adjusted = os.path.join(OUTPUT_DIR, "subtitles_adjusted.srt")
         adjust_srt_with_pauses(srt_path, srt_file_adjusted, transition_points, pause_duration_ms=3000)
         
-        voice_audio = voice_audio_with_pauses
         srt_path = srt_file_adjusted
         print("🎯 Pauses de méditation insérées\n")
     else:
@@ -1886,7 +1654,7 @@ def main():
     
     # ÉTAPE 4: Génération vidéo de fond
     print("\n🎬 ÉTAPE 4/7 : Génération de la vidéo de fond...")
-    audio_duration = get_audio_duration(voice_audio)
+    audio_duration = get_audio_duration(voice_audio) + len(mix_pause_points or []) * 3.0
     background_video = os.path.join(OUTPUT_DIR, "background_video.mp4")
     generate_background_video_from_local(audio_duration, background_video)
     print()
@@ -1899,7 +1667,8 @@ def main():
     # ÉTAPE 6: Mixage audio
     print("🎚️  ÉTAPE 6/7 : Mixage audio...")
     mixed_audio = os.path.join(OUTPUT_DIR, "mixed_audio.m4a")
-    mix_audio_with_background_delayed(voice_audio, background_music, mixed_audio, voice_delay_seconds=2)
+    mix_audio_with_background_delayed(voice_audio, background_music, mixed_audio, voice_delay_seconds=2,
+                                      pause_points=mix_pause_points)
     print()
     
     # ÉTAPE 7: Vidéo finale
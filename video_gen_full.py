@@ -8,7 +8,17 @@ import sys
 import random
 from datetime import timedelta, datetime
 from dotenv import load_dotenv
-import requests
+from audio_generator.chunking import TTS_CHUNKING, split_text_content_defined
+from audio_generator.tts_engine import synthesize_chunks
+from audio_generator.audio_chain import (
+    AUDIO_FUSED_GRAPH, MP3_CODEC_ARGS, intermediate_ext, intermediate_codec_args, render_fused_voice,
+    background_loudnorm_prefix, insert_silences_single_pass
+)
+from audio_generator.numpy_engine import AUDIO_ENGINE, render_voice_mix
+from video_library.clip_store import CLIP_STORE_ENABLED, get_normalized_clips, plan_background_segments
+from video_library.encoders import final_video_codec_args
+from video_library.media_index import list_background_songs, list_background_videos
+from subs_generator.srt_file import parse_srt_file, ms_to_timecode, read_srt, write_srt_cues, shift_srt_file
 
 # --- Monkey-patch for Windows (Whisper) ---
 _orig_find_library = ctypes.util.find_library
@@ -23,7 +33,8 @@ ctypes.util.find_library = patched_find_library
 load_dotenv()
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 ELEVENLABS_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID")
-API_URL = f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE_ID}"
+ELEVENLABS_API_BASE = os.getenv("ELEVENLABS_API_BASE", "https://api.elevenlabs.io")
+API_URL = f"{ELEVENLABS_API_BASE}/v1/text-to-speech/{ELEVENLABS_VOICE_ID}"
 
 # Définir le dossier de travail pour les fichiers d'entrée
 WORKING_DIR = os.path.join(os.getcwd(), "working_dir")
@@ -33,6 +44,10 @@ OUTPUT_DIR = "Project_" + datetime.now().strftime("%d%m%Y_%H%M%S")
 if not os.path.exists(OUTPUT_DIR):
     os.makedirs(OUTPUT_DIR)
 
+# Extension des audios intermédiaires (AUDIO_INTERMEDIATE_FORMAT=wav : WAV flottant sans perte,
+# un seul encodage AAC au mixage final)
+AUDIO_EXT = intermediate_ext()
+
 ##############################
 # PARTIE 1 – Préparation & génération audio
 ##############################
@@ -83,53 +98,25 @@ def split_text_smart(text, max_length=4900):
     chunks.append(text.strip())
     return chunks
 
-def normalize_audio(input_file, output_file, target_i=-23):
+def generate_audio(text_chunks):
     """
-    Normalise the audio volume using FFmpeg's loudnorm filter.
-    `target_i` is the integrated loudness target (e.g., -23 LUFS).
+    Génère et normalise des fichiers audio avec ElevenLabs pour chaque chunk.
+    Les requêtes partagent une session HTTP et s'exécutent en parallèle
+    (ELEVENLABS_MAX_INFLIGHT) ; la normalisation tourne dans un pool séparé.
+    Les chunks inchangés depuis une précédente exécution sont relus du cache TTS.
+    Les erreurs 429/5xx sont relancées avec backoff ; si un chunk échoue malgré
+    tout, aucun fichier n'est retourné (pas d'audio ni de SRT troué).
+    Avec AUDIO_FUSED_GRAPH=1, les audios bruts sont retournés : la normalisation
+    est faite dans le graphe unique de render_fused_voice.
     """
-    cmd = [
-        "ffmpeg", "-y",
-        "-i", input_file,
-        "-af", f"loudnorm=I={target_i}:TP=-2:LRA=11",
-        output_file
-    ]
-    subprocess.run(cmd, check=True)
-    print(f"✅ Audio normalisé sauvegardé dans {output_file}")
-
-def generate_audio(text_chunks):
-    """Génère et normalise des fichiers audio avec ElevenLabs pour chaque chunk."""
-    audio_files = []
-    for i, chunk in enumerate(text_chunks, 1):
-        audio_filename = os.path.join(OUTPUT_DIR, f"audio_part_{i}.mp3")
-        normalized_filename = os.path.join(OUTPUT_DIR, f"audio_part_{i}_norm.mp3")
-        headers = {
-            "xi-api-key": ELEVENLABS_API_KEY,
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "text": chunk,
-            "model_id": "eleven_multilingual_v1",
-            "voice_settings": {
-                "speed": 1.0,
-                "stability": 0.5,
-                "similarity_boost": 0.75
-            }
-        }
-        response = requests.post(API_URL, headers=headers, json=payload)
-        if response.status_code == 200:
-            with open(audio_filename, "wb") as af:
-                af.write(response.content)
-            print(f"✅ Audio généré : {audio_filename}")
-            # Normalize the generated audio to have consistent volume
-            normalize_audio(audio_filename, normalized_filename)
-            audio_files.append(normalized_filename)
-        else:
-            try:
-                error_msg = response.json()
-            except:
-                error_msg = response.text
-            print(f"❌ Erreur audio (Status {response.status_code}): {error_msg}")
+    audio_files = synthesize_chunks(text_chunks, API_URL, ELEVENLABS_API_KEY, OUTPUT_DIR,
+                                    voice_id=ELEVENLABS_VOICE_ID, normalized_ext=AUDIO_EXT,
+                                    normalize=not AUDIO_FUSED_GRAPH)
+    if len(audio_files) < len(text_chunks):
+        print(f"❌ {len(text_chunks) - len(audio_files)} chunk(s) manquant(s) : arrêt pour éviter un audio troué.")
+        print("   Relancez le pipeline (après la relance des chunks en échec indiquée ci-dessus) :")
+        print("   tous les chunks réussis ou récupérés seront relus du cache TTS.")
+        return []
     return audio_files
 
 def process_audio_generation(input_script):
@@ -146,7 +133,11 @@ def process_audio_generation(input_script):
     
     with open(netoye_file, "r", encoding="utf-8") as f:
         script_text = f.read()
-    chunks = split_text_smart(script_text, 4900)
+    if TTS_CHUNKING == "content":
+        # Frontières stables : une modification locale n'invalide que les chunks voisins
+        chunks = split_text_content_defined(script_text, 4900)
+    else:
+        chunks = split_text_smart(script_text, 4900)
     audio_files = generate_audio(chunks)
     print("✅ Génération audio terminée.")
     return audio_files
@@ -165,20 +156,52 @@ def get_audio_duration(audio_path):
     ], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
     return float(result.stdout.decode().strip())
 
-def generate_srt_with_srt_generator(audio_file, output_srt):
+def generate_srt_with_srt_generator(audio_file, output_srt, model_name=None, audio_parts=None,
+                                    reference_text_path=None):
     """
     Génère le fichier SRT en utilisant le sous-module srt_generator directement.
     Ce module utilise Whisper avec des optimisations anti-hallucination.
+    Le modèle Whisper est conservé dans le registre du module entre deux appels.
+    Si audio_parts est fourni (parties fusionnées et boostées comme audio_file), elles peuvent
+    être transcrites en parallèle (WHISPER_PARALLEL_WORKERS > 1).
+    Si reference_text_path est fourni (texte envoyé à ElevenLabs), il peut être
+    aligné directement sur l'audio (WHISPER_FORCED_ALIGNMENT=1).
+    Si un worker de transcription (python -m subs_generator.worker) est joignable,
+    le job lui est envoyé : ni import de torch/whisper ni chargement du modèle ici.
     """
     print("🔄 Génération SRT avec le sous-module srt_generator...")
     
+    reference_text = None
+    if reference_text_path and os.path.exists(reference_text_path):
+        with open(reference_text_path, "r", encoding="utf-8") as f:
+            reference_text = f.read()
+    
+    # Worker persistant (modèle déjà résident) si disponible
+    from subs_generator.worker import is_worker_available, generate_srt_via_worker
+    if is_worker_available():
+        print("⚡ Worker de transcription détecté - envoi du job")
+        try:
+            generated_srt_path = generate_srt_via_worker(
+                audio_file, output_srt, model_name=model_name,
+                audio_parts=audio_parts, part_gap_seconds=MERGE_GAP_SECONDS,
+                reference_text=reference_text
+            )
+            print(f"✅ Fichier SRT généré avec succès: {generated_srt_path}")
+            return generated_srt_path
+        except OSError as e:
+            print(f"⚠️ Worker injoignable ou en échec ({e}) - transcription dans ce processus")
+    
     # Importer le module srt_generator
     sys.path.insert(0, os.path.join(os.getcwd(), "subs_generator"))
     try:
         from srt_generator import generate_srt # type: ignore
         
         # Appeler directement la fonction generate_srt
-        generated_srt_path = generate_srt(audio_file, output_srt)
+        generated_srt_path = generate_srt(
+            audio_file, output_srt, model_name=model_name,
+            audio_parts=audio_parts, part_gap_seconds=MERGE_GAP_SECONDS,
+            reference_text=reference_text
+        )
         print(f"✅ Fichier SRT généré avec succès: {generated_srt_path}")
         
         return generated_srt_path
@@ -200,20 +223,15 @@ def select_random_background_music():
     if not os.path.exists(background_songs_dir):
         raise FileNotFoundError(f"Le dossier background_songs n'existe pas : {background_songs_dir}")
     
-    # Lister tous les fichiers audio (mp3, wav, m4a, etc.)
-    audio_extensions = ['.mp3', '.wav', '.m4a', '.aac', '.ogg']
-    audio_files = []
-    
-    for file in os.listdir(background_songs_dir):
-        if any(file.lower().endswith(ext) for ext in audio_extensions):
-            audio_files.append(file)
+    # Musiques audio (mp3, wav, m4a, etc.) depuis l'index des médias
+    audio_files = list_background_songs(background_songs_dir)
     
     if not audio_files:
         raise FileNotFoundError(f"Aucun fichier audio trouvé dans {background_songs_dir}")
     
     # Sélection aléatoire
-    selected_file = random.choice(audio_files)
-    selected_path = os.path.join(background_songs_dir, selected_file)
+    selected_path = random.choice(audio_files)["path"]
+    selected_file = os.path.basename(selected_path)
     
     print(f"🎵 Musique de fond sélectionnée aléatoirement : {selected_file}")
     return selected_path
@@ -222,46 +240,7 @@ def shift_srt_timing(input_srt, output_srt, delay_seconds=2):
     """
     Décale tous les timecodes du fichier SRT de delay_seconds secondes.
     """
-    with open(input_srt, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Pattern pour matcher les timecodes SRT (HH:MM:SS,mmm --> HH:MM:SS,mmm)
-    import re
-    timecode_pattern = r'(\d{2}):(\d{2}):(\d{2}),(\d{3}) --> (\d{2}):(\d{2}):(\d{2}),(\d{3})'
-    
-    def shift_timecode(match):
-        # Extraire les composants du timecode de début
-        start_h, start_m, start_s, start_ms = map(int, match.groups()[:4])
-        # Extraire les composants du timecode de fin
-        end_h, end_m, end_s, end_ms = map(int, match.groups()[4:])
-        
-        # Convertir en millisecondes totales
-        start_total_ms = (start_h * 3600 + start_m * 60 + start_s) * 1000 + start_ms
-        end_total_ms = (end_h * 3600 + end_m * 60 + end_s) * 1000 + end_ms
-        
-        # Ajouter le délai
-        delay_ms = delay_seconds * 1000
-        start_total_ms += delay_ms
-        end_total_ms += delay_ms
-        
-        # Reconvertir en format HH:MM:SS,mmm
-        def ms_to_timecode(total_ms):
-            hours = total_ms // (3600 * 1000)
-            minutes = (total_ms % (3600 * 1000)) // (60 * 1000)
-            seconds = (total_ms % (60 * 1000)) // 1000
-            milliseconds = total_ms % 1000
-            return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
-        
-        start_tc = ms_to_timecode(start_total_ms)
-        end_tc = ms_to_timecode(end_total_ms)
-        
-        return f"{start_tc} --> {end_tc}"
-    
-    # Remplacer tous les timecodes
-    shifted_content = re.sub(timecode_pattern, shift_timecode, content)
-    
-    with open(output_srt, 'w', encoding='utf-8') as f:
-        f.write(shifted_content)
+    shift_srt_file(input_srt, output_srt, delay_seconds * 1000)
     
     print(f"✅ Fichier SRT décalé de +{delay_seconds}s sauvegardé dans {output_srt}")
 
@@ -270,9 +249,13 @@ def shift_srt_timing(input_srt, output_srt, delay_seconds=2):
 # PARTIE 3 – Génération vidéo avec FFmpeg
 ##############################
 
+# Silence (en secondes) entre deux parties dans full_audio.mp3.
+# silence.mp3 est généré mais n'est pas inséré dans la liste de concaténation.
+MERGE_GAP_SECONDS = 0.0
+
 def merge_audio_files(audio_files, output):
     """Fusionne des fichiers audio avec insertion d'une pause entre chaque segment."""
-    silence = os.path.join(OUTPUT_DIR, "silence.mp3")
+    silence = os.path.join(OUTPUT_DIR, f"silence{AUDIO_EXT}")
     if not os.path.exists(silence):
         cmd = [
             "ffmpeg", "-y",
@@ -293,7 +276,7 @@ def merge_audio_files(audio_files, output):
         "-f", "concat", "-safe", "0",
         "-i", list_file,
         "-ar", "44100",  # force sample rate
-        "-c:a", "libmp3lame", "-q:a", "2",
+        *intermediate_codec_args(output, MP3_CODEC_ARGS),
         output
     ]
     subprocess.run(cmd, check=True)
@@ -307,93 +290,38 @@ def boost_audio(input_file, output_file, boost_db=10):
         "ffmpeg", "-y",
         "-i", input_file,
         "-af", f"volume={boost_db}dB",
+        *intermediate_codec_args(output_file),
         output_file
     ]
     subprocess.run(cmd, check=True)
     print(f"✅ Audio boosté de +{boost_db} dB sauvegardé dans {output_file}")
 
-def normalize_video(input_video, output_video):
+# Boost de la voix avant mixage (en dB)
+VOICE_BOOST_DB = 10
+
+# Transcription des parties en parallèle (même variable que subs_generator/srt_generator.py)
+WHISPER_PARALLEL_WORKERS = int(os.getenv("WHISPER_PARALLEL_WORKERS", "1"))
+
+def prepare_transcription_parts(audio_parts):
     """
-    Normalise une vidéo à 1920x1080, 30fps, H264 - comme dans pexels_video_merger.py
-    Utilise NVENC si disponible, sinon QSV, sinon CPU.
+    Parties à transcrire en parallèle : les parties normalisées passent par le
+    même boost que l'audio fusionné, pour que Whisper entende la même voix
+    qu'en transcription séquentielle (avec AUDIO_ENGINE=numpy, l'audio fusionné
+    n'est pas boosté : les parties sont transcrites telles quelles). Retourne
+    None (transcription de l'audio fusionné) sans parallélisme ou avec
+    AUDIO_FUSED_GRAPH=1 (parties brutes).
     """
-    print(f"  🔄 Normalisation: {os.path.basename(input_video)}")
-    
-    # Commande NVENC (GPU NVIDIA)
-    cmd_nvenc = [
-        "ffmpeg", "-y",
-        "-i", input_video,
-        "-c:v", "h264_nvenc",
-        "-preset", "fast",
-        "-profile:v", "high",
-        "-cq", "23",
-        "-rc:v", "vbr",
-        "-maxrate", "8M",
-        "-bufsize", "16M",
-        "-vf", "scale=1920:1080:force_original_aspect_ratio=decrease,pad=1920:1080:(ow-iw)/2:(oh-ih)/2",
-        "-pix_fmt", "yuv420p",
-        "-r", "30",
-        "-an",  # Pas d'audio
-        "-movflags", "+faststart",
-        output_video
-    ]
-    
-    # Fallback Intel QSV
-    cmd_qsv = [
-        "ffmpeg", "-y",
-        "-hwaccel", "qsv",
-        "-i", input_video,
-        "-c:v", "h264_qsv",
-        "-preset", "faster",
-        "-global_quality", "20",
-        "-look_ahead", "1",
-        "-vf", "scale_qsv=1920:1080:force_original_aspect_ratio=decrease",
-        "-pix_fmt", "nv12",
-        "-r", "30",
-        "-an",
-        "-movflags", "+faststart",
-        output_video
-    ]
-    
-    # Fallback CPU
-    cmd_cpu = [
-        "ffmpeg", "-y",
-        "-i", input_video,
-        "-c:v", "libx264",
-        "-preset", "faster",
-        "-crf", "20",
-        "-threads", "0",
-        "-vf", "scale=1920:1080:force_original_aspect_ratio=decrease,pad=1920:1080:(ow-iw)/2:(oh-ih)/2",
-        "-pix_fmt", "yuv420p",
-        "-r", "30",
-        "-an",
-        output_video
-    ]
-    
-    # Essayer NVENC en premier
-    try:
-        subprocess.run(cmd_nvenc, check=True, capture_output=True)
-        print(f"    ✅ Normalisé avec NVENC")
-        return True
-    except:
-        pass
-    
-    # Essayer QSV
-    try:
-        subprocess.run(cmd_qsv, check=True, capture_output=True)
-        print(f"    ✅ Normalisé avec QSV")
-        return True
-    except:
-        pass
-    
-    # Fallback CPU
-    try:
-        subprocess.run(cmd_cpu, check=True, capture_output=True)
-        print(f"    ✅ Normalisé avec CPU")
-        return True
-    except Exception as e:
-        print(f"    ❌ Erreur de normalisation: {e}")
-        return False
+    if AUDIO_FUSED_GRAPH or WHISPER_PARALLEL_WORKERS <= 1:
+        return None
+    if AUDIO_ENGINE == "numpy":
+        return audio_parts
+    boosted_parts = []
+    for part in audio_parts:
+        root, ext = os.path.splitext(part)
+        boosted_part = f"{root}_boosted{ext}"
+        boost_audio(part, boosted_part, boost_db=VOICE_BOOST_DB)
+        boosted_parts.append(boosted_part)
+    return boosted_parts
 
 def generate_background_video_from_local(target_duration, output_video):
     """
@@ -411,13 +339,8 @@ def generate_background_video_from_local(target_duration, output_video):
     if not os.path.exists(videos_dir):
         raise FileNotFoundError(f"Le dossier videos_db n'existe pas : {videos_dir}")
 
-    # Lister tous les fichiers vidéo
-    video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
-    video_files = []
-    
-    for file in os.listdir(videos_dir):
-        if any(file.lower().endswith(ext) for ext in video_extensions):
-            video_files.append(os.path.join(videos_dir, file))
+    # Vidéos et durées depuis l'index des médias (ffprobe seulement pour les fichiers nouveaux ou modifiés)
+    video_files = list_background_videos(videos_dir)
     
     if not video_files:
         raise FileNotFoundError(f"Aucun fichier vidéo trouvé dans {videos_dir}")
@@ -425,29 +348,31 @@ def generate_background_video_from_local(target_duration, output_video):
     print(f"📹 {len(video_files)} vidéos disponibles dans videos_db")
     
     # Sélectionner aléatoirement des vidéos jusqu'à atteindre la durée cible
+    # (le dernier clip n'est normalisé que sur les secondes réellement utilisées)
     selected_videos = []
+    used_durations = []
     total_duration = 0
     
-    while total_duration < extended_duration:
-        video = random.choice(video_files)
-        video_duration = get_audio_duration(video)
+    for video, video_duration, used_seconds in plan_background_segments(video_files, extended_duration):
         selected_videos.append(video)
-        total_duration += video_duration
-        print(f"  ✓ Sélectionné: {os.path.basename(video)} ({video_duration:.1f}s) - Total: {total_duration:.1f}s")
+        used_durations.append(used_seconds if used_seconds < video_duration else None)
+        total_duration += used_seconds
+        print(f"  ✓ Sélectionné: {os.path.basename(video)} ({used_seconds:.1f}s/{video_duration:.1f}s) - Total: {total_duration:.1f}s")
     
     print(f"📊 {len(selected_videos)} vidéo(s) sélectionnée(s) pour un total de {total_duration:.1f}s")
     
-    # Créer un dossier temporaire pour les vidéos normalisées
+    # Créer un dossier temporaire (liste de concaténation, clips normalisés si CLIP_STORE=0)
     temp_dir = os.path.join(OUTPUT_DIR, "temp_normalized")
     if not os.path.exists(temp_dir):
         os.makedirs(temp_dir)
     
-    # Normaliser chaque vidéo sélectionnée
+    # Normaliser chaque vidéo sélectionnée (une seule fois par clip grâce au store persistant)
     print(f"🔧 Normalisation des vidéos à 1920x1080@30fps...")
+    store_dir = None if CLIP_STORE_ENABLED else temp_dir
     normalized_videos = []
-    for i, video in enumerate(selected_videos):
-        normalized_path = os.path.join(temp_dir, f"normalized_{i}.mp4")
-        if normalize_video(video, normalized_path):
+    normalized_paths = get_normalized_clips(selected_videos, store_dir, durations=used_durations, trim_dir=temp_dir)
+    for video, normalized_path in zip(selected_videos, normalized_paths):
+        if normalized_path:
             normalized_videos.append(normalized_path)
         else:
             print(f"    ⚠️  Échec normalisation, vidéo ignorée: {os.path.basename(video)}")
@@ -503,12 +428,22 @@ def generate_background_video_from_local(target_duration, output_video):
     
     return output_video
 
-def mix_audio_with_background_delayed(voice_audio, bg_music, output, voice_delay_seconds=2):
+def mix_audio_with_background_delayed(voice_audio, bg_music, output, voice_delay_seconds=2,
+                                      pause_points=None, voice_gain_db=0):
     """
     Mixe l'audio principal boosté avec la musique d'ambiance.
     L'audio principal est retardé de voice_delay_seconds secondes.
     La musique d'ambiance démarre immédiatement et couvre toute la durée.
+    Le mixage est stéréo (la voix mono est dupliquée sur les deux canaux).
+    Avec AUDIO_ENGINE=numpy, les pauses (pause_points, en ms) et le boost de la
+    voix (voice_gain_db) sont appliqués en mémoire dans la même passe que le mixage.
     """
+    if AUDIO_ENGINE == "numpy":
+        total_duration = render_voice_mix(voice_audio, bg_music, output, voice_delay_seconds,
+                                          pause_points_ms=pause_points, gain_db=voice_gain_db)
+        print(f"✅ Audio mixé en mémoire avec délai de {voice_delay_seconds}s généré : {output} (durée: {total_duration:.1f}s)")
+        return
+    
     # Calculer la durée totale nécessaire (durée de l'audio vocal + 2s avant + 2s après)
     voice_duration = get_audio_duration(voice_audio)
     total_duration = voice_duration + 4  # 2s avant + 2s après = 4s au total
@@ -517,7 +452,7 @@ def mix_audio_with_background_delayed(voice_audio, bg_music, output, voice_delay
         "ffmpeg", "-y",
         "-i", voice_audio,
         "-stream_loop", "-1", "-i", bg_music,
-        "-filter_complex", f"[0:a]adelay={voice_delay_seconds * 1000}|{voice_delay_seconds * 1000}[a0];[1:a]volume=0.2[a1];[a0][a1]amix=inputs=2:duration=longest:dropout_transition=3",
+        "-filter_complex", f"[0:a]aformat=channel_layouts=stereo,{f'volume={voice_gain_db}dB,' if voice_gain_db else ''}adelay={voice_delay_seconds * 1000}|{voice_delay_seconds * 1000}[a0];[1:a]{background_loudnorm_prefix(bg_music)}volume=0.2[a1];[a0][a1]amix=inputs=2:duration=longest:dropout_transition=3",
         "-t", str(total_duration),
         "-c:a", "aac",
         "-b:a", "192k",
@@ -571,36 +506,6 @@ def generate_final_video(video_input, audio_input, subtitle_file, output):
 # FONCTIONS INTELLIGENTES - DÉTECTION DES TRANSITIONS
 ##############################
 
-def parse_srt_file(srt_path):
-    """
-    Parse un fichier SRT et retourne une liste de sous-titres avec leurs informations.
-    """
-    with open(srt_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Pattern pour matcher un bloc de sous-titre complet
-    subtitle_pattern = r'(\d+)\n(\d{2}):(\d{2}):(\d{2}),(\d{3}) --> (\d{2}):(\d{2}):(\d{2}),(\d{3})\n((?:.*\n?)+?)(?=\n\d+\n|\Z)'
-    
-    subtitles = []
-    for match in re.finditer(subtitle_pattern, content, re.MULTILINE):
-        index = int(match.group(1))
-        start_h, start_m, start_s, start_ms = map(int, match.groups()[1:5])
-        end_h, end_m, end_s, end_ms = map(int, match.groups()[5:9])
-        text = match.group(10).strip()
-        
-        # Convertir en millisecondes
-        start_time = (start_h * 3600 + start_m * 60 + start_s) * 1000 + start_ms
-        end_time = (end_h * 3600 + end_m * 60 + end_s) * 1000 + end_ms
-        
-        subtitles.append({
-            'index': index,
-            'start_time': start_time,
-            'end_time': end_time,
-            'text': text
-        })
-    
-    return subtitles
-
 def detect_prayer_transitions(srt_path):
     """Détecte les phrases de transition vers la prière"""
     
@@ -629,14 +534,6 @@ def detect_prayer_transitions(srt_path):
     
     return transition_points
 
-def ms_to_timecode(total_ms):
-    """Convertit des millisecondes en format timecode HH:MM:SS,mmm"""
-    hours = total_ms // (3600 * 1000)
-    minutes = (total_ms % (3600 * 1000)) // (60 * 1000)
-    seconds = (total_ms % (60 * 1000)) // 1000
-    milliseconds = total_ms % 1000
-    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
-
 def adjust_srt_with_pauses(srt_path, output_srt, pause_points, pause_duration_ms=3000):
     """
     Ajuste les timings du SRT en ajoutant des pauses aux points spécifiés.
@@ -664,17 +561,14 @@ def adjust_srt_with_pauses(srt_path, output_srt, pause_points, pause_duration_ms
         })
     
     # Écrire le nouveau fichier SRT
-    with open(output_srt, 'w', encoding='utf-8') as f:
-        for sub in adjusted_subtitles:
-            f.write(f"{sub['index']}\n")
-            f.write(f"{ms_to_timecode(sub['start_time'])} --> {ms_to_timecode(sub['end_time'])}\n")
-            f.write(f"{sub['text']}\n\n")
+    write_srt_cues(adjusted_subtitles, output_srt)
     
     print(f"✅ Fichier SRT ajusté avec {len(sorted_pauses)} pause(s) sauvegardé dans {output_srt}")
 
 def insert_silence_in_audio(audio_path, output_path, pause_points, pause_duration=3.0):
     """
-    Insère des silences dans l'audio aux points spécifiés.
+    Insère des silences dans l'audio aux points spécifiés (un seul décodage
+    et un seul encodage, quel que soit le nombre de pauses).
     pause_points: liste des timestamps (en ms) où insérer les pauses.
     pause_duration: durée du silence en secondes.
     """
@@ -689,77 +583,8 @@ def insert_silence_in_audio(audio_path, output_path, pause_points, pause_duratio
     
     print(f"🔄 Insertion de {len(sorted_pauses)} pause(s) de {pause_duration}s dans l'audio...")
     
-    # Créer un fichier de silence temporaire
-    silence_file = os.path.join(OUTPUT_DIR, "silence_temp.mp3")
-    cmd_silence = [
-        "ffmpeg", "-y",
-        "-f", "lavfi", "-i", f"anullsrc=r=44100:cl=stereo",
-        "-t", str(pause_duration),
-        "-c:a", "libmp3lame", "-q:a", "2",
-        silence_file
-    ]
-    subprocess.run(cmd_silence, check=True, capture_output=True)
-    
-    # Découper l'audio en segments et insérer les silences
-    segments = []
-    prev_time = 0
-    
-    for i, pause_time_ms in enumerate(sorted_pauses):
-        pause_time_s = pause_time_ms / 1000.0
-        
-        # Extraire le segment avant la pause
-        segment_file = os.path.join(OUTPUT_DIR, f"segment_{i}.mp3")
-        duration = pause_time_s - prev_time
-        
-        cmd_segment = [
-            "ffmpeg", "-y",
-            "-i", audio_path,
-            "-ss", str(prev_time),
-            "-t", str(duration),
-            "-c:a", "libmp3lame", "-q:a", "2",
-            segment_file
-        ]
-        subprocess.run(cmd_segment, check=True, capture_output=True)
-        segments.append(segment_file)
-        segments.append(silence_file)
-        
-        prev_time = pause_time_s
-        print(f"  ✓ Segment {i+1} extrait (0:{prev_time-duration:.2f} -> 0:{pause_time_s:.2f}) + pause de {pause_duration}s")
-    
-    # Extraire le dernier segment (après la dernière pause)
-    last_segment_file = os.path.join(OUTPUT_DIR, f"segment_last.mp3")
-    cmd_last = [
-        "ffmpeg", "-y",
-        "-i", audio_path,
-        "-ss", str(prev_time),
-        "-c:a", "libmp3lame", "-q:a", "2",
-        last_segment_file
-    ]
-    subprocess.run(cmd_last, check=True, capture_output=True)
-    segments.append(last_segment_file)
-    
-    # Concaténer tous les segments
-    concat_list_file = os.path.join(OUTPUT_DIR, "concat_audio_list.txt")
-    with open(concat_list_file, 'w', encoding='utf-8') as f:
-        for segment in segments:
-            f.write(f"file '{os.path.abspath(segment)}'\n")
-    
-    cmd_concat = [
-        "ffmpeg", "-y",
-        "-f", "concat",
-        "-safe", "0",
-        "-i", concat_list_file,
-        "-c:a", "libmp3lame", "-q:a", "2",
-        output_path
-    ]
-    subprocess.run(cmd_concat, check=True)
-    
-    # Nettoyer les fichiers temporaires
-    os.remove(silence_file)
-    os.remove(concat_list_file)
-    for segment in segments:
-        if os.path.exists(segment):
-            os.remove(segment)
+    # Un seul FFmpeg : découpe aux points de pause, silences, concaténation
+    insert_silences_single_pass(audio_path, output_path, sorted_pauses, pause_duration)
     
     print(f"✅ Audio avec {len(sorted_pauses)} pause(s) généré : {output_path}")
 
@@ -1703,7 +1528,6 @@ def generate_video_with_bible_overlays(input_video, input_audio, metadata_json_p
     import json
     import subprocess
     import os
-    import re
     
     print("\n" + "="*80)
     print("🎬 GÉNÉRATION VIDÉO - OVERLAYS BIBLIQUES (VERSION FINALE)")
@@ -1722,10 +1546,7 @@ def generate_video_with_bible_overlays(input_video, input_audio, metadata_json_p
     
     masked_srt = os.path.join(os.path.dirname(output_video), "subtitles_masked.srt")
     
-    with open(normal_srt_path, 'r', encoding='utf-8') as f:
-        srt_content = f.read()
-    
-    subtitle_pattern = r'(\d+)\n(\d{2}):(\d{2}):(\d{2}),(\d{3}) --> (\d{2}):(\d{2}):(\d{2}),(\d{3})\n((?:.*\n?)+?)(?=\n\d+\n|\Z)'
+    subtitles = read_srt(normal_srt_path)
     
     # Utiliser les timestamps DIRECTEMENT du JSON
     verse_times = []
@@ -1738,15 +1559,12 @@ def generate_video_with_bible_overlays(input_video, input_audio, metadata_json_p
         print(f"     Timestamps JSON : {start_ms}ms → {end_ms}ms")
         print(f"     Overlay affiché : {start_ms/1000:.2f}s → {end_ms/1000:.2f}s")
     
-    def srt_time_to_ms(h, m, s, ms):
-        return (int(h) * 3600 + int(m) * 60 + int(s)) * 1000 + int(ms)
-    
     kept_subtitles = []
     masked_count = 0
     
-    for match in re.finditer(subtitle_pattern, srt_content, re.MULTILINE):
-        sub_start = srt_time_to_ms(*match.groups()[1:5])
-        sub_end = srt_time_to_ms(*match.groups()[5:9])
+    for subtitle in subtitles:
+        sub_start = subtitle.start_time
+        sub_end = subtitle.end_time
         
         is_masked = False
         for verse_start, verse_end in verse_times:
@@ -1756,10 +1574,9 @@ def generate_video_with_bible_overlays(input_video, input_audio, metadata_json_p
                 break
         
         if not is_masked:
-            kept_subtitles.append(match.group(0))
+            kept_subtitles.append(subtitle)
     
-    with open(masked_srt, 'w', encoding='utf-8') as f:
-        f.write('\n\n'.join(kept_subtitles))
+    write_srt_cues(kept_subtitles, masked_srt)
     
     print(f"\n✅ SRT masqué créé")
     print(f"   Sous-titres conservés : {len(kept_subtitles)}")
@@ -1777,9 +1594,7 @@ def generate_video_with_bible_overlays(input_video, input_audio, metadata_json_p
         "ffmpeg", "-y",
         "-i", input_video,
         "-vf", f"subtitles='{srt_for_vf}':force_style='FontName=Montserrat ExtraLight,FontSize=18,OutlineColour=&H000000&,BorderStyle=1,Outline=1,Alignment=10,MarginV=0,MarginL=0,MarginR=0'",
-        "-c:v", "libx264",
-        "-preset", "medium",
-        "-crf", "18",
+        *final_video_codec_args(),
         "-an",
         video_with_subs
     ]
@@ -1931,9 +1746,7 @@ def generate_video_with_bible_overlays(input_video, input_audio, metadata_json_p
         "-vf", filter_vf,
         "-map", "0:v",
         "-map", "1:a",
-        "-c:v", "libx264",
-        "-preset", "medium",
-        "-crf", "18",
+        *final_video_codec_args(),
         "-c:a", "aac",
         "-b:a", "192k",
         output_video
@@ -2016,9 +1829,7 @@ def generate_final_video_standard(video_input, audio_input, subtitle_file, outpu
         "-vf", vf_filter,
         "-map", "0:v",
         "-map", "1:a",
-        "-c:v", "libx264",
-        "-preset", "medium",
-        "-crf", "18",
+        *final_video_codec_args(),
         "-c:a", "aac",
         "-b:a", "192k",
         output
@@ -2058,17 +1869,33 @@ def main():
         print("❌ Aucun fichier audio généré.")
         return
     
-    # Merge audio parts
-    merged_audio = os.path.join(OUTPUT_DIR, "full_audio.mp3")
-    merge_audio_files(audio_parts, merged_audio)
-    
-    # Boost audio volume
-    boosted_audio = os.path.join(OUTPUT_DIR, "full_audio_boosted.mp3")
-    boost_audio(merged_audio, boosted_audio, boost_db=10)
+    boosted_audio = os.path.join(OUTPUT_DIR, f"full_audio_boosted{AUDIO_EXT}")
+    # Pauses restant à insérer en mémoire au mixage (AUDIO_ENGINE=numpy)
+    mix_pause_points = None
+    # Boost de la voix restant à appliquer au mixage (AUDIO_ENGINE=numpy)
+    mix_gain_db = 0
+    if AUDIO_FUSED_GRAPH:
+        # Normalisation des parties + fusion + boost : un seul processus FFmpeg
+        render_fused_voice(audio_parts, boosted_audio, gap_seconds=MERGE_GAP_SECONDS, boost_db=VOICE_BOOST_DB)
+    else:
+        # Merge audio parts
+        merged_audio = os.path.join(OUTPUT_DIR, f"full_audio{AUDIO_EXT}")
+        merge_audio_files(audio_parts, merged_audio)
+        
+        if AUDIO_ENGINE == "numpy":
+            # Boost appliqué en mémoire au mixage : pas de passe FFmpeg dédiée
+            boosted_audio = merged_audio
+            mix_gain_db = VOICE_BOOST_DB
+        else:
+            # Boost audio volume
+            boost_audio(merged_audio, boosted_audio, boost_db=VOICE_BOOST_DB)
     
     # PARTIE 2 – Génération du SRT avec le sous-module srt_generator
     final_srt = os.path.join(OUTPUT_DIR, "final_subtitles.srt")
-    generate_srt_with_srt_generator(boosted_audio, final_srt)
+    generate_srt_with_srt_generator(
+        boosted_audio, final_srt, audio_parts=prepare_transcription_parts(audio_parts),
+        reference_text_path=os.path.join(OUTPUT_DIR, "script_nettoye.txt")
+    )
     
     # PARTIE 2.5 – TRAITEMENT INTELLIGENT : Détection des transitions de prière
     print("\\n🧠 TRAITEMENT INTELLIGENT - Analyse des transitions de prière...")
@@ -2077,16 +1904,20 @@ def main():
     if transition_points:
         print(f"✅ {len(transition_points)} transition(s) détectée(s)")
         
-        # Insérer les silences dans l'audio boosté
-        boosted_audio_with_pauses = os.path.join(OUTPUT_DIR, "full_audio_boosted_with_pauses.mp3")
-        insert_silence_in_audio(boosted_audio, boosted_audio_with_pauses, transition_points, pause_duration=3.0)
+        if AUDIO_ENGINE == "numpy":
+            # Les silences seront insérés en mémoire au mixage
+            mix_pause_points = transition_points
+        else:
+            # Insérer les silences dans l'audio boosté
+            boosted_audio_with_pauses = os.path.join(OUTPUT_DIR, f"full_audio_boosted_with_pauses{AUDIO_EXT}")
+            insert_silence_in_audio(boosted_audio, boosted_audio_with_pauses, transition_points, pause_duration=3.0)
+            boosted_audio = boosted_audio_with_pauses
         
         # Ajuster le SRT avec les nouvelles pauses
         final_srt_adjusted = os.path.join(OUTPUT_DIR, "final_subtitles_adjusted.srt")
         adjust_srt_with_pauses(final_srt, final_srt_adjusted, transition_points, pause_duration_ms=3000)
         
         # Utiliser les fichiers ajustés pour la suite
-        boosted_audio = boosted_audio_with_pauses
         final_srt = final_srt_adjusted
         print("🎯 Fichiers audio et SRT ajustés avec les pauses de méditation")
     else:
@@ -2102,14 +1933,15 @@ def main():
     verses_with_timestamps = extract_verses_with_timestamps(source_text_path, final_srt)
     
     # PARTIE 3 – Génération vidéo avec vidéos locales
-    audio_duration = get_audio_duration(boosted_audio)
+    audio_duration = get_audio_duration(boosted_audio) + len(mix_pause_points or []) * 3.0
     print(f"\\n📊 Durée de l'audio final (avec pauses éventuelles): {audio_duration:.1f} secondes")
     background_video = os.path.join(OUTPUT_DIR, "background_video.mp4")
     generate_background_video_from_local(audio_duration, background_video)
     
     background_music = select_random_background_music()
     mixed_audio = os.path.join(OUTPUT_DIR, "mixed_audio.m4a")
-    mix_audio_with_background_delayed(boosted_audio, background_music, mixed_audio, voice_delay_seconds=2)
+    mix_audio_with_background_delayed(boosted_audio, background_music, mixed_audio, voice_delay_seconds=2,
+                                      pause_points=mix_pause_points, voice_gain_db=mix_gain_db)
     
     # ============================================================
     # PARTIE 4 – GÉNÉRATION VIDÉO FINALE (AVEC OU SANS OVERLAYS)
@@ -0,0 +1 @@
+# video_library package
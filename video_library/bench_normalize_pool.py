@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark du pool borné de normalisation (get_normalized_clips).
+
+Génère des clips synthétiques (définitions et cadences différentes de la
+cible), puis les normalise dans des stores vides :
+- séquentiellement (un job, threads libx264 automatiques)
+- avec le pool borné (normalize_pool_size jobs, cœurs répartis par normalize_job_threads)
+Vérifie que chaque clip est normalisé une seule fois, dans l'ordre de la
+sélection, et affiche les temps des deux modes.
+
+Lancement (VIDEO_ENCODER force l'encodeur, sinon détection de la machine) :
+    [VIDEO_ENCODER=libx264] python -m video_library.bench_normalize_pool [--clips 8] [--seconds 4]
+"""
+import os
+import io
+import time
+import argparse
+import tempfile
+import contextlib
+import subprocess
+
+from video_library.clip_store import get_normalized_clips
+from video_library.encoders import best_h264_encoder
+from video_library.normalize import normalize_job_threads, normalize_pool_size
+
+SOURCE_FORMATS = ["1280x720", "640x360", "1080x1920", "2560x1440"]
+SOURCE_RATES = [24, 25, 30, 60]
+
+def synthesize_clips(work_dir, clip_count, seconds):
+    """Clips testsrc2 de définitions et cadences variées."""
+    clips = []
+    for i in range(clip_count):
+        path = os.path.join(work_dir, f"clip{i}.mp4")
+        size, rate = SOURCE_FORMATS[i % len(SOURCE_FORMATS)], SOURCE_RATES[i % len(SOURCE_RATES)]
+        subprocess.run([
+            "ffmpeg", "-y", "-v", "error", "-f", "lavfi", "-i", f"testsrc2=s={size}:r={rate}:d={seconds}",
+            "-c:v", "libx264", "-preset", "ultrafast", path
+        ], check=True)
+        clips.append(path)
+    return clips
+
+def time_normalization(selection, store_dir, workers):
+    """Normalise selection dans un store vide, retourne (durée, chemins)."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        paths = get_normalized_clips(selection, store_dir, workers=workers)
+    return time.perf_counter() - start, paths
+
+def check_paths(selection, paths):
+    """Un clip normalisé par source, identique pour chaque tirage de la même source."""
+    if len(paths) != len(selection) or not all(paths):
+        raise AssertionError("Des clips n'ont pas été normalisés")
+    by_source = {}
+    for video, path in zip(selection, paths):
+        if by_source.setdefault(video, path) != path:
+            raise AssertionError(f"{video} normalisé plusieurs fois")
+        if not os.path.exists(path):
+            raise AssertionError(f"Clip normalisé introuvable : {path}")
+
+def run_benchmark(clip_count=8, seconds=4):
+    """
+    Compare la normalisation séquentielle et le pool borné.
+
+    Returns:
+        dict: Temps séquentiel, temps du pool, taille du pool, threads par job
+    """
+    encoder = best_h264_encoder()
+    with tempfile.TemporaryDirectory() as work_dir:
+        clips = synthesize_clips(work_dir, clip_count, seconds)
+        # Sélection de fond réaliste : certains clips sont tirés deux fois
+        selection = clips + clips[:clip_count // 2]
+
+        sequential_time, sequential_paths = time_normalization(selection, os.path.join(work_dir, "seq"), 1)
+        check_paths(selection, sequential_paths)
+        pool_time, pool_paths = time_normalization(selection, os.path.join(work_dir, "pool"), None)
+        check_paths(selection, pool_paths)
+
+    workers = min(normalize_pool_size(encoder), clip_count)
+    return {"sequential_time": sequential_time, "pool_time": pool_time, "workers": workers,
+            "threads": normalize_job_threads(workers) if workers > 1 else 0, "encoder": encoder}
+
+def main():
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Benchmark du pool de normalisation des clips")
+    parser.add_argument("--clips", type=int, default=8, help="Nombre de clips synthétiques")
+    parser.add_argument("--seconds", type=float, default=4, help="Durée de chaque clip")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.clips, args.seconds)
+    print(f"📊 {args.clips} clips synthétiques de {args.seconds:.0f}s, {os.cpu_count()} cœur(s), "
+          f"encodeur {result['encoder']}")
+    print(f"   Séquentiel (1 job)                     : {result['sequential_time']:.2f} s")
+    print(f"   Pool borné ({result['workers']} job(s), {result['threads']} thread(s)/job) : {result['pool_time']:.2f} s")
+    print(f"   ⚡ Accélération                          : x{result['sequential_time'] / result['pool_time']:.1f}")
+
+if __name__ == "__main__":
+    main()
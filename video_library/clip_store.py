@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Store persistant des clips normalisés de videos_db.
+
+Les mêmes clips sont tirés d'une exécution à l'autre : chaque clip n'est
+normalisé qu'une fois, puis réutilisé par simple copie de flux (concat).
+La clé est le chemin source, sa taille, son mtime, le profil de
+normalisation et l'encodeur avec ses arguments : un clip modifié, un
+changement de profil ou d'encodeur est renormalisé, et seuls des clips
+du même encodeur sont concaténés par copie de flux.
+
+Pré-normalisation de toute la bibliothèque :
+    python -m video_library.clip_store videos_db [--prune]
+"""
+import os
+import json
+import random
+import hashlib
+import argparse
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+from video_library.encoders import best_h264_encoder
+from video_library.normalize import (
+    NORMALIZATION_PROFILE, NORMALIZE_ENCODER_ARGS, normalize_video, normalize_pool_size, normalize_job_threads
+)
+
+# Store des clips normalisés (désactivable avec CLIP_STORE=0)
+CLIP_STORE_DIR = os.getenv("CLIP_STORE_DIR", os.path.join(os.getcwd(), "cache", "normalized_clips"))
+CLIP_STORE_ENABLED = os.getenv("CLIP_STORE", "1") != "0"
+
+VIDEO_EXTENSIONS = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
+
+# Marge gardée sur le clip partiel (arrondi aux images lors de la concaténation)
+TRIM_MARGIN_SECONDS = 0.5
+
+def get_clip_store_key(source_video, encoder, profile=NORMALIZATION_PROFILE):
+    """
+    Clé du store : chemin absolu + taille + mtime du clip source + profil de
+    normalisation + encodeur et ses arguments.
+    """
+    stat = os.stat(source_video)
+    material = json.dumps({
+        "source": os.path.abspath(source_video),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "profile": profile,
+        "encoder": encoder,
+        "encoder_args": NORMALIZE_ENCODER_ARGS.get(encoder)
+    }, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+def get_stored_clip_path(source_video, store_dir=None, encoder=None):
+    """Chemin du clip normalisé avec encoder dans le store (qu'il existe ou non)."""
+    key = get_clip_store_key(source_video, encoder or best_h264_encoder())
+    return os.path.join(store_dir or CLIP_STORE_DIR, f"{key}.mp4")
+
+def stored_clip_candidates(source_video, store_dir=None, encoder=None):
+    """
+    Entrées du store acceptables pour encoder, par ordre de préférence : celle
+    de l'encodeur, puis celle de libx264 (repli de normalize_video : le même
+    clip retomberait de toute façon sur le CPU).
+    """
+    encoder = encoder or best_h264_encoder()
+    encoders = [encoder] if encoder == "libx264" else [encoder, "libx264"]
+    return [get_stored_clip_path(source_video, store_dir, candidate) for candidate in encoders]
+
+def find_stored_clip(source_video, store_dir=None, encoder=None):
+    """Clip normalisé déjà présent dans le store (None sinon)."""
+    for stored_path in stored_clip_candidates(source_video, store_dir, encoder):
+        if os.path.exists(stored_path):
+            print(f"  ♻️  Clip normalisé réutilisé: {os.path.basename(source_video)}")
+            return stored_path
+    return None
+
+def get_normalized_clip(source_video, store_dir=None, normalize_func=normalize_video, encoder=None):
+    """
+    Retourne le clip normalisé du store, en le normalisant au premier usage.
+    Le clip est rangé sous la clé de l'encodeur réellement utilisé (libx264
+    après un repli).
+
+    Returns:
+        str: Chemin du clip normalisé, ou None si la normalisation a échoué
+    """
+    store_dir = store_dir or CLIP_STORE_DIR
+    encoder = encoder or best_h264_encoder()
+    try:
+        stored_path = find_stored_clip(source_video, store_dir, encoder)
+        tmp_base = get_stored_clip_path(source_video, store_dir, encoder)[:-len('.mp4')]
+    except OSError as e:
+        print(f"    ❌ Clip source illisible: {e}")
+        return None
+    if stored_path:
+        return stored_path
+
+    os.makedirs(store_dir, exist_ok=True)
+    # Écriture atomique : un clip interrompu n'est jamais pris pour un clip normalisé
+    tmp_path = f"{tmp_base}.{os.getpid()}.tmp.mp4"
+    used_encoder = normalize_func(source_video, tmp_path)
+    if not used_encoder:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    stored_path = get_stored_clip_path(source_video, store_dir, used_encoder)
+    os.replace(tmp_path, stored_path)
+    return stored_path
+
+def get_trimmed_clip(source_video, duration, output_path, store_dir=None, normalize_func=normalize_video,
+                     encoder=None):
+    """
+    Clip dont seules les duration premières secondes sont utilisées : le clip
+    complet du store s'il existe déjà (copie de flux, la concaténation coupe),
+    sinon seule la partie utile est normalisée vers output_path (hors store).
+
+    Returns:
+        str: Chemin du clip normalisé, ou None si la normalisation a échoué
+    """
+    try:
+        stored_path = find_stored_clip(source_video, store_dir, encoder)
+    except OSError as e:
+        print(f"    ❌ Clip source illisible: {e}")
+        return None
+    if stored_path:
+        return stored_path
+
+    if normalize_func(source_video, output_path, duration=duration):
+        return output_path
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    return None
+
+def plan_background_segments(clips, target_duration, choose=random.choice):
+    """
+    Tire des clips au hasard jusqu'à couvrir target_duration et calcule les
+    secondes réellement utilisées de chacun : seul le dernier est partiel.
+    clips sont des entrées de l'index des médias (clés path et duration) ;
+    les clips de durée inconnue ou nulle sont ignorés.
+
+    Returns:
+        list: Tuples (chemin, durée du clip, secondes utilisées)
+    """
+    clips = [clip for clip in clips if (clip.get("duration") or 0) > 0]
+    if not clips:
+        raise ValueError("Aucun clip de durée connue pour la vidéo de fond")
+    segments = []
+    total_duration = 0.0
+    while total_duration < target_duration:
+        clip = choose(clips)
+        used_seconds = min(clip["duration"], target_duration - total_duration + TRIM_MARGIN_SECONDS)
+        segments.append((clip["path"], clip["duration"], used_seconds))
+        total_duration += used_seconds
+    return segments
+
+def get_normalized_clips(source_videos, store_dir=None, workers=None, durations=None, trim_dir=None):
+    """
+    Normalise en parallèle (pool borné, threads libx264 répartis entre les jobs)
+    les clips absents du store. Un clip tiré plusieurs fois n'est normalisé qu'une fois.
+    durations (alignée sur source_videos, None = clip complet) limite la
+    normalisation aux secondes utilisées ; les clips partiels vont dans trim_dir.
+
+    Returns:
+        list: Chemins normalisés dans l'ordre de source_videos (None si échec)
+    """
+    if durations is None or trim_dir is None:
+        durations = [None] * len(source_videos)
+    # Un clip aussi utilisé en entier dans la sélection est normalisé une seule fois, en entier
+    full_videos = {video for video, duration in zip(source_videos, durations) if not duration}
+    durations = [None if video in full_videos else duration for video, duration in zip(source_videos, durations)]
+    jobs = list(dict.fromkeys(zip(source_videos, durations)))
+    encoder = best_h264_encoder()
+    workers = min(workers or normalize_pool_size(encoder), len(jobs)) or 1
+    normalize_func = partial(normalize_video, encoder=encoder,
+                             threads=normalize_job_threads(workers) if workers > 1 else 0)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for i, (video, duration) in enumerate(jobs):
+            if duration:
+                trimmed_path = os.path.join(trim_dir, f"trimmed_{i}.mp4")
+                futures[(video, duration)] = pool.submit(get_trimmed_clip, video, duration, trimmed_path,
+                                                         store_dir, normalize_func, encoder)
+            else:
+                futures[(video, duration)] = pool.submit(get_normalized_clip, video, store_dir,
+                                                         normalize_func, encoder)
+        results = {job: future.result() for job, future in futures.items()}
+    return [results[job] for job in zip(source_videos, durations)]
+
+def list_library_videos(videos_dir):
+    """Liste triée des vidéos d'une bibliothèque (extensions de VIDEO_EXTENSIONS)."""
+    return sorted(
+        os.path.join(videos_dir, file)
+        for file in os.listdir(videos_dir)
+        if any(file.lower().endswith(ext) for ext in VIDEO_EXTENSIONS)
+    )
+
+def ingest_library(videos_dir, store_dir=None, prune=False):
+    """
+    Pré-normalise tous les clips de videos_dir qui ne sont pas encore dans le store.
+    Avec prune, supprime les clips normalisés qui ne correspondent plus à aucune
+    source (clip supprimé ou modifié, profil ou encodeur changé).
+
+    Returns:
+        tuple: (clips normalisés, clips déjà présents, échecs)
+    """
+    store_dir = store_dir or CLIP_STORE_DIR
+    videos = list_library_videos(videos_dir)
+    print(f"📹 {len(videos)} vidéo(s) dans {videos_dir}")
+
+    expected = set()
+    missing = []
+    for video in videos:
+        candidates = stored_clip_candidates(video, store_dir)
+        expected.update(os.path.basename(path) for path in candidates)
+        if not any(os.path.exists(path) for path in candidates):
+            missing.append(video)
+
+    results = get_normalized_clips(missing, store_dir) if missing else []
+    failed = [video for video, path in zip(missing, results) if path is None]
+    normalized = len(missing) - len(failed)
+    reused = len(videos) - len(missing)
+
+    if prune and os.path.isdir(store_dir):
+        removed = 0
+        for name in os.listdir(store_dir):
+            if name.endswith(".mp4") and not name.endswith(".tmp.mp4") and name not in expected:
+                os.remove(os.path.join(store_dir, name))
+                removed += 1
+        if removed:
+            print(f"🧹 {removed} clip(s) normalisé(s) obsolète(s) supprimé(s)")
+
+    print(f"📊 Store : {normalized} clip(s) normalisé(s), {reused} déjà présent(s), {len(failed)} échec(s)")
+    for video in failed:
+        print(f"    ⚠️  Échec normalisation: {os.path.basename(video)}")
+    return normalized, reused, failed
+
+def main():
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Pré-normalise les clips de videos_db dans le store persistant")
+    parser.add_argument("videos_dir", nargs="?", default=os.path.join(os.getcwd(), "videos_db"),
+                        help="Dossier des vidéos (défaut: videos_db)")
+    parser.add_argument("--prune", action="store_true",
+                        help="Supprime les clips normalisés sans source dans ce dossier (store propre à cette bibliothèque)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.videos_dir):
+        raise SystemExit(f"❌ Dossier introuvable : {args.videos_dir}")
+    ingest_library(args.videos_dir, prune=args.prune)
+
+if __name__ == "__main__":
+    main()
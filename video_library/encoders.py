@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Détection des encodeurs H.264 disponibles, une fois par machine.
+
+normalize_video essayait NVENC puis QSV avant le CPU sur chaque clip : sur
+une machine sans GPU, chaque clip payait deux lancements FFmpeg en échec.
+Ici `ffmpeg -encoders` et un encodage de test d'une image sont faits une
+seule fois ; le résultat est conservé dans un profil de la machine
+(cache/host_profile.json), invalidé si l'hôte ou le binaire ffmpeg change.
+
+    python -m video_library.encoders [--refresh]
+"""
+import os
+import json
+import time
+import shutil
+import socket
+import argparse
+import subprocess
+
+HOST_PROFILE_PATH = os.getenv("HOST_PROFILE_PATH", os.path.join(os.getcwd(), "cache", "host_profile.json"))
+
+# Forcer un encodeur (h264_nvenc, h264_qsv, libx264) sans détection
+VIDEO_ENCODER = os.getenv("VIDEO_ENCODER", "").strip()
+
+# Ordre de préférence (le CPU est toujours disponible)
+ENCODER_PREFERENCE = ["h264_nvenc", "h264_qsv", "libx264"]
+
+ENCODER_LABELS = {"h264_nvenc": "NVENC", "h264_qsv": "QSV", "libx264": "CPU"}
+
+# Format d'entrée accepté par chaque encodeur pour l'encodage de test
+TEST_PIX_FMT = {"h264_nvenc": "yuv420p", "h264_qsv": "nv12", "libx264": "yuv420p"}
+
+def get_host_fingerprint():
+    """Identité de la machine et du binaire ffmpeg (sans lancer ffmpeg)."""
+    ffmpeg_path = shutil.which("ffmpeg")
+    fingerprint = {"host": socket.gethostname(), "ffmpeg": ffmpeg_path}
+    if ffmpeg_path:
+        stat = os.stat(ffmpeg_path)
+        fingerprint["ffmpeg_size"] = stat.st_size
+        fingerprint["ffmpeg_mtime_ns"] = stat.st_mtime_ns
+    return fingerprint
+
+def list_ffmpeg_encoders():
+    """Noms des encodeurs compilés dans ffmpeg (`ffmpeg -encoders`)."""
+    result = subprocess.run(["ffmpeg", "-hide_banner", "-encoders"],
+                            check=True, capture_output=True, text=True)
+    encoders = set()
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        # Lignes du type " V....D libx264   libx264 H.264 / AVC ..."
+        if len(parts) >= 2 and len(parts[0]) == 6 and parts[0][0] in "VAS":
+            encoders.add(parts[1])
+    return encoders
+
+def test_encoder(encoder):
+    """Encode une image de test : vrai si l'encodeur fonctionne (pilote, matériel)."""
+    cmd = [
+        "ffmpeg", "-hide_banner", "-v", "error",
+        "-f", "lavfi", "-i", "color=c=black:s=256x256:r=30:d=0.1",
+        "-frames:v", "1",
+        "-pix_fmt", TEST_PIX_FMT.get(encoder, "yuv420p"),
+        "-c:v", encoder,
+        "-f", "null", "-"
+    ]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, timeout=30)
+        return True
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+def probe_encoders():
+    """
+    Détecte les encodeurs H.264 utilisables.
+
+    Returns:
+        dict: available (liste par ordre de préférence) et best
+    """
+    compiled = list_ffmpeg_encoders()
+    available = [encoder for encoder in ENCODER_PREFERENCE
+                 if encoder in compiled and (encoder == "libx264" or test_encoder(encoder))]
+    if not available:
+        available = ["libx264"]
+    return {"available": available, "best": available[0]}
+
+def get_host_profile(refresh=False):
+    """
+    Profil de la machine (encodeurs) : lu depuis HOST_PROFILE_PATH, détecté
+    seulement s'il est absent, invalide ou si refresh est demandé.
+    """
+    fingerprint = get_host_fingerprint()
+    if not refresh and os.path.exists(HOST_PROFILE_PATH):
+        try:
+            with open(HOST_PROFILE_PATH, "r", encoding="utf-8") as f:
+                profile = json.load(f)
+            if profile.get("fingerprint") == fingerprint:
+                return profile
+        except (OSError, ValueError):
+            pass
+
+    print("🔍 Détection des encodeurs vidéo disponibles...")
+    profile = {"fingerprint": fingerprint, "detected_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+    profile.update(probe_encoders())
+    print(f"✅ Encodeur H.264 retenu : {profile['best']} (disponibles : {', '.join(profile['available'])})")
+
+    os.makedirs(os.path.dirname(HOST_PROFILE_PATH) or ".", exist_ok=True)
+    tmp_path = f"{HOST_PROFILE_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp_path, HOST_PROFILE_PATH)
+    return profile
+
+# Encodeur retenu pour le processus (profil lu une seule fois)
+_BEST_ENCODER = None
+
+def best_h264_encoder():
+    """Meilleur encodeur H.264 de la machine (ou VIDEO_ENCODER s'il est défini)."""
+    global _BEST_ENCODER
+    if VIDEO_ENCODER:
+        return VIDEO_ENCODER
+    if _BEST_ENCODER is None:
+        _BEST_ENCODER = get_host_profile()["best"]
+    return _BEST_ENCODER
+
+def final_video_codec_args(encoder=None):
+    """
+    Arguments d'encodage vidéo haute qualité des vidéos finales
+    (équivalent de libx264 -preset medium -crf 18 pour chaque encodeur).
+    """
+    encoder = encoder or best_h264_encoder()
+    if encoder == "h264_nvenc":
+        return ["-c:v", "h264_nvenc", "-preset", "slow", "-profile:v", "high",
+                "-rc:v", "vbr", "-cq", "19", "-b:v", "0", "-pix_fmt", "yuv420p"]
+    if encoder == "h264_qsv":
+        return ["-c:v", "h264_qsv", "-preset", "medium", "-global_quality", "18", "-pix_fmt", "nv12"]
+    return ["-c:v", "libx264", "-preset", "medium", "-crf", "18"]
+
+def main():
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Détecte les encodeurs H.264 de la machine")
+    parser.add_argument("--refresh", action="store_true", help="Relance la détection (nouveau pilote, nouveau GPU)")
+    args = parser.parse_args()
+    print(json.dumps(get_host_profile(refresh=args.refresh), indent=2))
+
+if __name__ == "__main__":
+    main()
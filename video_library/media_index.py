@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Index persistant des médias de videos_db et background_songs.
+
+Durée, résolution, fps et codecs de chaque fichier sont stockés dans
+cache/media_index.json, ainsi que la loudness et l'empreinte des musiques
+(les clips vidéo sont mixés sans leur son : un seul ffprobe suffit).
+refresh() ne sonde que les fichiers nouveaux ou modifiés (taille / mtime) :
+la sélection des clips et des musiques se fait ensuite en mémoire, sans
+sous-processus.
+"""
+import os
+import json
+import subprocess
+from fractions import Fraction
+
+from audio_generator.audio_chain import BACKGROUND_LOUDNESS_I, hash_file, measure_loudness
+from video_library.clip_store import VIDEO_EXTENSIONS
+
+MEDIA_INDEX_PATH = os.getenv("MEDIA_INDEX_PATH", os.path.join(os.getcwd(), "cache", "media_index.json"))
+
+AUDIO_EXTENSIONS = ['.mp3', '.wav', '.m4a', '.aac', '.ogg']
+
+# Version du format des entrées : toute modification force une nouvelle analyse
+MEDIA_INDEX_VERSION = 1
+
+def parse_frame_rate(value):
+    """Convertit un frame rate ffprobe ("30000/1001") en float (None si inconnu)."""
+    try:
+        rate = Fraction(value)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    return round(float(rate), 3) if rate > 0 else None
+
+def probe_media(path):
+    """
+    Sonde un fichier avec un seul appel ffprobe.
+
+    Returns:
+        dict: duration, width, height, fps, codec (vidéo), audio_codec
+    """
+    result = subprocess.run([
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration:stream=codec_type,codec_name,width,height,avg_frame_rate",
+        "-of", "json",
+        path
+    ], check=True, capture_output=True, text=True)
+    data = json.loads(result.stdout)
+
+    info = {"duration": None, "width": None, "height": None, "fps": None, "codec": None, "audio_codec": None}
+    duration = data.get("format", {}).get("duration")
+    if duration not in (None, "N/A"):
+        info["duration"] = float(duration)
+    for stream in data.get("streams", []):
+        if stream.get("codec_type") == "video" and info["codec"] is None:
+            info["codec"] = stream.get("codec_name")
+            info["width"] = stream.get("width")
+            info["height"] = stream.get("height")
+            info["fps"] = parse_frame_rate(stream.get("avg_frame_rate"))
+        elif stream.get("codec_type") == "audio" and info["audio_codec"] is None:
+            info["audio_codec"] = stream.get("codec_name")
+    return info
+
+def analyze_media(path, stat, with_loudness=False):
+    """
+    Entrée de l'index pour un fichier : sondage ffprobe, plus empreinte et
+    loudness avec with_loudness (musiques de fond).
+    """
+    entry = {
+        "version": MEDIA_INDEX_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "loudness": None
+    }
+    try:
+        entry.update(probe_media(path))
+        if with_loudness and entry["audio_codec"]:
+            # Mêmes cibles que background_loudnorm_prefix : la mesure sert aussi au mixage.
+            # L'empreinte, lue une seule fois, sert de clé au cache des mesures.
+            entry["hash"] = hash_file(path)
+            measured = measure_loudness(path, BACKGROUND_LOUDNESS_I, -1, content_hash=entry["hash"])
+            entry["loudness"] = float(measured["input_i"])
+    except (OSError, ValueError, KeyError, subprocess.CalledProcessError) as e:
+        print(f"⚠️ Analyse impossible, fichier ignoré: {os.path.basename(path)} ({e})")
+        entry["error"] = str(e)
+    return entry
+
+class MediaIndex:
+    """Index JSON des médias, rafraîchi de façon incrémentale par dossier."""
+
+    def __init__(self, path=None):
+        self.path = path or MEDIA_INDEX_PATH
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f).get("entries", {})
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Index des médias illisible, reconstruit: {e}")
+
+    def refresh(self, directory, extensions, with_loudness=False):
+        """
+        Met à jour les entrées de directory (nouveaux fichiers, fichiers modifiés
+        ou supprimés) et retourne les médias exploitables, triés par chemin.
+        with_loudness ajoute empreinte et loudness aux fichiers analysés.
+
+        Returns:
+            list: Entrées (dict avec la clé "path" en plus des métadonnées)
+        """
+        directory = os.path.abspath(directory)
+        current = {}
+        with os.scandir(directory) as it:
+            for item in it:
+                if item.is_file() and any(item.name.lower().endswith(ext) for ext in extensions):
+                    current[item.path] = item.stat()
+
+        changed = False
+        analyzed = 0
+        for path, stat in current.items():
+            entry = self.entries.get(path)
+            if (entry is None or entry.get("version") != MEDIA_INDEX_VERSION
+                    or entry.get("size") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns):
+                self.entries[path] = analyze_media(path, stat, with_loudness)
+                changed = True
+                analyzed += 1
+
+        # Fichiers supprimés du dossier
+        for path in [p for p in self.entries if os.path.dirname(p) == directory and p not in current]:
+            del self.entries[path]
+            changed = True
+
+        if changed:
+            if analyzed:
+                print(f"🗂️  Index des médias : {analyzed} fichier(s) analysé(s) dans {os.path.basename(directory)}")
+            self.save()
+
+        return [
+            dict(self.entries[path], path=path)
+            for path in sorted(current)
+            if not self.entries[path].get("error") and (self.entries[path].get("duration") or 0) > 0
+        ]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": self.entries}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+# Index conservé entre deux appels dans le même processus
+_MEDIA_INDEX = None
+
+def get_media_index():
+    """Index des médias du processus (chargé une seule fois)."""
+    global _MEDIA_INDEX
+    if _MEDIA_INDEX is None:
+        _MEDIA_INDEX = MediaIndex()
+    return _MEDIA_INDEX
+
+def list_background_videos(videos_dir):
+    """Clips vidéo de videos_dir avec leurs métadonnées (index rafraîchi)."""
+    return get_media_index().refresh(videos_dir, VIDEO_EXTENSIONS)
+
+def list_background_songs(songs_dir):
+    """Musiques de songs_dir avec leurs métadonnées (index rafraîchi)."""
+    return get_media_index().refresh(songs_dir, AUDIO_EXTENSIONS, with_loudness=True)
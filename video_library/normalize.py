@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Normalisation des clips de videos_db au format commun des vidéos de fond
+(1920x1080, 30 fps, H.264, sans audio) : toutes les vidéos normalisées
+peuvent ensuite être concaténées sans ré-encodage.
+"""
+import os
+import subprocess
+
+from video_library.encoders import ENCODER_LABELS, best_h264_encoder
+
+# Format cible des clips normalisés
+TARGET_WIDTH = 1920
+TARGET_HEIGHT = 1080
+TARGET_FPS = 30
+
+# Profil de normalisation : toute modification invalide les clips du store persistant
+NORMALIZATION_PROFILE = {
+    "width": TARGET_WIDTH,
+    "height": TARGET_HEIGHT,
+    "fps": TARGET_FPS,
+    "codec": "h264",
+    "pix_fmt": "yuv420p",
+    "audio": False,
+    "version": 2
+}
+
+# Jobs de normalisation en parallèle : CPU (0 = auto) et encodeurs matériels
+VIDEO_NORMALIZE_WORKERS = int(os.getenv("VIDEO_NORMALIZE_WORKERS", "0"))
+VIDEO_NORMALIZE_HW_WORKERS = int(os.getenv("VIDEO_NORMALIZE_HW_WORKERS", "2"))
+
+HARDWARE_ENCODERS = {"h264_nvenc", "h264_qsv"}
+
+# Threads minimum par encodage libx264 en mode auto (1080p : x264 passe bien à l'échelle jusque-là)
+X264_MIN_THREADS_PER_JOB = 4
+MAX_CPU_WORKERS = 4
+
+def normalize_pool_size(encoder="libx264", cpu_count=None):
+    """
+    Nombre de normalisations simultanées : VIDEO_NORMALIZE_HW_WORKERS pour un
+    encodeur matériel (sessions limitées), sinon un job par tranche de
+    X264_MIN_THREADS_PER_JOB cœurs (plafonné à MAX_CPU_WORKERS).
+    """
+    if encoder in HARDWARE_ENCODERS:
+        return max(1, VIDEO_NORMALIZE_HW_WORKERS)
+    if VIDEO_NORMALIZE_WORKERS > 0:
+        return VIDEO_NORMALIZE_WORKERS
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return max(1, min(MAX_CPU_WORKERS, cpu_count // X264_MIN_THREADS_PER_JOB))
+
+def normalize_job_threads(workers, cpu_count=None):
+    """Threads libx264 par job : les cœurs sont répartis entre les jobs parallèles."""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return max(1, cpu_count // max(1, workers))
+
+SCALE_PAD_FILTER = (f"scale={TARGET_WIDTH}:{TARGET_HEIGHT}:force_original_aspect_ratio=decrease,"
+                    f"pad={TARGET_WIDTH}:{TARGET_HEIGHT}:(ow-iw)/2:(oh-ih)/2")
+
+# Arguments d'encodage par encodeur : ils font partie de la clé du store
+# (un clip NVENC, QSV ou libx264 n'est jamais réutilisé pour un autre encodeur)
+NORMALIZE_ENCODER_ARGS = {
+    # GPU NVIDIA
+    "h264_nvenc": [
+        "-c:v", "h264_nvenc",
+        "-preset", "fast",
+        "-profile:v", "high",
+        "-cq", "23",
+        "-rc:v", "vbr",
+        "-maxrate", "8M",
+        "-bufsize", "16M",
+        "-vf", SCALE_PAD_FILTER,
+        "-pix_fmt", "yuv420p",
+        "-movflags", "+faststart",
+    ],
+    # Intel QSV : décodage et scale+pad logiciels (scale_qsv ne sait pas
+    # compléter par des bandes noires), seul l'encodage passe par le GPU
+    "h264_qsv": [
+        "-c:v", "h264_qsv",
+        "-preset", "faster",
+        "-global_quality", "20",
+        "-look_ahead", "1",
+        "-vf", f"{SCALE_PAD_FILTER},format=nv12",
+        "-pix_fmt", "nv12",
+        "-movflags", "+faststart",
+    ],
+    # CPU (aussi utilisé en repli)
+    "libx264": [
+        "-c:v", "libx264",
+        "-preset", "faster",
+        "-crf", "20",
+        "-vf", SCALE_PAD_FILTER,
+        "-pix_fmt", "yuv420p",
+    ],
+}
+
+def normalize_command(encoder, input_video, output_video, threads=0, trim_args=()):
+    """Commande FFmpeg de normalisation d'un clip avec encoder."""
+    cmd = ["ffmpeg", "-y", *trim_args, "-i", input_video, *NORMALIZE_ENCODER_ARGS[encoder]]
+    if encoder == "libx264":
+        cmd += ["-threads", str(threads)]
+    cmd += ["-r", str(TARGET_FPS), "-an", output_video]  # Pas d'audio
+    return cmd
+
+def normalize_video(input_video, output_video, threads=0, encoder=None, start=None, duration=None):
+    """
+    Normalise une vidéo à 1920x1080, 30fps, H264 - comme dans pexels_video_merger.py
+    Utilise l'encodeur détecté pour la machine (NVENC, QSV ou CPU, voir
+    video_library.encoders), avec repli sur le CPU en cas d'échec.
+    threads limite les threads libx264 (0 = automatique) quand plusieurs jobs tournent en parallèle.
+    start / duration (secondes) découpent l'entrée avant décodage : seules les
+    images conservées sont transcodées.
+
+    Returns:
+        str: Encodeur réellement utilisé (libx264 après un repli), ou None si échec
+    """
+    encoder = encoder or best_h264_encoder()
+    label = os.path.basename(input_video)
+    trim_args = []
+    if start:
+        trim_args += ["-ss", f"{start:.3f}"]
+    if duration:
+        trim_args += ["-t", f"{duration:.3f}"]
+        label += f" ({duration:.1f}s)"
+    print(f"  🔄 Normalisation: {label}")
+    
+    attempts = [encoder] if encoder in NORMALIZE_ENCODER_ARGS else []
+    if "libx264" not in attempts:
+        attempts.append("libx264")
+    
+    for attempt in attempts:
+        try:
+            subprocess.run(normalize_command(attempt, input_video, output_video, threads, trim_args),
+                           check=True, capture_output=True)
+            print(f"    ✅ Normalisé avec {ENCODER_LABELS[attempt]}")
+            return attempt
+        except Exception as e:
+            error = e
+    
+    print(f"    ❌ Erreur de normalisation: {error}")
+    return None